@@ -2,6 +2,13 @@
 from src.database.user_database import initialize_user_database
 from src.database.product_database import initialize_product_database
 from src.database.setting_database import initialize_setting_database
+from src.database.pragmas import DatabaseMaintenance
+from src.database.connection_provider import release_all_thread_connections
+from src.my_constants import (
+    CONNECTION_DB_USER,
+    CONNECTION_DB_PRODUCT,
+    CONNECTION_DB_SETTING,
+)
 from src.models.user_model import UserModel, UserListedProductModel
 from src.models.product_model import (
     MiscProductModel,
@@ -29,6 +36,7 @@ from src.controllers.setting_controller import (
 from src.controllers.robot_controller import RobotController
 
 from src.views.mainwindow import MainWindow
+from PyQt6.QtCore import QCoreApplication, QThreadPool
 
 
 class Application:
@@ -92,6 +100,12 @@ class Application:
             setting_user_data_dir_controller=setting_user_data_dir_controller,
         )
         self.mainWindow.show()
+        QCoreApplication.instance().aboutToQuit.connect(self.shutdown)
+
+    def shutdown(self):
+        # Chờ các tác vụ nền (import, export...) rồi đóng mọi kết nối đã clone
+        QThreadPool.globalInstance().waitForDone(5_000)
+        release_all_thread_connections()
 
     def initial_database(self):
         if not initialize_product_database():
@@ -100,3 +114,7 @@ class Application:
             raise Exception("Initialize user database failed!")
         if not initialize_setting_database():
             raise Exception("Initialize setting database failed!")
+        self.db_maintenance = DatabaseMaintenance(
+            [CONNECTION_DB_USER, CONNECTION_DB_PRODUCT, CONNECTION_DB_SETTING]
+        )
+        self.db_maintenance.start()
@@ -2,7 +2,7 @@
 from PyQt6.QtCore import QObject, pyqtSignal
 
 import json
-from typing import Union, Optional, Dict, Type, List, TypeAlias, Any
+from typing import Union, Optional, Dict, Type, List, TypeAlias, Any, Callable
 from dataclasses import fields, asdict
 from src.my_types import (
     UserType,
@@ -12,6 +12,8 @@ from src.my_types import (
     RealEstateTemplateType,
     ControllerSignals,
 )
+from src.my_constants import IMPORT_CHUNK_SIZE, IMPORT_ON_CONFLICT
+from src.services.background_service import BackgroundService
 
 DataType: TypeAlias = Union[
     UserType,
@@ -29,6 +31,33 @@ class BaseController(QObject):
         super().__init__(parent)
         self.service = service
         self.controller_signals = ControllerSignals()
+        self._background: Optional[BackgroundService] = None
+
+    @property
+    def background(self) -> BackgroundService:
+        """Runs the heavy calls (import, export...) off the GUI thread."""
+        if self._background is None:
+            self._background = BackgroundService(self.service, parent=self)
+        return self._background
+
+    def run_in_background(
+        self, func: Callable, *args: Any, on_done: Callable[[Any], None]
+    ) -> str:
+        """
+        Calls func(*args) on the background service; on_done gets its result
+        on the GUI thread, or False if it raised.
+        """
+        return self.background.submit_call(
+            func, *args, on_result=on_done, on_error=lambda _: on_done(False)
+        )
+
+    def import_in_background(self, file_path: str, on_done: Callable[[bool], None]):
+        """import_products() on a worker thread (bulk_import is background safe)."""
+        return self.run_in_background(self.import_products, file_path, on_done=on_done)
+
+    def export_in_background(self, file_path: str, on_done: Callable[[bool], None]):
+        """export_to_file() on a worker thread (fetch_all is background safe)."""
+        return self.run_in_background(self.export_to_file, file_path, on_done=on_done)
 
     def read_json_file(self, file_path: str) -> Optional[List[Dict[str, Any]]]:
         """
@@ -139,7 +168,7 @@ class BaseController(QObject):
         return parsed_instances
 
     def export_to_file(self, file_path: str):
-        data_list: DataTypeList = self.service.read_all()
+        data_list: DataTypeList = self.service.fetch_all()
         if not data_list:
             print("Warning: Data list is empty. Nothing to export.")
             try:
@@ -183,12 +212,27 @@ class BaseController(QObject):
             )
             return False
 
-    def import_products(self, file_path: str, data_type: DataType):
+    def import_products(
+        self,
+        file_path: str,
+        data_type: DataType,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        on_conflict: str = IMPORT_ON_CONFLICT,
+    ):
         try:
             raw_products = self.read_json_file(file_path)
             if raw_products:
                 products = self.parse_JSON_to_data_type(raw_products, data_type)
-                self.service.import_data(products)
+                if not self.service.bulk_import(
+                    products,
+                    chunk_size=chunk_size,
+                    on_conflict=on_conflict,
+                    progress_callback=self._on_import_progress,
+                ):
+                    self.controller_signals.error_signal.emit(
+                        f"Failed to import '{file_path}'. Check logs for details."
+                    )
+                    return False
                 self.controller_signals.finished_signal.emit(
                     "Successfully imported real estate products."
                 )
@@ -202,3 +246,8 @@ class BaseController(QObject):
                 "Error occurred while importing real estate products."
             )
             return False
+
+    def _on_import_progress(self, done: int, total: int):
+        self.controller_signals.progress_signal.emit(
+            f"Imported {done}/{total} records.", [done, total]
+        )
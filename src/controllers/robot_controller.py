@@ -1,10 +1,11 @@
 # src/controllers/robot_controller.py
 import os
-from typing import List, Dict, Optional, Tuple
-from PyQt6.QtCore import pyqtSlot, pyqtSignal
+from typing import Callable, List, Dict, Optional, Tuple, Union
+from PyQt6.QtCore import QThreadPool, pyqtSlot, pyqtSignal
 
 # from src.robot.browser_manager import BrowserManager
 from src.robot.browser_manager import BrowserManager
+from src.robot.process_runner import ShardedRobotRunner
 from src.controllers.base_controller import BaseController
 from src.services.user_service import UserService
 from src.services.setting_service import SettingProxyService, SettingUserDataDirService
@@ -13,6 +14,8 @@ from src.services.product_service import (
     RealEstateProductService,
     RealEstateTemplateService,
 )
+from src.services.campaign_context import CampaignContext
+from src.services.background_service import BackgroundService
 from src.my_types import (
     UserType,
     BrowserTaskType,
@@ -21,7 +24,7 @@ from src.my_types import (
     SellPayloadType,
     RobotSettingsType,
 )
-from src.my_constants import RE_TRANSACTION
+from src.my_constants import RE_TRANSACTION, ROBOT_PROCESS_SHARDS
 
 from src.utils.re_template import replace_template, init_footer_content
 
@@ -46,12 +49,57 @@ class RobotController(BaseController):
         self._re_template_service = re_template_service
         self._setting_proxy_service = setting_proxy_service
         self._setting_udd_service = setting_udd_service
-        self._current_browser_progress: Optional[BrowserManager] = None
+        self._current_browser_progress: Optional[
+            Union[BrowserManager, ShardedRobotRunner]
+        ] = None
+        self._campaign_context = CampaignContext(
+            re_product_service=re_product_service,
+            re_template_service=re_template_service,
+        )
+        # Một luồng duy nhất: các lần init_actions dùng chung CampaignContext
+        # nên chạy lần lượt
+        init_pool = QThreadPool(self)
+        init_pool.setMaxThreadCount(1)
+        self._background = BackgroundService(
+            user_service, threadpool=init_pool, parent=self
+        )
+
+    def init_actions_in_background(
+        self,
+        list_user_data: List[UserType],
+        action_payloads: List,
+        on_done: Callable[[Dict[str, List[BrowserTaskType]]], None],
+    ) -> str:
+        """
+        init_actions() on a worker thread (it only reads through background
+        safe service methods). on_done gets the actions on the GUI thread, {}
+        if they could not be built.
+        """
+
+        def on_error(message: str):
+            self.controller_signals.error_signal.emit(
+                f"Could not build the actions: {message}"
+            )
+            on_done({})
+
+        return self._background.submit_call(
+            self.init_actions,
+            list_user_data,
+            action_payloads,
+            on_result=on_done,
+            on_error=on_error,
+        )
 
     def init_actions(
         self, list_user_data: List[UserType], action_payloads: List
     ) -> Dict[str, BrowserTaskType]:
         browser_actions = {}
+        udd_container = self._setting_udd_service.get_selected()
+        context = self._campaign_context
+        # Mỗi lần chạy đọc lại sản phẩm và ảnh: DB hoặc thư mục ảnh có thể đã
+        # bị sửa mà model không phát tín hiệu
+        context.invalidate()
+        context.prepare()
         for user_data in list_user_data:
             user_type = user_data.type.strip().lower()
             browser_actions[user_data.uid] = []
@@ -63,31 +111,29 @@ class RobotController(BaseController):
                     if pid:
                         product_type = pid.split(".")[0]
                         if "re" in product_type.lower():
-                            product = self._re_product_service.read_by_pid(pid)
+                            product = context.get_product(pid)
                         elif "misc" in product_type.lower():
                             # TODO get random misc.
-                            product = self._misc_product_service.read_by_pid(pid)
+                            product = self._misc_product_service.fetch_by_key(
+                                "pid", pid
+                            )
                             raise RuntimeError("Invalid logic for misc")
                     if not product:
                         if "re.s" in user_type.lower():
-                            product = self._re_product_service.get_random(
-                                RE_TRANSACTION["sell"]
-                            )
+                            product = context.get_random_product(RE_TRANSACTION["sell"])
                         elif "re.r" in user_type.lower():
-                            product = self._re_product_service.get_random(
-                                RE_TRANSACTION["rent"]
-                            )
+                            product = context.get_random_product(RE_TRANSACTION["rent"])
                         elif "misc." in user_type.lower():
                             # TODO get random misc.
                             pass
                             # raise RuntimeError("Invalid logic for misc")
                     if type(product) == RealEstateProductType:
-                        temp_title = self._re_template_service.get_random(
+                        temp_title = context.get_random_template(
                             part="title",
                             transaction_type=product.transaction_type,
                             category=product.category,
                         )
-                        temp_desc = self._re_template_service.get_random(
+                        temp_desc = context.get_random_template(
                             part="description",
                             transaction_type=product.transaction_type,
                             category=product.category,
@@ -107,9 +153,7 @@ class RobotController(BaseController):
                             # + "\n\n"
                             + init_footer_content(product)
                         )
-                        image_paths = self._re_product_service.get_images_by_path(
-                            product.image_dir
-                        )
+                        image_paths = context.get_images(product.image_dir)
                         title = title[:90]
                         action_payload = SellPayloadType(
                             title=title, description=desc, image_paths=image_paths[:9]
@@ -134,10 +178,12 @@ class RobotController(BaseController):
                         is_mobile=False,
                         headless=False,
                         udd=os.path.join(
-                            self._setting_udd_service.get_selected(),
+                            udd_container,
                             str(user_data.my_id),
                         ),
                         browser_id=user_data.my_id,
+                        priority=action.get("priority", None),
+                        deadline=action.get("deadline", None),
                     )
                 )
         return browser_actions
@@ -211,17 +257,18 @@ class RobotController(BaseController):
 
                 # Lưu ý: Các logic kiểm tra "gap" không còn cần thiết
                 # vì các tác vụ đang được thêm vào tuần tự.
-        print(browser_tasks)
-        exit()
         return browser_tasks
 
+    def get_raw_proxies(self) -> List[str]:
+        proxy_data = self._setting_proxy_service.fetch_all()
+        return [raw_proxy.value for raw_proxy in proxy_data]
+
     def handle_run_bot(
         self,
         browser_tasks: List[BrowserTaskType],
         settings: RobotSettingsType,
     ):
-        proxy_data = self._setting_proxy_service.read_all()
-        raw_proxies = [raw_proxy.value for raw_proxy in proxy_data]
+        raw_proxies = self.get_raw_proxies()
 
         if (
             self._current_browser_progress
@@ -235,7 +282,12 @@ class RobotController(BaseController):
             )
         else:
             print(f"[{self.__class__.__name__}.handle_run_bot] Starting new bot tasks.")
-            self._current_browser_progress = BrowserManager(self)
+            if ROBOT_PROCESS_SHARDS > 1:
+                self._current_browser_progress = ShardedRobotRunner(
+                    shard_count=ROBOT_PROCESS_SHARDS, parent=self
+                )
+            else:
+                self._current_browser_progress = BrowserManager(self)
             self._current_browser_progress.set_settings(settings=settings)
             self._current_browser_progress.manager_signals.info_signal.connect(
                 self.controller_signals.info_signal
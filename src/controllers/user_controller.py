@@ -1,14 +1,15 @@
 # src/controllers/user_controller.py
 import uuid
 import string, secrets, os
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime, timedelta
-from PyQt6.QtCore import pyqtSlot
+from PyQt6.QtCore import QTimer, pyqtSlot
 
 from src.controllers.base_controller import BaseController
 from src.services.user_service import UserService, UserListedProductService
 
 from src.services.check_live import CheckLive
+from src.services.check_live_cache import CheckLiveCache
 
 # from src.robot.browser_manager import BrowserManager
 from src.robot.browser_manager import BrowserManager
@@ -19,6 +20,7 @@ from src.my_types import (
     LaunchPayloadType,
     RobotSettingsType,
 )
+from src.my_constants import CHECK_LIVE_WRITE_BACK_MS, CHECK_LIVE_WRITE_BACK_SIZE
 
 
 class UserController(BaseController):
@@ -31,6 +33,13 @@ class UserController(BaseController):
         super().__init__(service=user_service, parent=parent)
         self._user_service = user_service
         self._current_check_live_process: Optional[CheckLive] = None
+        self._check_live_cache = CheckLiveCache()
+        # record_id -> status, ghi vào DB cùng lúc bởi _flush_status_updates
+        self._pending_status_updates: Dict[int, int] = {}
+        self._status_write_timer = QTimer(self)
+        self._status_write_timer.setSingleShot(True)
+        self._status_write_timer.setInterval(CHECK_LIVE_WRITE_BACK_MS)
+        self._status_write_timer.timeout.connect(self._flush_status_updates)
         self._current_browser_progress: Optional[BrowserManager] = None
         self.list_selected_uid = []
         self.current_check_user_progress_num = 0
@@ -165,6 +174,21 @@ class UserController(BaseController):
             # TODO emit message
             return True
         tasks = list(zip(selected_ids, self.list_selected_uid))
+        # Bỏ qua các tài khoản vừa được kiểm tra (còn trong thời gian TTL của cache)
+        fresh_results = self._check_live_cache.get_fresh(self.list_selected_uid)
+        if fresh_results:
+            for record_id, uid in tasks:
+                if uid in fresh_results:
+                    self._on_check_live_task_succeeded(
+                        record_id, uid, fresh_results[uid]
+                    )
+            tasks = [task for task in tasks if task[1] not in fresh_results]
+            print(
+                f"[{self.__class__.__name__}.handleCheckUsersRequest] {len(fresh_results)} users were checked recently, skipped."
+            )
+        if not tasks:
+            self.check_live_all_tasks_finished()
+            return True
         if (
             self._current_check_live_process
             and not self._current_check_live_process._check_if_done()
@@ -184,6 +208,9 @@ class UserController(BaseController):
             self._current_check_live_process.task_failed.connect(
                 self._on_check_live_task_failed
             )
+            self._current_check_live_process.results_batch.connect(
+                self._on_check_live_results_batch
+            )
             self._current_check_live_process.all_tasks_finished.connect(
                 self.check_live_all_tasks_finished
             )
@@ -275,7 +302,7 @@ class UserController(BaseController):
 
     @pyqtSlot(int, str, bool)
     def _on_check_live_task_succeeded(self, record_id: int, uid: str, is_live: bool):
-        self._user_service.update_status(record_id, 1 if is_live else 0)
+        self._queue_status_update(record_id, 1 if is_live else 0)
         self.current_check_user_progress_num += 1
         if not is_live:
             print(f"{record_id} - {uid} : {is_live}")
@@ -291,8 +318,39 @@ class UserController(BaseController):
         # )
         print(f"'{uid}': {error_message}")
 
+    @pyqtSlot(list)
+    def _on_check_live_results_batch(self, results: List):
+        # Kiểm tra lỗi (vd. HTTP 429/5xx) không phải là câu trả lời: giữ kết
+        # quả cũ trong cache và không làm nó "mới" hơn
+        self._check_live_cache.put_many(
+            [
+                (uid, None if error else is_live, error)
+                for _, uid, is_live, error in results
+            ]
+        )
+
+    def _queue_status_update(self, record_id: int, status: int):
+        self._pending_status_updates[record_id] = status
+        if len(self._pending_status_updates) >= CHECK_LIVE_WRITE_BACK_SIZE:
+            self._flush_status_updates()
+        elif not self._status_write_timer.isActive():
+            self._status_write_timer.start()
+
+    @pyqtSlot()
+    def _flush_status_updates(self):
+        self._status_write_timer.stop()
+        if not self._pending_status_updates:
+            return
+        statuses = self._pending_status_updates
+        self._pending_status_updates = {}
+        if not self._user_service.update_statuses(statuses):
+            print(
+                f"[{self.__class__.__name__}._flush_status_updates] Failed to update the status of {len(statuses)} users."
+            )
+
     @pyqtSlot()
     def check_live_all_tasks_finished(self):
+        self._flush_status_updates()
         self.controller_signals.finished_signal.emit(
             "User active status check completed."
         )
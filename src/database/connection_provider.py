@@ -0,0 +1,70 @@
+# src/database/connection_provider.py
+import threading
+from typing import Dict, List
+from PyQt6.QtCore import QCoreApplication, QThread, Qt
+from PyQt6.QtSql import QSqlDatabase
+
+from src.database.pragmas import apply_pragmas
+
+# thread ident -> names of the connections cloned for that thread
+_thread_connections: Dict[int, List[str]] = {}
+_lock = threading.Lock()
+
+
+def is_main_thread() -> bool:
+    app = QCoreApplication.instance()
+    return app is None or QThread.currentThread() == app.thread()
+
+
+def get_connection(connection_name: str) -> QSqlDatabase:
+    """
+    Returns the named connection (CONNECTION_DB_USER, ...) usable from the
+    calling thread. On the main thread this is the connection opened by
+    initialize_*_database. Any other thread gets its own clone, opened on first
+    use with the same PRAGMA profile and closed when the thread finishes
+    (QThread / QThreadPool threads) or on release_thread_connections().
+    """
+    if is_main_thread():
+        return QSqlDatabase.database(connection_name)
+
+    thread_id = threading.get_ident()
+    clone_name = f"{connection_name}_thread_{thread_id}"
+    if QSqlDatabase.contains(clone_name):
+        db = QSqlDatabase.database(clone_name, False)
+        if db.isOpen():
+            return db
+    else:
+        db = QSqlDatabase.cloneDatabase(connection_name, clone_name)
+        with _lock:
+            first_connection = thread_id not in _thread_connections
+            _thread_connections.setdefault(thread_id, []).append(clone_name)
+        if first_connection:
+            QThread.currentThread().finished.connect(
+                lambda: release_thread_connections(thread_id),
+                Qt.ConnectionType.DirectConnection,
+            )
+    if not db.open():
+        print(f"[get_connection] Cannot open '{clone_name}': {db.lastError().text()}")
+        return db
+    apply_pragmas(db)
+    return db
+
+
+def release_thread_connections(thread_id: int = None):
+    """Closes and removes the clones of a thread (the calling one by default)."""
+    if thread_id is None:
+        thread_id = threading.get_ident()
+    with _lock:
+        clone_names = _thread_connections.pop(thread_id, [])
+    for clone_name in clone_names:
+        if QSqlDatabase.contains(clone_name):
+            QSqlDatabase.database(clone_name, False).close()
+            QSqlDatabase.removeDatabase(clone_name)
+
+
+def release_all_thread_connections():
+    """Releases every clone, e.g. on shutdown after the worker pools are done."""
+    with _lock:
+        thread_ids = list(_thread_connections.keys())
+    for thread_id in thread_ids:
+        release_thread_connections(thread_id)
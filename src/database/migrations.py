@@ -0,0 +1,79 @@
+# src/database/migrations.py
+from typing import List, Tuple
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from src.database.sql_commands import (
+    ADD_REAL_ESTATE_PRODUCT_UPDATED_AT_JD_COLUMN,
+    CREATE_REAL_ESTATE_PRODUCT_RANDOM_INDEX,
+    CREATE_REAL_ESTATE_TEMPLATE_LOOKUP_INDEX,
+    CREATE_USER_LISTED_PRODUCT_USER_INDEX,
+    CREATE_ROBOT_TASK_TABLE,
+    CREATE_ROBOT_TASK_RUN_STATUS_INDEX,
+    CREATE_CHECK_LIVE_CACHE_TABLE,
+)
+
+# (version, statements). Append new versions at the end, never edit old ones.
+Migration = Tuple[int, List[str]]
+
+USER_MIGRATIONS: List[Migration] = [
+    (1, [CREATE_USER_LISTED_PRODUCT_USER_INDEX]),
+    (2, [CREATE_ROBOT_TASK_TABLE, CREATE_ROBOT_TASK_RUN_STATUS_INDEX]),
+    (3, [CREATE_CHECK_LIVE_CACHE_TABLE]),
+]
+
+PRODUCT_MIGRATIONS: List[Migration] = [
+    (
+        1,
+        [
+            ADD_REAL_ESTATE_PRODUCT_UPDATED_AT_JD_COLUMN,
+            CREATE_REAL_ESTATE_PRODUCT_RANDOM_INDEX,
+            CREATE_REAL_ESTATE_TEMPLATE_LOOKUP_INDEX,
+        ],
+    ),
+]
+
+SETTING_MIGRATIONS: List[Migration] = []
+
+
+def get_schema_version(db: QSqlDatabase) -> int:
+    query = QSqlQuery(db)
+    if not query.exec("PRAGMA user_version;") or not query.next():
+        raise Exception(
+            f"[get_schema_version] Cannot read schema version: {query.lastError().text()}"
+        )
+    return int(query.value(0))
+
+
+def run_migrations(db: QSqlDatabase, migrations: List[Migration]) -> int:
+    """
+    Applies every migration newer than PRAGMA user_version, each one in its own
+    transaction together with the user_version bump, so an install upgrades in
+    place and a failed step leaves the database at the previous version.
+    Returns the schema version after the run.
+    """
+    current_version = get_schema_version(db)
+    query = QSqlQuery(db)
+    for version, statements in sorted(migrations, key=lambda m: m[0]):
+        if version <= current_version:
+            continue
+        if not db.transaction():
+            raise Exception(
+                f"[run_migrations] Cannot start transaction: {db.lastError().text()}"
+            )
+        for sql in statements + [f"PRAGMA user_version = {int(version)};"]:
+            if not query.exec(sql):
+                error_text = query.lastError().text()
+                db.rollback()
+                raise Exception(
+                    f"[run_migrations] Migration to version {version} failed on '{sql.strip()}': {error_text}"
+                )
+        if not db.commit():
+            db.rollback()
+            raise Exception(
+                f"[run_migrations] Cannot commit migration to version {version}: {db.lastError().text()}"
+            )
+        print(
+            f"[run_migrations] '{db.connectionName()}' migrated to version {version}."
+        )
+        current_version = version
+    return current_version
@@ -0,0 +1,73 @@
+# src/database/pragmas.py
+from typing import Any, Dict, List, Optional
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from src.my_constants import SQLITE_PRAGMA_PROFILE, SQLITE_MAINTENANCE_INTERVAL_MS
+
+
+def apply_pragmas(db: QSqlDatabase, profile: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Applies foreign_keys/WAL and the PRAGMA profile (SQLITE_PRAGMA_PROFILE by
+    default) to an open connection. These settings are per connection, so this
+    has to run for every connection that is opened, not once per file.
+    """
+    query = QSqlQuery(db)
+    statements = ["PRAGMA foreign_keys = ON;", "PRAGMA journal_mode = WAL;"]
+    for name, value in (SQLITE_PRAGMA_PROFILE if profile is None else profile).items():
+        statements.append(f"PRAGMA {name} = {value};")
+    success = True
+    for sql in statements:
+        if not query.exec(sql):
+            print(
+                f"[apply_pragmas] '{db.connectionName()}' failed on '{sql}': {query.lastError().text()}"
+            )
+            success = False
+    return success
+
+
+def run_maintenance(db: QSqlDatabase) -> bool:
+    """PRAGMA optimize then a PASSIVE WAL checkpoint (never blocks writers)."""
+    if not db.isOpen():
+        return False
+    query = QSqlQuery(db)
+    for sql in ["PRAGMA optimize;", "PRAGMA wal_checkpoint(PASSIVE);"]:
+        if not query.exec(sql):
+            print(
+                f"[run_maintenance] '{db.connectionName()}' failed on '{sql}': {query.lastError().text()}"
+            )
+            return False
+        while query.next():
+            pass
+    return True
+
+
+class DatabaseMaintenance(QObject):
+    """
+    Runs run_maintenance() on the given connections every `interval_ms`.
+    Lives in the thread that owns the connections (the GUI thread).
+    """
+
+    def __init__(
+        self,
+        connection_names: List[str],
+        interval_ms: int = SQLITE_MAINTENANCE_INTERVAL_MS,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._connection_names = connection_names
+        self._interval_ms = interval_ms
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.run_now)
+
+    def start(self):
+        if self._interval_ms > 0:
+            self._timer.start(self._interval_ms)
+
+    def stop(self):
+        self._timer.stop()
+
+    def run_now(self):
+        for connection_name in self._connection_names:
+            if QSqlDatabase.contains(connection_name):
+                run_maintenance(QSqlDatabase.database(connection_name))
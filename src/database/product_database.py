@@ -5,6 +5,8 @@ from src.my_constants import (
     CONNECTION_DB_PRODUCT,
     PATH_DB_PRODUCT,
 )
+from src.database.pragmas import apply_pragmas
+from src.database.migrations import PRODUCT_MIGRATIONS, run_migrations
 from src.database.sql_commands import (
     CREATE_REAL_ESTATE_PRODUCT_TABLE,
     CREATE_MISC_PRODUCT_TABLE,
@@ -23,9 +25,8 @@ def initialize_product_database():
         raise Exception(
             f"An error occurred while opening the database: {db.lastError().text()}"
         )
+    apply_pragmas(db)
     query = QSqlQuery(db)
-    query.exec("PRAGMA foreign_keys = ON;")
-    query.exec("PRAGMA journal_mode = WAL;")
 
     try:
         if db.transaction():
@@ -44,6 +45,7 @@ def initialize_product_database():
                 raise Exception(
                     f"[initialize_product_database] Cannot commit transaction: {db.lastError().text()}"
                 )
+            run_migrations(db, PRODUCT_MIGRATIONS)
             return True
         else:
             return False
@@ -5,6 +5,8 @@ from src.my_constants import (
     CONNECTION_DB_SETTING,
     PATH_DB_SETTING,
 )
+from src.database.pragmas import apply_pragmas
+from src.database.migrations import SETTING_MIGRATIONS, run_migrations
 from src.database.sql_commands import (
     CREATE_SETTING_UDD_TABLE,
     CREATE_SETTING_PROXY_TABLE,
@@ -22,9 +24,8 @@ def initialize_setting_database():
         raise Exception(
             f"An error occurred while opening the database: {db.lastError().text()}"
         )
+    apply_pragmas(db)
     query = QSqlQuery(db)
-    query.exec("PRAGMA foreign_keys = ON;")
-    query.exec("PRAGMA journal_mode = WAL;")
 
     try:
         if db.transaction():
@@ -42,6 +43,7 @@ def initialize_setting_database():
                 raise Exception(
                     f"[initialize_setting_database] Cannot commit transaction: {db.lastError().text()}"
                 )
+            run_migrations(db, SETTING_MIGRATIONS)
             return True
         else:
             return False
@@ -113,3 +113,53 @@ CREATE TABLE IF NOT EXISTS {constants.TABLE_REAL_ESTATE_TEMPLATE} (
 # giả sử tôi sử dụng 3 bản để hiển thị (constants.TABLE_USER,
 # constants.TABLE_USER_LISTED_PRODUCT,
 # constants.TABLE_USER_ACTION,) làm cách nào để thay đổi đồng bộ
+
+# ---------------------------------------------------------------------------
+# Migrations (applied in order by src/database/migrations.py, the current
+# version is stored in PRAGMA user_version of each database file)
+# ---------------------------------------------------------------------------
+ADD_REAL_ESTATE_PRODUCT_UPDATED_AT_JD_COLUMN = f"""
+ALTER TABLE {constants.TABLE_REAL_ESTATE_PRODUCT}
+ADD COLUMN updated_at_jd REAL GENERATED ALWAYS AS (julianday(updated_at)) VIRTUAL
+"""
+CREATE_REAL_ESTATE_PRODUCT_RANDOM_INDEX = f"""
+CREATE INDEX IF NOT EXISTS idx_{constants.TABLE_REAL_ESTATE_PRODUCT}_type_status_updated
+ON {constants.TABLE_REAL_ESTATE_PRODUCT} (transaction_type, status, updated_at_jd)
+"""
+CREATE_REAL_ESTATE_TEMPLATE_LOOKUP_INDEX = f"""
+CREATE INDEX IF NOT EXISTS idx_{constants.TABLE_REAL_ESTATE_TEMPLATE}_lookup
+ON {constants.TABLE_REAL_ESTATE_TEMPLATE} (part, transaction_type, category, is_default)
+"""
+CREATE_USER_LISTED_PRODUCT_USER_INDEX = f"""
+CREATE INDEX IF NOT EXISTS idx_{constants.TABLE_USER_LISTED_PRODUCT}_id_user
+ON {constants.TABLE_USER_LISTED_PRODUCT} (id_user)
+"""
+CREATE_ROBOT_TASK_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {constants.TABLE_ROBOT_TASK} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    uid TEXT,
+    action_name TEXT,
+    task_data TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    retry_count INTEGER NOT NULL DEFAULT 0,
+    last_proxy TEXT,
+    last_message TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now')),
+    UNIQUE (run_id, task_id)
+)
+"""
+CREATE_ROBOT_TASK_RUN_STATUS_INDEX = f"""
+CREATE INDEX IF NOT EXISTS idx_{constants.TABLE_ROBOT_TASK}_run_status
+ON {constants.TABLE_ROBOT_TASK} (run_id, status)
+"""
+CREATE_CHECK_LIVE_CACHE_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {constants.TABLE_CHECK_LIVE_CACHE} (
+    uid TEXT PRIMARY KEY,
+    is_live INTEGER,
+    checked_at REAL,
+    error TEXT
+)
+"""
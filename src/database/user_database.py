@@ -5,6 +5,8 @@ from src.my_constants import (
     CONNECTION_DB_USER,
     PATH_DB_USER,
 )
+from src.database.pragmas import apply_pragmas
+from src.database.migrations import USER_MIGRATIONS, run_migrations
 from src.database.sql_commands import (
     CREATE_USER_TABLE,
     CREATE_USER_LISTED_PRODUCT_TABLE,
@@ -23,9 +25,8 @@ def initialize_user_database():
             f"An error occurred while opening the database: {db.lastError().text()}"
         )
 
+    apply_pragmas(db)
     query = QSqlQuery(db)
-    query.exec("PRAGMA foreign_keys = ON;")
-    query.exec("PRAGMA journal_mode = WAL;")
     try:
         if db.transaction():
             for sql in [
@@ -43,6 +44,7 @@ def initialize_user_database():
                 raise Exception(
                     f"[initialize_db_user] Cannot commit transaction: {db.lastError().text()}"
                 )
+            run_migrations(db, USER_MIGRATIONS)
             return True
         else:
             return False
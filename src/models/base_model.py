@@ -1,16 +1,41 @@
 # src/models/base_model.py
-from typing import List, Any
+from contextlib import contextmanager
+from typing import List, Any, Dict, Iterable, Optional, Set
 from PyQt6.QtSql import QSqlTableModel
-from PyQt6.QtCore import Qt, QModelIndex
+from PyQt6.QtCore import Qt, QModelIndex, QThread, pyqtSignal
 from PyQt6.QtGui import QBrush, QColor
 
 
 class BaseModel(QSqlTableModel):
+    # Above this many affected rows a single select() is cheaper than selectRow()
+    REFRESH_ROWS_LIMIT = 200
+    # Refresh requests made from worker threads, delivered on the model's thread
+    _refresh_records_requested = pyqtSignal(list)
+    _select_requested = pyqtSignal()
+
     def __init__(self, table_name, db, parent=None):
         super().__init__(parent, db=db)
         self.setTable(table_name)
         self.setEditStrategy(QSqlTableModel.EditStrategy.OnManualSubmit)
         self.status_col = self.fieldIndex("status")
+        # key column name -> {value: row} and row -> value. Built lazily, then
+        # patched on fetchMore/setData/selectRow and dropped on reset/remove.
+        self._key_indexes: Dict[str, Dict[Any, int]] = {}
+        self._key_values: Dict[str, List[Any]] = {}
+        self._refresh_depth = 0
+        self._pending_refresh_ids: Set[Any] = set()
+        self._pending_select = False
+        self.modelReset.connect(self._invalidate_key_indexes)
+        self.layoutChanged.connect(self._invalidate_key_indexes)
+        self.rowsRemoved.connect(self._invalidate_key_indexes)
+        self.rowsInserted.connect(self._on_rows_inserted)
+        self.dataChanged.connect(self._on_data_changed)
+        self._refresh_records_requested.connect(
+            self._on_refresh_records_requested, Qt.ConnectionType.QueuedConnection
+        )
+        self._select_requested.connect(
+            self._on_select_requested, Qt.ConnectionType.QueuedConnection
+        )
         self.select()
         # self.dataChanged.connect(lambda : print(f"rowCount: {self.rowCount()}"))
 
@@ -54,13 +79,156 @@ class BaseModel(QSqlTableModel):
         return ids
 
     def get_row_by_id(self, db_id: Any) -> int:
-        id_col_index = self.fieldIndex("id")
-        if id_col_index == -1:
-            print("[BaseModel] 'id' field not found for search.")
+        return self.find_row_by_key("id", db_id)
+
+    def find_row_by_key(self, key_name: str, value: Any) -> int:
+        """
+        Returns the row holding `value` in column `key_name` or -1.
+        Lookups go through a hash index built once per select/remove and
+        patched in place on fetchMore/insertRow/setData; rows not fetched yet
+        are pulled in before reporting a miss.
+        """
+        if value is None:
+            return -1
+        key_index = self._get_key_index(key_name)
+        if key_index is None:
+            print(
+                f"[{self.__class__.__name__}] '{key_name}' field not found for search."
+            )
             return -1
+        row = key_index.get(value, -1)
+        if row == -1 and self.canFetchMore():
+            while self.canFetchMore():
+                self.fetchMore()
+            row = self._get_key_index(key_name).get(value, -1)
+        return row
 
+    def refresh_records(self, record_ids: Iterable[Any]):
+        """
+        Re-reads only the loaded rows holding `record_ids` (selectRow emits
+        dataChanged for each), or does one select() past REFRESH_ROWS_LIMIT.
+        Inside deferred_refresh() the ids are collected and refreshed on exit.
+        Called from another thread, the refresh is queued to the model's thread.
+        """
+        if QThread.currentThread() != self.thread():
+            self._refresh_records_requested.emit(list(record_ids))
+            return
+        if self._refresh_depth:
+            self._pending_refresh_ids.update(record_ids)
+            return
+        id_index = self._get_key_index("id")
+        if id_index is None:
+            self.select()
+            return
+        rows = {
+            id_index[record_id] for record_id in record_ids if record_id in id_index
+        }
+        if len(rows) > self.REFRESH_ROWS_LIMIT:
+            self.select()
+            return
+        for row in sorted(rows):
+            self.selectRow(row)
+
+    def request_select(self):
+        """select(), postponed to the end of deferred_refresh() if inside one,
+        or queued to the model's thread when called from another thread."""
+        if QThread.currentThread() != self.thread():
+            self._select_requested.emit()
+            return
+        if self._refresh_depth:
+            self._pending_select = True
+            return
+        self.select()
+
+    def _release_read_snapshot(self):
+        """
+        Workers write through their own connections. While a select() is only
+        partially fetched its statement keeps a WAL read snapshot open on this
+        connection, which hides those writes, so fetch it to the end first.
+        """
+        while self.canFetchMore():
+            self.fetchMore()
+
+    def _on_refresh_records_requested(self, record_ids: List[Any]):
+        self._release_read_snapshot()
+        self.refresh_records(record_ids)
+
+    def _on_select_requested(self):
+        self.request_select()
+        self._release_read_snapshot()
+
+    @contextmanager
+    def deferred_refresh(self):
+        """Coalesces refresh_records/request_select calls made inside the block
+        into a single refresh when the outermost block exits."""
+        self._refresh_depth += 1
+        try:
+            yield self
+        finally:
+            self._refresh_depth -= 1
+            if self._refresh_depth == 0:
+                pending_ids, self._pending_refresh_ids = (
+                    self._pending_refresh_ids,
+                    set(),
+                )
+                pending_select, self._pending_select = self._pending_select, False
+                if pending_select:
+                    self.select()
+                elif pending_ids:
+                    self.refresh_records(pending_ids)
+
+    def _get_key_index(self, key_name: str) -> Optional[Dict[Any, int]]:
+        key_index = self._key_indexes.get(key_name)
+        if key_index is not None:
+            return key_index
+        col_index = self.fieldIndex(key_name)
+        if col_index == -1:
+            return None
+        key_index = {}
+        key_values = []
         for row in range(self.rowCount()):
-            index = self.index(row, id_col_index)
-            if self.data(index) == db_id:
-                return row
-        return -1
+            value = QSqlTableModel.data(self, self.index(row, col_index))
+            key_values.append(value)
+            if value is not None:
+                key_index.setdefault(value, row)
+        self._key_indexes[key_name] = key_index
+        self._key_values[key_name] = key_values
+        return key_index
+
+    def _invalidate_key_indexes(self, *args):
+        self._key_indexes.clear()
+        self._key_values.clear()
+
+    def _on_rows_inserted(self, parent: QModelIndex, first: int, last: int):
+        for key_name, key_values in list(self._key_values.items()):
+            if first != len(key_values):
+                # Not an append (fetchMore/insertRow at the end): rows shifted.
+                self._invalidate_key_indexes()
+                return
+            key_index = self._key_indexes[key_name]
+            col_index = self.fieldIndex(key_name)
+            for row in range(first, last + 1):
+                value = QSqlTableModel.data(self, self.index(row, col_index))
+                key_values.append(value)
+                if value is not None:
+                    key_index.setdefault(value, row)
+
+    def _on_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, *args):
+        for key_name, key_values in list(self._key_values.items()):
+            col_index = self.fieldIndex(key_name)
+            if not top_left.column() <= col_index <= bottom_right.column():
+                continue
+            key_index = self._key_indexes[key_name]
+            for row in range(top_left.row(), bottom_right.row() + 1):
+                if row >= len(key_values):
+                    self._invalidate_key_indexes()
+                    return
+                value = QSqlTableModel.data(self, self.index(row, col_index))
+                old_value = key_values[row]
+                if value == old_value:
+                    continue
+                if old_value is not None and key_index.get(old_value) == row:
+                    del key_index[old_value]
+                key_values[row] = value
+                if value is not None:
+                    key_index.setdefault(value, row)
@@ -21,16 +21,7 @@ class RealEstateProductModel(BaseModel):
         super().__init__(TABLE_REAL_ESTATE_PRODUCT, db, parent)
 
     def find_row_by_pid(self, pid: str) -> int:
-        pid_col_index = self.fieldIndex("pid")
-        if pid_col_index == -1:
-            print("[BaseModel] 'pid' field not found for search.")
-
-            return -1
-        for row in range(self.rowCount()):
-            index = self.index(row, pid_col_index)
-            if self.data(index) == pid:
-                return row
-        return -1
+        return self.find_row_by_key("pid", pid)
 
 
 class MiscProductModel(BaseModel):
@@ -44,16 +35,7 @@ class MiscProductModel(BaseModel):
         super().__init__(TABLE_MISC_PRODUCT, db, parent)
 
     def find_row_by_pid(self, pid: str) -> int:
-        pid_col_index = self.fieldIndex("pid")
-        if pid_col_index == -1:
-            print("[BaseModel] 'pid' field not found for search.")
-
-            return -1
-        for row in range(self.rowCount()):
-            index = self.index(row, pid_col_index)
-            if self.data(index) == pid:
-                return row
-        return -1
+        return self.find_row_by_key("pid", pid)
 
 
 class RealEstateTemplateModel(BaseModel):
@@ -67,13 +49,4 @@ class RealEstateTemplateModel(BaseModel):
         # self.setEditStrategy(QSqlTableModel.EditStrategy.OnFieldChange)
 
     def find_row_by_tid(self, tid: str) -> int:
-        tid_col_index = self.fieldIndex("tid")
-        if tid_col_index == -1:
-            print("[BaseModel] 'tid' field not found for search.")
-
-            return -1
-        for row in range(self.rowCount()):
-            index = self.index(row, tid_col_index)
-            if self.data(index) == tid:
-                return row
-        return -1
+        return self.find_row_by_key("tid", tid)
@@ -18,34 +18,21 @@ class UserModel(BaseModel):
         super().__init__(TABLE_USER, db, parent)
 
     def find_row_by_uid(self, uid: str) -> int:
-        uid_col_index = self.fieldIndex("uid")
-        if uid_col_index == -1:
-            print(
-                f"[{self.__class__.__name__}.find_row_by_uid] 'uid' field not found for search."
-            )
-            return -1
-
-        for row in range(self.rowCount()):
-            index = self.index(row, uid_col_index)
-            if self.data(index) == uid:
-                return row
-        return -1
+        return self.find_row_by_key("uid", uid)
 
     def get_uids_by_record_ids(self, record_ids: List[int]) -> List[str]:
         uid_col_index = self.fieldIndex("uid")
-        id_col_index = self.fieldIndex("id")
-        if uid_col_index == -1 or id_col_index == -1:
+        if uid_col_index == -1 or self.fieldIndex("id") == -1:
             print(
                 f"[{self.__class__.__name__}.get_uids_by_record_ids] 'uid' or 'id' field not found for search."
             )
             return []
 
         uids = []
-        for row in range(self.rowCount()):
-            id_index = self.index(row, id_col_index)
-            uid_index = self.index(row, uid_col_index)
-            if self.data(id_index) in record_ids:
-                uids.append(self.data(uid_index))
+        for record_id in record_ids:
+            row = self.get_row_by_id(record_id)
+            if row != -1:
+                uids.append(self.data(self.index(row, uid_col_index)))
         return uids
 
 
@@ -12,6 +12,20 @@ PATH_DB_USER = os.getenv("PATH_DB_USER")
 PATH_DB_PRODUCT = os.getenv("PATH_DB_PRODUCT")
 PATH_DB_SETTING = os.getenv("PATH_DB_SETTING")
 
+# Applied to every connection by database/pragmas.py (after foreign_keys/WAL).
+# cache_size < 0 is in KiB, mmap_size is in bytes, busy_timeout in ms.
+SQLITE_PRAGMA_PROFILE = {
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -20000)),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 268435456)),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)),
+}
+# PRAGMA optimize + wal_checkpoint(PASSIVE) period, 0 disables the job
+SQLITE_MAINTENANCE_INTERVAL_MS = int(
+    os.getenv("SQLITE_MAINTENANCE_INTERVAL_MS", 15 * 60 * 1000)
+)
+
 TABLE_USER = "user"
 TABLE_USER_LISTED_PRODUCT = "listed_products"
 TABLE_USER_ACTION = "user_actions"
@@ -20,6 +34,140 @@ TABLE_SETTING_PROXY = "proxy"
 TABLE_REAL_ESTATE_PRODUCT = "real_estate_product"
 TABLE_MISC_PRODUCT = "misc"
 TABLE_REAL_ESTATE_TEMPLATE = "real_estate_template"
+TABLE_ROBOT_TASK = "robot_task"
+TABLE_CHECK_LIVE_CACHE = "check_live_cache"
+
+# Batched import (BaseService.bulk_import)
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 500))
+# "fail": rollback on duplicate pid/uid, "skip": keep the existing row,
+# "replace": update the existing row in place (it keeps its id and created_at)
+IMPORT_ON_CONFLICT = os.getenv("IMPORT_ON_CONFLICT", "fail")
+
+# Random product/template selection (services/sampler.py)
+# "uniform", "recency" (recently updated rows are more likely) or "lru"
+# (every candidate is used once before any of them repeats)
+SAMPLER_WEIGHTING = os.getenv("SAMPLER_WEIGHTING", "uniform")
+# Cached buckets are reloaded after this many seconds even without changes,
+# so the "updated in the last 7 days" product window keeps moving.
+SAMPLER_TTL_SECONDS = float(os.getenv("SAMPLER_TTL_SECONDS", 300))
+
+# Robot: seconds a persistent context stays open after its account's last task
+# (robot/context_pool.py); its worker waits that long for the account's next
+# task, then closes it. 0 closes it as soon as no task of the account follows.
+BROWSER_CONTEXT_IDLE_SECONDS = float(os.getenv("BROWSER_CONTEXT_IDLE_SECONDS", 30))
+
+# Robot task scheduling (robot/scheduler.py). Lower priority numbers run first,
+# actions missing here get SCHEDULER_DEFAULT_PRIORITY.
+ROBOT_ACTION_PRIORITIES = {
+    "launch_browser": 0,
+    "list_on_marketplace": 5,
+    "marketplace": 5,
+    "list_on_group_and_share": 5,
+    "share_latest_product": 7,
+    "discussion": 7,
+    "join_groups": 9,
+}
+SCHEDULER_DEFAULT_PRIORITY = int(os.getenv("SCHEDULER_DEFAULT_PRIORITY", 10))
+# A profile can only be opened once, so more than 1 only queues on the udd lock
+SCHEDULER_MAX_TASKS_PER_ACCOUNT = int(os.getenv("SCHEDULER_MAX_TASKS_PER_ACCOUNT", 1))
+# An account passed over this many times in a row is served next (0: never)
+SCHEDULER_STARVATION_LIMIT = int(os.getenv("SCHEDULER_STARVATION_LIMIT", 50))
+
+# Robot proxy leases (robot/proxy_lease.py), durations in seconds.
+# PROXY_COOLDOWN_SECONDS doubles on consecutive "not ready" answers (status 101)
+# up to PROXY_MAX_COOLDOWN_SECONDS; a proxy whose health (0-100) falls under
+# PROXY_MIN_HEALTH is set aside for PROXY_QUARANTINE_SECONDS.
+PROXY_MAX_CONCURRENCY = int(os.getenv("PROXY_MAX_CONCURRENCY", 1))
+PROXY_COOLDOWN_SECONDS = float(os.getenv("PROXY_COOLDOWN_SECONDS", 10))
+PROXY_MAX_COOLDOWN_SECONDS = float(os.getenv("PROXY_MAX_COOLDOWN_SECONDS", 120))
+PROXY_UNAVAILABLE_COOLDOWN_SECONDS = float(
+    os.getenv("PROXY_UNAVAILABLE_COOLDOWN_SECONDS", 60)
+)
+PROXY_MIN_HEALTH = int(os.getenv("PROXY_MIN_HEALTH", 20))
+PROXY_QUARANTINE_SECONDS = float(os.getenv("PROXY_QUARANTINE_SECONDS", 300))
+# Rotation API client (utils/proxy_client.py). A credential returned by the API is
+# reused for the provider's rotation window (PROXY_ROTATION_SECONDS for proxyxoay,
+# see utils/proxy_providers.py) when PROXY_REUSE_CREDENTIALS, otherwise the lease
+# manager keeps an idle proxy until its window is over. A proxy that is no longer
+# leased is rotated in the background once its window is over when PROXY_PREFETCH.
+PROXY_API_TIMEOUT_SECONDS = int(os.getenv("PROXY_API_TIMEOUT_SECONDS", 60))
+PROXY_ROTATION_SECONDS = float(os.getenv("PROXY_ROTATION_SECONDS", 60))
+PROXY_REUSE_CREDENTIALS = os.getenv("PROXY_REUSE_CREDENTIALS", "1") == "1"
+PROXY_PREFETCH = os.getenv("PROXY_PREFETCH", "1") == "1"
+# Requests to one rotating provider's API, over all of its proxies: at most
+# PROXY_API_MAX_REQUESTS at once and PROXY_API_REQUESTS_PER_SECOND (0 for no
+# limit), unless the provider declares its own limits.
+PROXY_API_MAX_REQUESTS = int(os.getenv("PROXY_API_MAX_REQUESTS", 4))
+PROXY_API_REQUESTS_PER_SECOND = float(os.getenv("PROXY_API_REQUESTS_PER_SECOND", 0))
+
+# Robot execution engine: "thread" (one BrowserWorker thread per browser) or
+# "async" (actions with a coroutine variant run on one asyncio loop, see
+# robot/async_engine.py; only launch_browser and list_on_marketplace have one,
+# every other action still uses a thread)
+ROBOT_ENGINE = os.getenv("ROBOT_ENGINE", "thread")
+ASYNC_ENGINE_MAX_CONCURRENCY = int(os.getenv("ASYNC_ENGINE_MAX_CONCURRENCY", 32))
+# More than 1 runs the robot in that many child processes (robot/process_runner.py),
+# the GUI process only collects their events every ROBOT_PROCESS_POLL_MS
+ROBOT_PROCESS_SHARDS = int(os.getenv("ROBOT_PROCESS_SHARDS", 0))
+ROBOT_PROCESS_POLL_MS = int(os.getenv("ROBOT_PROCESS_POLL_MS", 100))
+# Screen size used to place browser windows when there is no screen (headless CLI)
+DEFAULT_SCREEN_SIZE = (1920, 1080)
+# Persistent robot task queue (robot/task_store.py, table in the user DB) so a
+# run can be resumed after a crash. State changes are written in one batch once
+# TASK_STORE_FLUSH_SIZE are buffered or TASK_STORE_FLUSH_MS after the first one.
+ROBOT_TASK_STORE = os.getenv("ROBOT_TASK_STORE", "1") == "1"
+TASK_STORE_FLUSH_MS = int(os.getenv("TASK_STORE_FLUSH_MS", 1000))
+TASK_STORE_FLUSH_SIZE = int(os.getenv("TASK_STORE_FLUSH_SIZE", 200))
+# Task results (robot/result_sink.py): JSON Lines appended to RESULTS_DIR/results-<pid>.jsonl
+# by one writer thread, fsynced every RESULT_SINK_FSYNC_SECONDS and rotated once
+# the file reaches RESULT_SINK_MAX_BYTES. Workers wait when the queue is full.
+RESULTS_DIR = os.getenv("RESULTS_DIR", "results")
+RESULT_SINK_QUEUE_SIZE = int(os.getenv("RESULT_SINK_QUEUE_SIZE", 10000))
+RESULT_SINK_FSYNC_SECONDS = float(os.getenv("RESULT_SINK_FSYNC_SECONDS", 1.0))
+RESULT_SINK_MAX_BYTES = int(os.getenv("RESULT_SINK_MAX_BYTES", 50 * 1024 * 1024))
+
+# Check live (services/check_live.py). "multi" keeps CHECK_LIVE_CONCURRENCY requests
+# in flight on one thread with pycurl.CurlMulti (handles and connections are reused),
+# "thread" does one blocking request per thread. CheckLive has its own pool of
+# CHECK_LIVE_THREADS threads, the global pool (browsers) is left alone.
+CHECK_LIVE_ENGINE = os.getenv("CHECK_LIVE_ENGINE", "multi")
+CHECK_LIVE_URL = os.getenv(
+    "CHECK_LIVE_URL", "https://graph.facebook.com/{uid}/picture?redirect=false"
+)
+CHECK_LIVE_THREADS = int(os.getenv("CHECK_LIVE_THREADS", 5))
+CHECK_LIVE_CONCURRENCY = int(os.getenv("CHECK_LIVE_CONCURRENCY", 200))
+# Connections per host (0 = no limit), HTTP/2 requests share them when possible
+CHECK_LIVE_MAX_HOST_CONNECTIONS = int(os.getenv("CHECK_LIVE_MAX_HOST_CONNECTIONS", 20))
+# Requests started per second, 0 = no limit
+CHECK_LIVE_RATE_PER_SECOND = float(os.getenv("CHECK_LIVE_RATE_PER_SECOND", 0))
+# Results are sent to the GUI thread by CHECK_LIVE_BATCH_SIZE or every CHECK_LIVE_BATCH_MS
+CHECK_LIVE_BATCH_SIZE = int(os.getenv("CHECK_LIVE_BATCH_SIZE", 100))
+CHECK_LIVE_BATCH_MS = int(os.getenv("CHECK_LIVE_BATCH_MS", 200))
+# Last result per uid (services/check_live_cache.py, table in the user DB). Uids
+# checked less than CHECK_LIVE_CACHE_TTL_SECONDS ago are not checked again, 0 disables.
+CHECK_LIVE_CACHE_TTL_SECONDS = float(
+    os.getenv("CHECK_LIVE_CACHE_TTL_SECONDS", 6 * 3600)
+)
+# User status changes are written together, CHECK_LIVE_WRITE_BACK_SIZE changes
+# or CHECK_LIVE_WRITE_BACK_MS after the first one
+CHECK_LIVE_WRITE_BACK_SIZE = int(os.getenv("CHECK_LIVE_WRITE_BACK_SIZE", 500))
+CHECK_LIVE_WRITE_BACK_MS = int(os.getenv("CHECK_LIVE_WRITE_BACK_MS", 1000))
+
+# Viotp phone numbers and OTP codes (utils/get_phonenumber.py, services/otp_poller.py).
+# VIOTP_TOKEN lets the robot get a number and its code by itself instead of asking
+# the user. The service list is cached for VIOTP_SERVICE_CACHE_SECONDS. Outstanding
+# requests are polled every VIOTP_POLL_INTERVAL_SECONDS, the interval grows by
+# VIOTP_POLL_BACKOFF after each poll without a code (doubles after an error) up to
+# VIOTP_POLL_MAX_INTERVAL_SECONDS, and a request is dropped after VIOTP_OTP_TIMEOUT_SECONDS.
+VIOTP_TOKEN = os.getenv("VIOTP_TOKEN", "")
+VIOTP_SERVICE_NAME = os.getenv("VIOTP_SERVICE_NAME", "facebook")
+VIOTP_SERVICE_CACHE_SECONDS = float(os.getenv("VIOTP_SERVICE_CACHE_SECONDS", 3600))
+VIOTP_POLL_INTERVAL_SECONDS = float(os.getenv("VIOTP_POLL_INTERVAL_SECONDS", 5))
+VIOTP_POLL_BACKOFF = float(os.getenv("VIOTP_POLL_BACKOFF", 1.2))
+VIOTP_POLL_MAX_INTERVAL_SECONDS = float(
+    os.getenv("VIOTP_POLL_MAX_INTERVAL_SECONDS", 15)
+)
+VIOTP_OTP_TIMEOUT_SECONDS = float(os.getenv("VIOTP_OTP_TIMEOUT_SECONDS", 300))
 
 RE_CONTACT = {
     "phone_number": "0375155525",
@@ -134,6 +134,12 @@ class BrowserTaskType(RobotTaskType):
     headless: bool
     udd: str
     browser_id: str
+    # Scheduling hints (robot/scheduler.py): priority overrides the action's
+    # class, deadline is an epoch timestamp for time-sensitive posts
+    priority: Optional[int] = None
+    deadline: Optional[float] = None
+    # Row of the task in the persistent queue (robot/task_store.py)
+    task_id: Optional[str] = None
 
 
 @dataclass
@@ -144,6 +150,8 @@ class RobotSettingsType:
     group_num: int
     delay_num: float
     group_file_path: str
+    # Run an account's actions back to back in one worker, reusing its context
+    group_by_account: bool = False
 
 
 class BrowserWorkerSignals(QObject):
@@ -155,6 +163,11 @@ class BrowserWorkerSignals(QObject):
     finished_signal = pyqtSignal(BrowserTaskType, str, str)
     proxy_unavailable_signal = pyqtSignal(BrowserTaskType, str)
     proxy_not_ready_signal = pyqtSignal(BrowserTaskType, str)
+    # A follow-up task that did not run (an earlier task of the account ended
+    # the worker's chain) goes back to the queue, nothing is held against it
+    requeue_signal = pyqtSignal(BrowserTaskType)
+    # The page work is done, the proxy can serve another task (see proxy_lease.py)
+    proxy_released_signal = pyqtSignal(BrowserTaskType, str)
     require_phone_number_signal = pyqtSignal(BrowserTaskType)
     require_otp_code_signal = pyqtSignal(BrowserTaskType)
 
@@ -8,6 +8,12 @@ from src.robot.actions.fb_list_on_marketplace import list_on_marketplace
 from src.robot.actions.fb_share_latest_product import share_latest_product
 from src.robot.actions.fb_join_groups import join_groups
 from src.robot.actions.fb_list_on_marketplace_group import list_on_marketplace_group
+from src.robot.actions_async.launch_browser import (
+    launch_browser as async_launch_browser,
+)
+from src.robot.actions_async.fb_list_on_marketplace import (
+    list_on_marketplace as async_list_on_marketplace,
+)
 
 ACTION_MAP: Dict[str, Callable] = {
     "marketplace": marketplace,
@@ -18,3 +24,11 @@ ACTION_MAP: Dict[str, Callable] = {
     "share_latest_product": share_latest_product,
     "join_groups": join_groups,
 }
+
+# Coroutine variants run by AsyncBrowserEngine (robot/async_engine.py), in
+# src/robot/actions_async/. Actions missing here (discussion, marketplace &
+# share, group listings, ...) always run on a BrowserWorker thread.
+ASYNC_ACTION_MAP: Dict[str, Callable] = {
+    "launch_browser": async_launch_browser,
+    "list_on_marketplace": async_list_on_marketplace,
+}
@@ -58,6 +58,8 @@ def fb_create_account(
                 )
 
         # stage ?: request phone_number
+        # Số điện thoại và mã OTP do người dùng cung cấp: các bước điền form
+        # (số điện thoại, gửi, mã OTP) chưa có nên chưa dùng OtpPoller ở đây
         signals.require_phone_number_signal.emit(task)
         # state ?: await otp
 
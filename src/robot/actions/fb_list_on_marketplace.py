@@ -219,7 +219,8 @@ def list_on_marketplace(
                 page, selectors.S_PUBLISH_BUTTON, 30_000
             )
             sleep(60)
-            return False
+            # Đã bấm Publish: tin đã đăng, không phải lỗi (False = thất bại)
+            return True
         return True
     except Exception as e:
         if "ERR_PROXY_NOT_READY" == str(e) or "ERR_TIMED_OUT" in str(e):
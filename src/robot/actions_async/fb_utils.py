@@ -0,0 +1,73 @@
+# src/robot/actions_async/fb_utils.py
+# Async variant of src/robot/actions/fb_utils.py for AsyncBrowserEngine.
+import asyncio
+import random
+import sys
+from typing import Any
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError, Locator
+from src.robot import selector_constants as selectors
+from src.robot.actions.fb_utils import except_handle
+
+MIN = 60_000
+
+
+async def close_dialog(page: Page):
+    try:
+        dialog_locators = page.locator(selectors.S_DIALOG)
+        for dialog_locator in await dialog_locators.all():
+            if await dialog_locator.is_visible() and await dialog_locator.is_enabled():
+                close_button_locators = dialog_locator.locator(selectors.S_CLOSE_BUTTON)
+                await asyncio.sleep(random.uniform(0.2, 1.5))
+                await close_button_locators.last.click(timeout=MIN)
+                await dialog_locator.wait_for(state="detached", timeout=MIN)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+    except Exception as e:
+        print(
+            f"ERROR: An unexpected error occurred while closing dialog: {e}",
+            file=sys.stderr,
+        )
+        return False
+
+
+async def click_button(page: Page, btn_selector: Any, timeout: int) -> dict:
+    btn_locator = page.locator(btn_selector)
+
+    async def try_click_btn(locator: Locator, current_timeout: int) -> dict:
+        try:
+            await locator.wait_for(state="visible", timeout=current_timeout)
+            await locator.wait_for(state="attached", timeout=current_timeout)
+            await asyncio.sleep(random.uniform(0.2, 1.5))
+            await locator.first.click(timeout=current_timeout)
+            return {
+                "status": True,
+                "message": "Clicked button successfully.",
+            }
+
+        except PlaywrightTimeoutError as e:
+            except_handle(e)
+            return {
+                "status": False,
+                "message": f"Could not click button within {current_timeout/1000}s.",
+            }
+        except Exception as e:
+            except_handle(e)
+            return {
+                "status": False,
+                "message": f"Unexpected error when clicking button: {e}",
+            }
+
+    clicked_result = await try_click_btn(btn_locator, timeout)
+    if clicked_result["status"]:
+        return clicked_result
+
+    await close_dialog(page)
+    return await try_click_btn(btn_locator, timeout)
+
+
+def redirect_out_049(page: Page) -> int:
+    """1 if the page is not the checkpoint, 0 if it is (same as the sync variant)."""
+    if "checkpoint/601051028565049" not in page.url:
+        return 1
+    return 0
@@ -0,0 +1,268 @@
+# src/robot/async_engine.py
+import asyncio
+import concurrent.futures
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from playwright.async_api import (
+    Playwright,
+    TimeoutError as PlaywrightTimeoutError,
+    async_playwright,
+)
+from undetected_playwright import Malenia
+
+from src.my_constants import ASYNC_ENGINE_MAX_CONCURRENCY
+from src.my_types import BrowserTaskType, BrowserWorkerSignals, RobotSettingsType
+from src.robot.action_mapping import ASYNC_ACTION_MAP
+from src.robot.context_pool import get_udd_lock
+from src.robot.playwright_driver import is_driver_closed_error
+from src.robot.result_sink import record_task_result
+from src.robot.task_setup import (
+    ACTION_FAILED_MESSAGE,
+    build_context_kwargs,
+    info_page_html,
+    resolve_proxy,
+)
+
+
+class AsyncBrowserEngine:
+    """
+    Runs browser tasks as coroutines on one asyncio loop in a dedicated thread,
+    through playwright.async_api, instead of one QThreadPool thread per
+    browser. Only actions with a coroutine variant (ASYNC_ACTION_MAP) can run
+    here, BrowserManager keeps the others on BrowserWorker.
+
+    Tasks report through the same BrowserWorkerSignals as BrowserWorker (the
+    emits are queued to the manager's thread), so BrowserManager handles both
+    engines' tasks alike. Blocking calls (get_proxy) go to the loop's default
+    executor.
+    """
+
+    def __init__(self, max_concurrency: int = ASYNC_ENGINE_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._playwright: Optional[Playwright] = None
+        self._playwright_lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running = 0
+        self._running_lock = threading.Lock()
+        # asyncio tasks of the running browser tasks (loop thread only)
+        self._tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def supports(browser: BrowserTaskType) -> bool:
+        return browser.action_name in ASYNC_ACTION_MAP
+
+    def running_count(self) -> int:
+        return self._running
+
+    def has_capacity(self) -> bool:
+        return self._running < self.max_concurrency
+
+    # --------------------- lifecycle --------------------- #
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="AsyncBrowserEngine", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._playwright_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def stop(self, timeout: float = 30):
+        """Stops the driver and the loop (running tasks are cancelled)."""
+        if self._loop is None or not self._loop.is_running():
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        try:
+            future.result(timeout)
+        except Exception as e:
+            print(f"[{self.__class__.__name__}.stop] {e!r}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+    async def _shutdown(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _get_playwright(self, restart: bool = False) -> Playwright:
+        async with self._playwright_lock:
+            if restart and self._playwright is not None:
+                try:
+                    await self._playwright.stop()
+                except Exception:
+                    pass
+                self._playwright = None
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            return self._playwright
+
+    # --------------------- tasks --------------------- #
+    def submit(
+        self,
+        browser: BrowserTaskType,
+        raw_proxy: str,
+        signals: BrowserWorkerSignals,
+        settings: RobotSettingsType,
+        worker_position: Optional[Tuple[int, int]],
+        info: Dict[str, Any],
+    ) -> concurrent.futures.Future:
+        self.start()
+        with self._running_lock:
+            self._running += 1
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_task(
+                browser, raw_proxy, signals, settings, worker_position, info
+            ),
+            self._loop,
+        )
+        future.add_done_callback(self._on_task_done)
+        return future
+
+    def _on_task_done(self, future: concurrent.futures.Future):
+        with self._running_lock:
+            self._running -= 1
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[{self.__class__.__name__}] Task error: {future.exception()}")
+
+    async def _acquire_udd_lock(self, udd: str) -> threading.Lock:
+        # Khóa dùng chung với BrowserWorker, chờ mà không chặn event loop
+        udd_lock = get_udd_lock(udd)
+        while not udd_lock.acquire(blocking=False):
+            await asyncio.sleep(0.5)
+        return udd_lock
+
+    async def _run_task(
+        self,
+        browser: BrowserTaskType,
+        raw_proxy: str,
+        signals: BrowserWorkerSignals,
+        settings: RobotSettingsType,
+        worker_position: Optional[Tuple[int, int]],
+        info: Dict[str, Any],
+    ):
+        loop = asyncio.get_running_loop()
+        current_task = asyncio.current_task()
+        self._tasks.add(current_task)
+        context = None
+        udd_lock = None
+        # Tác vụ đã kết thúc bằng tín hiệu lỗi / trả về hàng chờ
+        ended = True
+        try:
+            async with self._semaphore:
+                proxy = await loop.run_in_executor(
+                    None, resolve_proxy, raw_proxy, browser, signals
+                )
+                if proxy == 0:
+                    signals.error_signal.emit(browser, f"Unknown proxy error")
+                    return
+                elif proxy == -1:
+                    signals.proxy_not_ready_signal.emit(browser, raw_proxy)
+                    return
+                elif proxy == -2:
+                    signals.proxy_unavailable_signal.emit(browser, raw_proxy)
+                    return
+
+                username = browser.user_info.username.replace("\n", "")
+                print(
+                    f"[{datetime.now().strftime('%H:%M:%S')}] Started async task for {username} ({info['pending_task_num']} tasks in pending)."
+                )
+                context_kwargs = build_context_kwargs(browser, worker_position)
+                context_kwargs["proxy"] = proxy
+                udd_lock = await self._acquire_udd_lock(browser.udd)
+                try:
+                    playwright = await self._get_playwright()
+                    context = await playwright.chromium.launch_persistent_context(
+                        **context_kwargs
+                    )
+                except Exception as e:
+                    if not is_driver_closed_error(e):
+                        raise
+                    playwright = await self._get_playwright(restart=True)
+                    context = await playwright.chromium.launch_persistent_context(
+                        **context_kwargs
+                    )
+                await Malenia.apply_stealth(context)
+
+                info_page = (
+                    context.pages[0] if context.pages else await context.new_page()
+                )
+                await info_page.set_content(info_page_html(browser))
+                page = await context.new_page()
+                action = ASYNC_ACTION_MAP[browser.action_name]
+                ended = False
+                try:
+                    result = await action(page, browser, settings, signals)
+                    if result is not False:
+                        signals.proxy_released_signal.emit(browser, raw_proxy)
+                    # Hàng đợi của ResultSink có giới hạn, không chờ trên event loop
+                    await loop.run_in_executor(
+                        None,
+                        record_task_result,
+                        browser,
+                        "failed" if result is False else "succeeded",
+                        result,
+                    )
+                    if result is False:
+                        ended = True
+                        signals.failed_signal.emit(
+                            browser, ACTION_FAILED_MESSAGE, raw_proxy
+                        )
+                except PlaywrightTimeoutError:
+                    ended = True
+                    signals.proxy_not_ready_signal.emit(browser, raw_proxy)
+                except Exception as e:
+                    error_msg = str(e)
+                    print(f"ℹ️ [{username}] Error: {error_msg[:100]}...")
+                    ended = True
+                    if "net::ERR" in error_msg or "ERR_PROXY_NOT_READY" in error_msg:
+                        signals.proxy_not_ready_signal.emit(browser, raw_proxy)
+                    else:
+                        await loop.run_in_executor(
+                            None, record_task_result, browser, "failed", None, error_msg
+                        )
+                        signals.failed_signal.emit(browser, error_msg, raw_proxy)
+        except asyncio.CancelledError:
+            ended = True
+            signals.failed_signal.emit(browser, "Cancelled", raw_proxy)
+            raise
+        except Exception as e:
+            ended = True
+            error_msg = str(e)
+            if "ERR_PROXY_NOT_READY" in error_msg or "ERR_TIMED_OUT" in error_msg:
+                signals.proxy_not_ready_signal.emit(browser, raw_proxy)
+            elif "ERR_PROXY_CONNECTION_FAILED" in error_msg:
+                signals.proxy_unavailable_signal.emit(browser, raw_proxy)
+            else:
+                signals.failed_signal.emit(browser, error_msg, raw_proxy)
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            if udd_lock is not None:
+                udd_lock.release()
+            self._tasks.discard(current_task)
+            if not ended:
+                signals.finished_signal.emit(browser, "Finished", raw_proxy)
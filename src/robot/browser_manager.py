@@ -1,11 +1,34 @@
+import dataclasses
 import uuid
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from collections import deque
-from PyQt6.QtCore import QThreadPool, QObject, pyqtSlot, QTimer
+from PyQt6.QtCore import QCoreApplication, QThreadPool, QObject, pyqtSlot, QTimer
 from PyQt6.QtGui import QGuiApplication
 
 from src.robot.browser_worker import BrowserWorker
+from src.robot.scheduler import TaskScheduler
+from src.robot.async_engine import AsyncBrowserEngine
+from src.robot.task_store import TaskStore
+from src.robot.proxy_lease import (
+    ProxyLeaseManager,
+    PROXY_OK,
+    PROXY_NOT_READY,
+    PROXY_UNAVAILABLE,
+    PROXY_ERROR,
+)
+from src.utils.proxy_client import get_proxy_client
+from src.services.otp_poller import get_otp_poller
+from src.my_constants import (
+    ROBOT_ACTION_PRIORITIES,
+    SCHEDULER_DEFAULT_PRIORITY,
+    SCHEDULER_MAX_TASKS_PER_ACCOUNT,
+    SCHEDULER_STARVATION_LIMIT,
+    ROBOT_ENGINE,
+    DEFAULT_SCREEN_SIZE,
+    ROBOT_TASK_STORE,
+    BROWSER_CONTEXT_IDLE_SECONDS,
+)
 from src.my_types import (
     BrowserTaskType,
     BrowserWorkerSignals,
@@ -17,9 +40,25 @@ from src.my_types import (
 class BrowserManager(QObject):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._pending_browsers: deque[BrowserTaskType] = deque()
-        self._pending_raw_proxies: deque[str] = deque()
+        self._pending_browsers = TaskScheduler(
+            priorities=ROBOT_ACTION_PRIORITIES,
+            default_priority=SCHEDULER_DEFAULT_PRIORITY,
+            max_per_account=SCHEDULER_MAX_TASKS_PER_ACCOUNT,
+            starvation_limit=SCHEDULER_STARVATION_LIMIT,
+        )
+        self._proxy_leases = ProxyLeaseManager()
+        # Thử khởi động lại khi một proxy hoặc một tài khoản hết thời gian "hạ nhiệt"
+        self._retry_timer = QTimer(self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.timeout.connect(self.try_start_browsers)
         self._in_progress_tasks: Dict[str, dict] = {}
+        # uid -> worker giữ context "ấm" của tài khoản sau tác vụ cuối (theo
+        # thứ tự thời gian); tác vụ kế tiếp của tài khoản được giao cho nó
+        self._idle_workers: Dict[str, BrowserWorker] = {}
+        # Bản lưu của hàng chờ trong DB để chạy tiếp sau khi ứng dụng bị tắt
+        self.task_store: Optional[TaskStore] = (
+            TaskStore(parent=self) if ROBOT_TASK_STORE else None
+        )
         self._total_task_num: int = 0
         self._settings = RobotSettingsType(
             is_mobile=False,
@@ -29,13 +68,20 @@ class BrowserManager(QObject):
             delay_num=0,
             group_file_path="",
         )
-        self._raw_proxies: set[str] = set()
         self.manager_signals = BrowserManagerSignals()
         self.worker_signals = BrowserWorkerSignals()
         self._max_threads: int = 8  # Số luồng tối đa có thể chạy đồng thời
-        screen = QGuiApplication.primaryScreen()
-        screen_geometry = screen.geometry()
-        self._screen_size = (screen_geometry.width(), screen_geometry.height())
+        # Chạy không giao diện (QCoreApplication, xem cli.py) thì không có màn hình
+        screen = (
+            QGuiApplication.primaryScreen()
+            if isinstance(QCoreApplication.instance(), QGuiApplication)
+            else None
+        )
+        if screen is not None:
+            screen_geometry = screen.geometry()
+            self._screen_size = (screen_geometry.width(), screen_geometry.height())
+        else:
+            self._screen_size = DEFAULT_SCREEN_SIZE
 
         # --- LOGIC MỚI CHO VỊ TRÍ CỬA SỔ ---
         self._available_window_positions: deque[Tuple[int, int]] = deque()
@@ -59,11 +105,21 @@ class BrowserManager(QObject):
         self.worker_signals.finished_signal.connect(self.on_task_succeed)
         self.worker_signals.proxy_unavailable_signal.connect(self.on_proxy_unavailable)
         self.worker_signals.proxy_not_ready_signal.connect(self.on_proxy_not_ready)
+        self.worker_signals.requeue_signal.connect(self.on_requeue)
+        self.worker_signals.proxy_released_signal.connect(self.on_proxy_released)
         self.worker_signals.require_phone_number_signal.connect(
             self.on_require_phone_number
         )
         self.worker_signals.require_otp_code_signal.connect(self.on_require_otp_code)
+        # Poller OTP dùng chung (khi có VIOTP_TOKEN): các worker chờ mã qua nó
+        otp_poller = get_otp_poller()
+        if otp_poller is not None:
+            otp_poller.code_received.connect(self.on_otp_code_received)
         self.threadpool = QThreadPool.globalInstance()
+        # Engine asyncio (tùy chọn) cho các action có phiên bản async
+        self._async_engine: Optional[AsyncBrowserEngine] = (
+            AsyncBrowserEngine() if ROBOT_ENGINE == "async" else None
+        )
 
     def _initialize_window_positions(self):
         """
@@ -112,22 +168,25 @@ class BrowserManager(QObject):
     def add_browsers(
         self, list_browsers: List[BrowserTaskType], list_raw_proxies: List[str]
     ):
+        if self.task_store is not None:
+            self.task_store.add_tasks(list_browsers)
         for browser in list_browsers:
-            self._pending_browsers.append(browser)
+            self._pending_browsers.push(browser)
             self._total_task_num += 1
 
         for proxy in list_raw_proxies:
-            if proxy not in self._raw_proxies:
-                self._raw_proxies.add(proxy)
-                self._pending_raw_proxies.append(proxy)
+            self._proxy_leases.add(proxy)
 
         self.try_start_browsers()
 
     def try_start_browsers(self):
         """Cố gắng khởi động các browser worker mới."""
-        # Số vị trí trống trong thread pool (số worker có thể chạy thêm)
+        # Số vị trí trống trong thread pool (số worker có thể chạy thêm);
+        # luồng của worker rảnh được trả lại khi cần
         available_slots_in_pool = (
-            self._max_threads - self.threadpool.activeThreadCount()
+            self._max_threads
+            - self.threadpool.activeThreadCount()
+            + self._idle_worker_count()
         )
 
         # Số vị trí cửa sổ có sẵn trên màn hình
@@ -138,63 +197,277 @@ class BrowserManager(QObject):
             available_slots_in_pool,
             available_window_slots,
             len(self._pending_browsers),
-            len(self._pending_raw_proxies),
+            self._proxy_leases.available_count(),
         )
         # print(
         #     {
         #         "active_thread": self.threadpool.activeThreadCount(),
         #         "thread_num": self._max_threads,
         #         "pending_tasks_num": len(self._pending_browsers),
-        #         "pending_proxy_num": len(self._pending_raw_proxies),
+        #         "pending_proxy_num": self._proxy_leases.available_count(),
         #         "window_pos": len(self._available_window_positions),
         #     }
         # )
         while (
-            self.threadpool.activeThreadCount() <= self._max_threads
-            and len(self._in_progress_tasks) < self._max_threads
+            (self._has_thread_capacity() or self._has_async_capacity())
             and self._pending_browsers
-            and self._pending_raw_proxies
+            and self._proxy_leases.has_available()
             # and self._available_window_positions
         ):
-            browser = self._pending_browsers.popleft()
-            raw_proxy = self._pending_raw_proxies.popleft()
-
-            # Lấy một vị trí cửa sổ có sẵn
-            window_position = self._available_window_positions.popleft()
+            browser = self._pending_browsers.pop()
+            if browser is None:
+                # Mọi tài khoản còn tác vụ đều đang chạy đủ số tác vụ cho phép
+                break
+            use_async = self._has_async_capacity() and self._async_engine.supports(
+                browser
+            )
+            if not use_async and not self._has_thread_capacity():
+                # Chỉ còn chỗ trong engine async nhưng tác vụ này cần một luồng
+                self._pending_browsers.requeue(browser)
+                self._pending_browsers.task_done(browser)
+                break
+            browser = self._dispatch(browser)
+            raw_proxy = self._proxy_leases.acquire()
+            # Proxy đang được dùng: không được xoay trong nền nữa
+            get_proxy_client().cancel_prefetch(raw_proxy)
+
+            # Lấy một vị trí cửa sổ có sẵn (engine async có thể chạy nhiều
+            # browser hơn số vị trí, khi đó cửa sổ dùng vị trí mặc định)
+            window_position = (
+                self._available_window_positions.popleft()
+                if self._available_window_positions
+                else None
+            )
+            info = {
+                "active_thread": self.threadpool.activeThreadCount(),
+                "max_threads": self._max_threads,
+                "pending_task_num": len(self._pending_browsers),
+                "pending_proxy_num": self._proxy_leases.available_count(),
+            }
 
-            worker = BrowserWorker(
+            if use_async:
+                future = self._async_engine.submit(
+                    browser=browser,
+                    raw_proxy=raw_proxy,
+                    signals=self.worker_signals,
+                    settings=self._settings,
+                    worker_position=window_position,
+                    info=info,
+                )
+                self._mark_running(browser, raw_proxy)
+                self._in_progress_tasks[browser.browser_id] = {
+                    "browser": browser,
+                    "raw_proxy": raw_proxy,
+                    "lease": {"raw_proxy": raw_proxy, "released": False},
+                    "worker": future,
+                    "engine": "async",
+                    "window_position": window_position,
+                    "group_id": browser.browser_id,
+                }
+                continue
+
+            # Gom các tác vụ còn lại của cùng tài khoản vào một worker
+            # (không gom khi có delay_num: tài khoản phải nghỉ giữa các tác vụ)
+            follow_up_tasks: List[BrowserTaskType] = []
+            if self._settings.group_by_account and self._settings.delay_num <= 0:
+                follow_up_tasks = [
+                    self._dispatch(task)
+                    for task in self._pending_browsers.pop_account(
+                        browser.user_info.uid
+                    )
+                ]
+
+            worker = self._idle_workers.pop(browser.user_info.uid, None)
+            handed_off = worker is not None and worker.hand_off(
                 browser=browser,
                 raw_proxy=raw_proxy,
                 settings=self._settings,
-                signals=self.worker_signals,
                 worker_position=window_position,
-                screen_size=self._screen_size,
-                info={
-                    "active_thread": self.threadpool.activeThreadCount(),
-                    "max_threads": self._max_threads,
-                    "pending_task_num": len(self._pending_browsers),
-                    "pending_proxy_num": len(self._pending_raw_proxies),
-                },
+                info=info,
+                follow_up_tasks=follow_up_tasks,
             )
-            while browser.browser_id in self._in_progress_tasks:
-                browser.browser_id = str(uuid.uuid4())
-            self._in_progress_tasks[browser.browser_id] = {
-                "browser": browser,
-                "raw_proxy": raw_proxy,
-                "worker": worker,
-                "window_position": window_position,
-            }
-            self.threadpool.start(worker)
+            if not handed_off:
+                # Worker mới cần một luồng: trả luồng của worker rảnh lâu nhất
+                self._free_idle_threads(starting=1)
+                worker = BrowserWorker(
+                    browser=browser,
+                    raw_proxy=raw_proxy,
+                    settings=self._settings,
+                    signals=self.worker_signals,
+                    worker_position=window_position,
+                    screen_size=self._screen_size,
+                    info=info,
+                    follow_up_tasks=follow_up_tasks,
+                )
+            # Mọi tác vụ của worker cùng dùng vị trí cửa sổ và proxy, chúng chỉ
+            # được giải phóng khi tác vụ cuối cùng của nhóm kết thúc.
+            group_id = None
+            # Lease dùng chung cho cả nhóm, trả về một lần duy nhất
+            lease = {"raw_proxy": raw_proxy, "released": False}
+            for task in [browser] + follow_up_tasks:
+                if group_id is None:
+                    group_id = task.browser_id
+                self._mark_running(task, raw_proxy)
+                self._in_progress_tasks[task.browser_id] = {
+                    "browser": task,
+                    "raw_proxy": raw_proxy,
+                    "lease": lease,
+                    "worker": worker,
+                    "engine": "thread",
+                    "window_position": window_position,
+                    "group_id": group_id,
+                }
+            if not handed_off:
+                self.threadpool.start(worker)
+
+        self._schedule_retry()
 
         # print(f"\rPending tasks: {len(self._pending_browsers)}{' ' * 20}", end="")
         if (
             not self._pending_browsers
             and not self._in_progress_tasks
-            and len(self._pending_raw_proxies) == len(self._raw_proxies)
+            and self._proxy_leases.active_lease_count() == 0
         ):
+            if self.task_store is not None:
+                self.task_store.flush()
+            self._evict_idle_workers()
             print("All tasks finished!")
             self.manager_signals.finished_signal.emit("All tasks finished!")
 
+    @staticmethod
+    def _dispatch(browser: BrowserTaskType) -> BrowserTaskType:
+        """
+        Copy of the task for one run, with its own browser_id (every task of an
+        account shares the account's id). The worker's signals carry this copy,
+        so a late signal of a run that already ended (e.g. the "Finished" after
+        a requeue) cannot end the next run of the task or of the account.
+        """
+        return dataclasses.replace(browser, browser_id=str(uuid.uuid4()))
+
+    def _is_running(self, browser: BrowserTaskType) -> bool:
+        """False for a signal of a run that was already ended by an earlier one."""
+        return browser.browser_id in self._in_progress_tasks
+
+    def _free_idle_threads(self, starting: int = 0):
+        """Evicts the idle workers whose pool threads running (or `starting`) workers wait for."""
+        thread_num = min(self._max_threads, self.threadpool.maxThreadCount())
+        self._evict_idle_workers(
+            keep=thread_num - self._running_worker_count() - starting
+        )
+
+    def _idle_worker_count(self) -> int:
+        """Idle workers still waiting for a hand-off (the others already closed their context)."""
+        for uid, worker in list(self._idle_workers.items()):
+            if not worker.is_waiting_for_handoff():
+                del self._idle_workers[uid]
+        return len(self._idle_workers)
+
+    def _evict_idle_workers(self, keep: int = 0):
+        """Lets idle workers close their warm context, the oldest first, until at most `keep` remain."""
+        self._idle_worker_count()
+        while self._idle_workers and len(self._idle_workers) > keep:
+            uid = next(iter(self._idle_workers))
+            self._idle_workers.pop(uid).evict()
+
+    def _mark_running(self, browser: BrowserTaskType, raw_proxy: str):
+        if self.task_store is not None:
+            self.task_store.mark_running(browser, raw_proxy)
+
+    def _schedule_retry(self):
+        """
+        Khi còn tác vụ chờ nhưng proxy hoặc tài khoản đang "hạ nhiệt", hẹn giờ
+        thử lại vào lúc cả hai cùng sẵn sàng.
+        """
+        if not self._pending_browsers:
+            return
+        proxy_wait = self._proxy_leases.next_ready_in()
+        account_wait = self._pending_browsers.next_ready_in()
+        if proxy_wait is None or account_wait is None:
+            # Mọi proxy/tài khoản đang bận, tác vụ kết thúc sẽ gọi lại try_start_browsers
+            return
+        wait = max(proxy_wait, account_wait)
+        if wait <= 0:
+            return
+        wait_ms = int(wait * 1000) + 50
+        if (
+            not self._retry_timer.isActive()
+            or self._retry_timer.remainingTime() > wait_ms
+        ):
+            self._retry_timer.start(wait_ms)
+
+    def _start_cooldown(self, browser: BrowserTaskType):
+        """Tài khoản vừa chạy xong một tác vụ chỉ được chạy tiếp sau delay_num phút."""
+        if browser.browser_id not in self._in_progress_tasks:
+            # Tác vụ đã được xử lý (proxy lỗi...), tài khoản chưa thực sự chạy
+            return
+        self._pending_browsers.cool_down(
+            browser.user_info.uid, self._settings.delay_num * 60
+        )
+
+    def _release_lease(self, task: Optional[dict], outcome: Optional[int] = PROXY_OK):
+        """Trả proxy của một worker (dùng chung cho cả nhóm) về ProxyLeaseManager."""
+        if task is None or task["lease"]["released"]:
+            return
+        task["lease"]["released"] = True
+        self._proxy_leases.release(task["raw_proxy"], outcome)
+        # Proxy rảnh: xoay trước IP mới khi hết thời gian xoay, để lần khởi
+        # động sau không phải chờ API
+        if (
+            outcome in (PROXY_OK, None)
+            and self._proxy_leases.lease_count(task["raw_proxy"]) == 0
+        ):
+            get_proxy_client().prefetch(task["raw_proxy"])
+
+    def _running_worker_count(self, engine: str = "thread") -> int:
+        return len(
+            {
+                task["group_id"]
+                for task in self._in_progress_tasks.values()
+                if task["engine"] == engine
+            }
+        )
+
+    def _has_thread_capacity(self) -> bool:
+        # Worker rảnh (giữ context ấm) nhường luồng khi cần, không tính vào
+        idle_threads = self._idle_worker_count()
+        return (
+            self.threadpool.activeThreadCount() - idle_threads <= self._max_threads
+            and self._running_worker_count("thread") < self._max_threads
+        )
+
+    def _has_async_capacity(self) -> bool:
+        return (
+            self._async_engine is not None
+            and self._running_worker_count("async") < self._async_engine.max_concurrency
+        )
+
+    def _release_window_position(self, position: Optional[Tuple[int, int]]):
+        if position is not None:
+            self._available_window_positions.appendleft(position)
+
+    def _pop_in_progress(self, browser: BrowserTaskType) -> Optional[dict]:
+        """
+        Removes a finished/failed task. Returns its entry when it was the last
+        running task of its worker (the window position and proxy are free
+        again), otherwise None.
+        """
+        task = self._in_progress_tasks.pop(browser.browser_id, None)
+        if task is None:
+            return None
+        self._pending_browsers.task_done(task["browser"])
+        if any(
+            other["group_id"] == task["group_id"]
+            for other in self._in_progress_tasks.values()
+        ):
+            return None
+        if task["engine"] == "thread" and BROWSER_CONTEXT_IDLE_SECONDS > 0:
+            # Worker có thể đang giữ context của tài khoản, chờ tác vụ kế tiếp
+            uid = task["browser"].user_info.uid
+            self._idle_workers.pop(uid, None)
+            self._idle_workers[uid] = task["worker"]
+            self._free_idle_threads()
+        return task
+
     def is_all_task_finished(self) -> bool:
         return not self._pending_browsers and not self._in_progress_tasks
 
@@ -222,42 +495,44 @@ class BrowserManager(QObject):
 
     @pyqtSlot(BrowserTaskType, str, str)
     def on_failed(self, browser: BrowserTaskType, message: str, raw_proxy: str):
+        if not self._is_running(browser):
+            return
         msg = f"\t\t❗[{browser.user_info.uid} - {browser.user_info.username}]({browser.action_name}): {message}"
         self.manager_signals.failed_signal.emit(msg)
+        if self.task_store is not None:
+            self.task_store.mark_failed(browser, message)
 
-        # Thêm proxy vào hàng chờ lại (có thể thử lại sau)
-
+        self._start_cooldown(browser)
         # Xóa tác vụ khỏi danh sách đang chạy và giải phóng vị trí cửa sổ
-        if browser.browser_id in self._in_progress_tasks:
-            pos_to_release = self._in_progress_tasks[browser.browser_id][
-                "window_position"
-            ]
-            self._available_window_positions.appendleft(
-                pos_to_release
-            )  # Giải phóng vị trí
-            if raw_proxy not in self._pending_raw_proxies:
-                self._pending_raw_proxies.append(raw_proxy)
-            del self._in_progress_tasks[browser.browser_id]
+        released_task = self._pop_in_progress(browser)
+        if released_task:
+            pos_to_release = released_task["window_position"]
+            self._release_window_position(pos_to_release)  # Giải phóng vị trí
+            # Lỗi không do proxy: trả proxy mà không đổi điểm sức khỏe
+            self._release_lease(released_task, None)
             # print(f"Released position {pos_to_release} for {browser.user_info.username} (failed).")
         self.try_start_browsers()  # Cố gắng khởi động tác vụ mới
 
     @pyqtSlot(BrowserTaskType, str)
     def on_error(self, browser: BrowserTaskType, message: str):
+        if not self._is_running(browser):
+            return
         msg = f"\t\t❌ ERROR [{browser.user_info.uid} - {browser.user_info.username}]({browser.action_name}): {message}"
         self.manager_signals.error_signal.emit(msg)
+        if self.task_store is not None:
+            self.task_store.mark_failed(browser, message)
 
-        # if raw_proxy not in self._pending_raw_proxies:
-        #     self._pending_raw_proxies.append(raw_proxy)
+        task = self._in_progress_tasks.get(browser.browser_id)
+        if task is not None:
+            # Thông tin proxy đã lưu có thể là nguyên nhân lỗi: lần sau gọi lại API
+            get_proxy_client().forget(task["raw_proxy"])
+        self._release_lease(task, PROXY_ERROR)
 
         # Xóa tác vụ khỏi danh sách đang chạy và giải phóng vị trí cửa sổ
-        if browser.browser_id in self._in_progress_tasks:
-            pos_to_release = self._in_progress_tasks[browser.browser_id][
-                "window_position"
-            ]
-            self._available_window_positions.appendleft(
-                pos_to_release
-            )  # Giải phóng vị trí
-            del self._in_progress_tasks[browser.browser_id]
+        released_task = self._pop_in_progress(browser)
+        if released_task:
+            pos_to_release = released_task["window_position"]
+            self._release_window_position(pos_to_release)  # Giải phóng vị trí
             # print(f"Released position {pos_to_release} for {browser.user_info.username} (error).")
         self.try_start_browsers()  # Cố gắng khởi động tác vụ mới
 
@@ -268,117 +543,150 @@ class BrowserManager(QObject):
 
     @pyqtSlot(BrowserTaskType, str, str)
     def on_task_succeed(self, browser: BrowserTaskType, message: str, raw_proxy: str):
+        if not self._is_running(browser):
+            return
         msg = f"✅ SUCCEED [{browser.user_info.uid} - {browser.user_info.username}]({browser.action_name}): {message}"
         print(
             f"[{datetime.now().strftime('%H:%M:%S')}] ✅ {browser.user_info.username}"
         )
         self.manager_signals.task_succeed_signal.emit(msg)
+        if self.task_store is not None:
+            self.task_store.mark_finished(browser)
 
-        # Thêm proxy vào hàng chờ lại (sẵn sàng cho tác vụ khác)
-
+        self._start_cooldown(browser)
         # Xóa tác vụ khỏi danh sách đang chạy và giải phóng vị trí cửa sổ
-        if browser.browser_id in self._in_progress_tasks:
-            pos_to_release = self._in_progress_tasks[browser.browser_id][
-                "window_position"
-            ]
-            if raw_proxy not in self._pending_raw_proxies:
-                self._pending_raw_proxies.append(raw_proxy)
-            self._available_window_positions.appendleft(
-                pos_to_release
-            )  # Giải phóng vị trí
-            del self._in_progress_tasks[browser.browser_id]
+        released_task = self._pop_in_progress(browser)
+        if released_task:
+            pos_to_release = released_task["window_position"]
+            # Thường đã được trả sớm qua proxy_released_signal
+            self._release_lease(released_task, PROXY_OK)
+            self._release_window_position(pos_to_release)  # Giải phóng vị trí
             # print(f"Released position {pos_to_release} for {browser.user_info.username} (succeeded).")
         self.try_start_browsers()  # Cố gắng khởi động tác vụ mới
 
     @pyqtSlot(BrowserTaskType, str)
     def on_proxy_unavailable(self, browser: BrowserTaskType, raw_proxy: str):
+        if not self._is_running(browser):
+            return
         msg = f"⚠️ PROXY [{browser.user_info.uid} - {browser.user_info.username}]({browser.action_name}): Unavailable proxy ({raw_proxy})"
         self.manager_signals.warning_signal.emit(msg)
 
-        # Đẩy browser task về đầu hàng chờ để thử lại với proxy khác
-        self._pending_browsers.appendleft(browser)
+        # Proxy bị trừ điểm và "hạ nhiệt" lâu, tác vụ sẽ chạy với proxy khác;
+        # thông tin proxy đã lưu không còn dùng được
+        get_proxy_client().forget(raw_proxy)
+        self._release_lease(
+            self._in_progress_tasks.get(browser.browser_id), PROXY_UNAVAILABLE
+        )
+        # Trả browser task về hàng chờ (tài khoản xuống cuối vòng) để thử lại với proxy khác
+        self._pending_browsers.requeue(browser)
+        if self.task_store is not None:
+            self.task_store.mark_retry(browser, raw_proxy)
 
         # Xóa tác vụ khỏi danh sách đang chạy và giải phóng vị trí cửa sổ
-        if browser.browser_id in self._in_progress_tasks:
-            pos_to_release = self._in_progress_tasks[browser.browser_id][
-                "window_position"
-            ]
-            self._available_window_positions.appendleft(
-                pos_to_release
-            )  # Giải phóng vị trí
-            del self._in_progress_tasks[browser.browser_id]
+        released_task = self._pop_in_progress(browser)
+        if released_task:
+            pos_to_release = released_task["window_position"]
+            self._release_window_position(pos_to_release)  # Giải phóng vị trí
             # print(f"Released position {pos_to_release} for {browser.user_info.username} (proxy unavailable).")
         self.try_start_browsers()  # Cố gắng khởi động tác vụ mới
 
     @pyqtSlot(BrowserTaskType, str)
     def on_proxy_not_ready(self, browser: BrowserTaskType, raw_proxy: str):
+        if not self._is_running(browser):
+            return
         msg = (
             f"⚠️ PROXY [{browser.user_info.uid} - {browser.user_info.username}]({browser.action_name}): "
-            f"Could not use proxy ({raw_proxy}), will retry with this proxy after 10s."
+            f"Could not use proxy ({raw_proxy}), it is cooling down before the next try."
         )
         self.manager_signals.warning_signal.emit(msg)
 
+        # Proxy "hạ nhiệt" trong ProxyLeaseManager (thời gian tăng dần nếu lặp
+        # lại) và lấy thông tin mới từ API ở lần thử sau
+        get_proxy_client().forget(raw_proxy)
+        self._release_lease(
+            self._in_progress_tasks.get(browser.browser_id), PROXY_NOT_READY
+        )
+
         # Xóa tác vụ khỏi danh sách đang chạy và giải phóng vị trí cửa sổ NGAY LẬP TỨC
-        if browser.browser_id in self._in_progress_tasks:
-            pos_to_release = self._in_progress_tasks[browser.browser_id][
-                "window_position"
-            ]
-            self._available_window_positions.appendleft(
-                pos_to_release
-            )  # Giải phóng vị trí
-            del self._in_progress_tasks[browser.browser_id]
+        released_task = self._pop_in_progress(browser)
+        if released_task:
+            pos_to_release = released_task["window_position"]
+            self._release_window_position(pos_to_release)  # Giải phóng vị trí
             # print(f"Released position {pos_to_release} for {browser.user_info.username} (proxy not ready).")
 
-        # Đẩy tác vụ về đầu hàng chờ để nó được ưu tiên thử lại
-        self._pending_browsers.appendleft(browser)
-
-        # Delay 10s trước khi thử lại khởi động browser
-        # _msg = f"Will retry with {raw_proxy} after 10 seconds."
-        # print(_msg, end="\r")
+        # Trả tác vụ về hàng chờ, giữ độ ưu tiên nhưng không chặn các tài khoản khác
+        self._pending_browsers.requeue(browser)
+        if self.task_store is not None:
+            self.task_store.mark_retry(browser, raw_proxy)
 
-        def call_start():
-            # Đẩy proxy này về cuối hàng chờ, cho phép nó "hạ nhiệt"
-            if raw_proxy not in self._pending_raw_proxies:
-                self._pending_raw_proxies.append(raw_proxy)
+        # Lấp đầy các luồng trống bằng proxy khác; nếu không còn proxy nào,
+        # try_start_browsers hẹn giờ thử lại khi proxy đầu tiên hết "hạ nhiệt"
+        self.try_start_browsers()
 
-            # print(" " * len(_msg), end="\r")
-            # print(new_message, end="\r")
-            self.try_start_browsers()
+    @pyqtSlot(BrowserTaskType)
+    def on_requeue(self, browser: BrowserTaskType):
+        if not self._is_running(browser):
+            return
+        # Tác vụ chưa chạy: trả về hàng chờ, không trừ điểm proxy, không tính
+        # là một lần thử lại
+        self._pending_browsers.requeue(browser)
+        if self.task_store is not None:
+            self.task_store.mark_requeued(browser)
+
+        released_task = self._pop_in_progress(browser)
+        if released_task:
+            self._release_window_position(released_task["window_position"])
+            self._release_lease(released_task, None)
+        self.try_start_browsers()
 
-        QTimer.singleShot(10000, call_start)
-        # Kích hoạt lại try_start_browsers để lấp đầy các luồng trống ngay lập tức
-        # (tác vụ vừa bị đẩy lại hàng chờ sẽ được xử lý sau 10s hoặc khi có proxy khác)
-        # self.try_start_browsers()
+    @pyqtSlot(BrowserTaskType, str)
+    def on_proxy_released(self, browser: BrowserTaskType, raw_proxy: str):
+        if not self._is_running(browser):
+            return
+        # Worker đã xong phần việc cần mạng (chưa đóng context), trả proxy sớm
+        self._release_lease(self._in_progress_tasks.get(browser.browser_id), PROXY_OK)
+        self.try_start_browsers()
 
     @pyqtSlot(BrowserTaskType)
     def on_require_phone_number(self, browser: BrowserTaskType):
+        if not self._is_running(browser):
+            return
         # ❓ Logic xử lý khi cần số điện thoại (ví dụ: hiển thị dialog cho người dùng)
         # Tùy thuộc vào cách bạn muốn xử lý, bạn có thể tạm dừng tác vụ, hiển thị GUI, v.v.
         self.manager_signals.require_phone_number_signal.emit(browser)
+        if self.task_store is not None:
+            self.task_store.mark_failed(browser, "Requires a phone number")
         # Quan trọng: Nếu bạn tạm dừng tác vụ ở đây, hãy đảm bảo giải phóng vị trí cửa sổ
         # và quản lý việc tiếp tục tác vụ sau khi có thông tin.
-        if browser.browser_id in self._in_progress_tasks:
-            pos_to_release = self._in_progress_tasks[browser.browser_id][
-                "window_position"
-            ]
-            self._available_window_positions.appendleft(pos_to_release)
-            del self._in_progress_tasks[browser.browser_id]
+        released_task = self._pop_in_progress(browser)
+        if released_task:
+            pos_to_release = released_task["window_position"]
+            self._release_window_position(pos_to_release)
+            self._release_lease(released_task, None)
             print(
                 f"Paused task {browser.user_info.username} for phone number, released position {pos_to_release}."
             )
         self.try_start_browsers()
 
+    @pyqtSlot(str, str, str)
+    def on_otp_code_received(self, request_id: str, phone_number: str, code: str):
+        msg = f"ℹ️ INFO OTP received for {phone_number} (request {request_id})."
+        self.manager_signals.info_signal.emit(msg)
+
     @pyqtSlot(BrowserTaskType)
     def on_require_otp_code(self, browser: BrowserTaskType):
+        if not self._is_running(browser):
+            return
         # ❓ Logic xử lý khi cần mã OTP (ví dụ: hiển thị dialog cho người dùng)
         self.manager_signals.require_otp_code_signal.emit(browser)
+        if self.task_store is not None:
+            self.task_store.mark_failed(browser, "Requires an OTP code")
         # Tương tự như on_require_phone_number
-        if browser.browser_id in self._in_progress_tasks:
-            pos_to_release = self._in_progress_tasks[browser.browser_id][
-                "window_position"
-            ]
-            self._available_window_positions.appendleft(pos_to_release)
-            del self._in_progress_tasks[browser.browser_id]
+        released_task = self._pop_in_progress(browser)
+        if released_task:
+            pos_to_release = released_task["window_position"]
+            self._release_window_position(pos_to_release)
+            self._release_lease(released_task, None)
             print(
                 f"Paused task {browser.user_info.username} for OTP, released position {pos_to_release}."
             )
@@ -1,20 +1,23 @@
 import threading
+import time
 from datetime import datetime
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-from undetected_playwright import Tarnished
-from typing import Tuple, Dict, Any
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from typing import Tuple, Dict, Any, List, Optional
 
-from PyQt6.QtCore import QEventLoop, QTimer, QRunnable
+from PyQt6.QtCore import QRunnable
 
 from src.my_types import BrowserWorkerSignals, BrowserTaskType, RobotSettingsType
 from src.robot.action_mapping import ACTION_MAP
-from src.utils.get_proxy import get_proxy
-import json
-import os
+from src.robot.context_pool import get_context_pool
+from src.robot.result_sink import record_task_result
+from src.robot.task_setup import (
+    ACTION_FAILED_MESSAGE,
+    build_context_kwargs,
+    info_page_html,
+    resolve_proxy,
+)
 from src.robot.actions import fb_utils  # Đảm bảo fb_utils được dùng hoặc xóa nếu không
 
-UDD_LOCKS = {}
-
 
 class BrowserWorker(QRunnable):
     def __init__(
@@ -28,6 +31,7 @@ class BrowserWorker(QRunnable):
         ],  # Tham số mới: vị trí (x,y) được gán từ Manager
         screen_size: Tuple[int, int],
         info: Dict[str, Any],
+        follow_up_tasks: Optional[List[BrowserTaskType]] = None,
     ):
         super().__init__()
         self._browser = browser
@@ -37,6 +41,15 @@ class BrowserWorker(QRunnable):
         self._worker_position = worker_position  # Lưu vị trí đã nhận
         self._screen_size = screen_size
         self._info = info
+        # Next tasks of the same account (grouped scheduling), run in this
+        # thread so they reuse the warm context and the proxy of the first one.
+        self._follow_up_tasks = list(follow_up_tasks or [])
+        self._proxy: Optional[dict] = None
+        # Sau tác vụ cuối, worker giữ context "ấm" trong idle_seconds và chờ
+        # Manager giao tiếp tác vụ của cùng tài khoản (hand_off)
+        self._handoff_cond = threading.Condition()
+        self._accepting_handoff = False
+        self._handoff: Optional[Dict[str, Any]] = None
         # info={
         #     "active_thread": self.threadpool.activeThreadCount(),
         #     "max_threads": self._max_threads,
@@ -47,226 +60,233 @@ class BrowserWorker(QRunnable):
         self.setAutoDelete(True)  # Đảm bảo worker tự xóa sau khi hoàn thành
 
     def run(self):
-        # Xác định chế độ mobile/desktop trước khi tạo context_kwargs
-        is_mobile_mode = self._browser.is_mobile or (
-            self._browser.action_name == "share_latest_product"
-        )
-
+        tasks = [self._browser] + self._follow_up_tasks
+        while tasks:
+            for index, task in enumerate(tasks):
+                self._browser = task
+                if self._run_task(next_task_pending=index < len(tasks) - 1):
+                    continue
+                # Trả các tác vụ còn lại của tài khoản về hàng chờ của Manager
+                for remaining_task in reversed(tasks[index + 1 :]):
+                    self._signals.requeue_signal.emit(remaining_task)
+                break
+            tasks = self._wait_for_handoff()
+
+    # --------------------- hand-off --------------------- #
+    def hand_off(
+        self,
+        browser: BrowserTaskType,
+        raw_proxy: str,
+        settings: RobotSettingsType,
+        worker_position: Tuple[int, int],
+        info: Dict[str, Any],
+        follow_up_tasks: Optional[List[BrowserTaskType]] = None,
+    ) -> bool:
+        """
+        Gives the next tasks of the account to this worker while it keeps the
+        account's context warm. False if it no longer waits (the context was
+        closed or idle_seconds are over): start a new worker instead.
+        """
+        with self._handoff_cond:
+            if not self._accepting_handoff:
+                return False
+            self._accepting_handoff = False
+            self._handoff = {
+                "tasks": [browser] + list(follow_up_tasks or []),
+                "raw_proxy": raw_proxy,
+                "settings": settings,
+                "worker_position": worker_position,
+                "info": info,
+            }
+            self._handoff_cond.notify()
+            return True
+
+    def is_waiting_for_handoff(self) -> bool:
+        """False once the idle wait is over (the thread closes the context and exits)."""
+        with self._handoff_cond:
+            return self._accepting_handoff
+
+    def evict(self) -> bool:
+        """Stops waiting for a hand-off now (frees the thread and the udd lock)."""
+        with self._handoff_cond:
+            if not self._accepting_handoff:
+                return False
+            self._accepting_handoff = False
+            self._handoff_cond.notify()
+            return True
+
+    def _wait_for_handoff(self) -> List[BrowserTaskType]:
+        """Waits up to idle_seconds for hand_off(), then closes the warm context."""
+        context_pool = get_context_pool()
+        deadline = time.monotonic() + context_pool.idle_seconds
+        with self._handoff_cond:
+            while self._accepting_handoff:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._accepting_handoff = False
+                    break
+                self._handoff_cond.wait(remaining)
+            handoff, self._handoff = self._handoff, None
+        if handoff is None:
+            # Hết thời gian chờ: đóng context ngay trên luồng sở hữu nó để trả khóa udd
+            context_pool.close(self._browser.udd)
+            return []
+        self._raw_proxy = handoff["raw_proxy"]
+        self._proxy = None
+        self._settings = handoff["settings"]
+        self._worker_position = handoff["worker_position"]
+        self._info = handoff["info"]
+        return handoff["tasks"]
+
+    def _run_task(self, next_task_pending: bool = False) -> bool:
+        """Runs self._browser, returns False if the account's next tasks
+        should not run in this worker (proxy or browser launch problem)."""
+        keep_going = True
+        # failed_signal đã kết thúc tác vụ (không phát thêm "Finished")
+        failed = False
+        udd = self._browser.udd
         try:
-            context_kwargs = dict(
-                user_data_dir=self._browser.udd,
-                user_agent=(
-                    self._browser.user_info.mobile_ua
-                    if is_mobile_mode
-                    else self._browser.user_info.desktop_ua
-                ),
-                headless=self._browser.headless,
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    f'--app-name=Chromium - {self._browser.user_info.username or "Unknown User"}',
-                ],
-                ignore_default_args=["--enable-automation"],
+            context_kwargs = build_context_kwargs(
+                self._browser, self._worker_position
             )
 
-            # --- Cấu hình kích thước cửa sổ và viewport ---
-            # Kích thước mặc định cho desktop (sẽ được ghi đè nếu là mobile)
-            window_width = 960
-            window_height = int(window_width * 0.56)
-
-            context_kwargs["device_scale_factor"] = 0.68  # Một yếu tố scale chung
-
-            if is_mobile_mode:
-                window_width = 375  # Chiều rộng tiêu chuẩn cho mobile
-                window_height = int(window_width * 1.5)  # Tỉ lệ cao hơn cho mobile
-                context_kwargs["viewport"] = {
-                    "width": window_width,
-                    "height": window_height,
-                }
-                context_kwargs["screen"] = (
-                    {  # Screen size thường giống viewport cho mobile
-                        "width": window_width,
-                        "height": window_height,
-                    }
+            # Mỗi user data dir chỉ được mở bởi một context (khóa nằm trong ContextPool)
+            proxy = self._proxy or self.BrowserWorker__handle_get_proxy()
+            if proxy == 0:
+                self._signals.error_signal.emit(
+                    self._browser,
+                    f"Unknown proxy error",
+                )
+                print("proxy error")
+                keep_going = False
+                return keep_going
+            elif proxy == -1:
+                self._signals.proxy_not_ready_signal.emit(
+                    self._browser, self._raw_proxy
+                )
+                keep_going = False
+                return keep_going
+            elif proxy == -2:
+                self._signals.proxy_unavailable_signal.emit(
+                    self._browser, self._raw_proxy
+                )
+                print("proxy error")
+                keep_going = False
+                return keep_going
+            # Chỉ tiếp tục nếu có proxy hợp lệ và action_name có trong ACTION_MAP
+            elif (
+                proxy
+                and type(proxy) == dict
+                and self._browser.action_name in ACTION_MAP.keys()
+            ):
+                print(
+                    f"[{datetime.now().strftime('%H:%M:%S')}] Started worker for {self._browser.user_info.username.replace("\n", "")} ({self._info['pending_task_num']} tasks in pending)."
                 )
-                context_kwargs["is_mobile"] = True
-                context_kwargs["has_touch"] = True
-            else:  # Desktop mode
-                # Kích thước window_width/height đã được đặt ở trên
-                context_kwargs["viewport"] = {
-                    "width": window_width,
-                    "height": window_height,
-                }
-                context_kwargs["screen"] = {
-                    "width": window_width,
-                    "height": window_height,
-                }
-                context_kwargs["is_mobile"] = False
-                context_kwargs["has_touch"] = False
-
-            # --- SỬ DỤNG VỊ TRÍ ĐƯỢC CẤP PHÁT TỪ BrowserManager ---
-            pos_x = self._worker_position[0]
-            pos_y = self._worker_position[1]
-
-            context_kwargs["args"].append(f"--window-position={pos_x},{pos_y}")
-            # --- KẾT THÚC CẤU HÌNH CỬA SỔ ---
 
-            udd = self._browser.udd
-            # Đảm bảo chỉ một worker truy cập cùng một user data directory tại một thời điểm
-            if udd not in UDD_LOCKS:
-                UDD_LOCKS[udd] = threading.Lock()
-            with UDD_LOCKS[udd]:
-                proxy = self.BrowserWorker__handle_get_proxy()
-                if proxy == 0:
-                    self._signals.error_signal.emit(
+                # datetime.now()
+
+                context_kwargs["proxy"] = proxy  # Áp dụng proxy cho context
+                self._proxy = proxy
+                # Context của tài khoản được giữ lại giữa các tác vụ liên tiếp
+                context, reused = get_context_pool().acquire(udd, context_kwargs)
+                if not reused:
+                    # Sử dụng page hiện có hoặc tạo page mới
+                    pages = context.pages
+                    if pages:
+                        current_page = pages[0]
+                    else:
+                        current_page = context.new_page()
+
+                    # Đặt nội dung trang thông tin để dễ debug
+                    current_page.set_content(info_page_html(self._browser))
+
+                # Tạo một page mới để thực hiện hành động chính
+                page = context.new_page()
+                ACTION_HANDLER = ACTION_MAP[
+                    self._browser.action_name
+                ]  # Lấy handler cho action
+
+                try:
+                    result = ACTION_HANDLER(  # Thực thi hành động
+                        page,
+                        self._browser,
+                        self._settings,
+                        self._signals,
+                    )
+                    # Ghi kết quả của mọi loại tác vụ (robot/result_sink.py)
+                    record_task_result(
                         self._browser,
-                        f"Unknown proxy error",
+                        "failed" if result is False else "succeeded",
+                        result,
                     )
-                    print("proxy error")
-                    return
-                elif proxy == -1:
+                    if result is False:
+                        # Action trả về False: tác vụ thất bại (không phải "Finished")
+                        self._signals.failed_signal.emit(
+                            self._browser, ACTION_FAILED_MESSAGE, self._raw_proxy
+                        )
+                        failed = True
+
+                except PlaywrightTimeoutError:
+                    # Xử lý lỗi timeout của Playwright
                     self._signals.proxy_not_ready_signal.emit(
-                        self._browser, self._raw_proxy
+                        self._browser,
+                        self._raw_proxy,
                     )
-                    return
-                elif proxy == -2:
-                    self._signals.proxy_unavailable_signal.emit(
+                    keep_going = False
+                except Exception as e:
+                    # Xử lý các loại lỗi khác
+                    error_msg = str(e)
+                    print(
+                        f"ℹ️ [{self._browser.user_info.username.replace("\n", "")}] Error: {error_msg[:100]}..."
+                    )  # Log 100 ký tự đầu
+
+                    # Kiểm tra các lỗi liên quan đến proxy/mạng để phát tín hiệu phù hợp
+                    if (
+                        "ERR_PROXY_NOT_READY" in error_msg
+                        or "ERR_TIMED_OUT" in error_msg
+                    ):
+                        self._signals.proxy_not_ready_signal.emit(
+                            self._browser,
+                            self._raw_proxy,
+                        )
+                        keep_going = False
+                    elif (
+                        "ERR_ABORTED" in error_msg
+                        or "ERR_TOO_MANY_REDIRECTS" in error_msg
+                        or "net::ERR" in error_msg
+                    ):
+                        # Các lỗi mạng hoặc redirect, có thể coi là proxy không ổn định hoặc lỗi tạm thời
+                        self._signals.proxy_not_ready_signal.emit(  # Hoặc proxy_unavailable_signal tùy theo mức độ nghiêm trọng
+                            self._browser,
+                            self._raw_proxy,
+                        )
+                        keep_going = False
+                    else:
+                        # Các lỗi khác không liên quan đến proxy, coi là lỗi tác vụ
+                        record_task_result(self._browser, "failed", error=error_msg)
+                        self._signals.failed_signal.emit(
+                            self._browser, error_msg, self._raw_proxy
+                        )
+                        failed = True
+
+                # Context có thể được dùng lại, chỉ đóng page của tác vụ này
+                try:
+                    page.close()
+                except Exception:
+                    pass
+
+                # Xong phần việc cần mạng: trả proxy cho Manager trước khi đóng context
+                # (tác vụ tiếp theo của tài khoản vẫn dùng proxy này)
+                if keep_going and not failed and not next_task_pending:
+                    self._signals.proxy_released_signal.emit(
                         self._browser, self._raw_proxy
                     )
-                    print("proxy error")
-                    return
-                # Chỉ tiếp tục nếu có proxy hợp lệ và action_name có trong ACTION_MAP
-                elif (
-                    proxy
-                    and type(proxy) == dict
-                    and self._browser.action_name in ACTION_MAP.keys()
-                ):
-                    with sync_playwright() as p:
-                        print(
-                            f"[{datetime.now().strftime('%H:%M:%S')}] Started worker for {self._browser.user_info.username.replace("\n", "")} ({self._info['pending_task_num']} tasks in pending)."
-                        )
-
-                        # datetime.now()
-
-                        context_kwargs["proxy"] = proxy  # Áp dụng proxy cho context
-                        context = p.chromium.launch_persistent_context(**context_kwargs)
-                        Tarnished.apply_stealth(
-                            context
-                        )  # Áp dụng các kỹ thuật anti-detection
-
-                        # Sử dụng page hiện có hoặc tạo page mới
-                        pages = context.pages
-                        if pages:
-                            current_page = pages[0]
-                        else:
-                            current_page = context.new_page()
-
-                        # Đặt nội dung trang thông tin để dễ debug
-                        info_html = f"""
-        <html>
-            <head><title>{self._browser.user_info.username.replace("\n", "")}</title></head>
-            <body>
-                <h2>username: {self._browser.user_info.username.replace("\n", "")}</h2>
-                <p>id: {self._browser.user_info.id}</p>
-                <p>uid: {self._browser.user_info.uid}</p>
-                <p>user_data_dir: {self._browser.udd}</p>
-            </body>
-        </html>
-    """
-                        current_page.set_content(info_html)
-
-                        # Tạo một page mới để thực hiện hành động chính
-                        page = context.new_page()
-                        ACTION_HANDLER = ACTION_MAP[
-                            self._browser.action_name
-                        ]  # Lấy handler cho action
-
-                        try:
-                            result = ACTION_HANDLER(  # Thực thi hành động
-                                page,
-                                self._browser,
-                                self._settings,
-                                self._signals,
-                            )
-                            if self._browser.action_name == "list_on_group_and_share":
-                                result_file = "results.json"
-                                result_lock = threading.Lock()
-
-                                # Đảm bảo kết quả là kiểu dict hoặc có thể serialize
-                                result_data = {
-                                    "username": self._browser.user_info.username,
-                                    "action": self._browser.action_name,
-                                    "result": result,
-                                    "timestamp": datetime.now().isoformat(),
-                                }
-
-                                with result_lock:
-                                    # Đọc dữ liệu cũ nếu file đã tồn tại
-                                    if os.path.exists(result_file):
-                                        with open(
-                                            result_file, "r", encoding="utf-8"
-                                        ) as f:
-                                            try:
-                                                all_results = json.load(f)
-                                            except Exception:
-                                                all_results = []
-                                    else:
-                                        all_results = []
-
-                                    all_results.append(result_data)
-
-                                    # Ghi lại dữ liệu mới
-                                    with open(result_file, "w", encoding="utf-8") as f:
-                                        json.dump(
-                                            all_results, f, ensure_ascii=False, indent=2
-                                        )
-
-                        except PlaywrightTimeoutError:
-                            # Xử lý lỗi timeout của Playwright
-                            self._signals.proxy_not_ready_signal.emit(
-                                self._browser,
-                                self._raw_proxy,
-                            )
-                        except Exception as e:
-                            # Xử lý các loại lỗi khác
-                            error_msg = str(e)
-                            print(
-                                f"ℹ️ [{self._browser.user_info.username.replace("\n", "")}] Error: {error_msg[:100]}..."
-                            )  # Log 100 ký tự đầu
-
-                            # Kiểm tra các lỗi liên quan đến proxy/mạng để phát tín hiệu phù hợp
-                            if (
-                                "ERR_PROXY_NOT_READY" in error_msg
-                                or "ERR_TIMED_OUT" in error_msg
-                            ):
-                                self._signals.proxy_not_ready_signal.emit(
-                                    self._browser,
-                                    self._raw_proxy,
-                                )
-                            elif (
-                                "ERR_ABORTED" in error_msg
-                                or "ERR_TOO_MANY_REDIRECTS" in error_msg
-                                or "net::ERR" in error_msg
-                            ):
-                                # Các lỗi mạng hoặc redirect, có thể coi là proxy không ổn định hoặc lỗi tạm thời
-                                self._signals.proxy_not_ready_signal.emit(  # Hoặc proxy_unavailable_signal tùy theo mức độ nghiêm trọng
-                                    self._browser,
-                                    self._raw_proxy,
-                                )
-                            else:
-                                # Các lỗi khác không liên quan đến proxy, coi là lỗi tác vụ
-                                self._signals.failed_signal.emit(
-                                    self._browser, error_msg, self._raw_proxy
-                                )
-
-                        # Chờ một khoảng thời gian trước khi đóng browser (nếu có delay_num)
-                        delay_ms = int(self._settings.delay_num * 60 * 1000)
-                        if delay_ms > 0:
-                            loop = QEventLoop()
-                            QTimer.singleShot(delay_ms, loop.quit)
-                            loop.exec()
+                # delay_num không còn giữ luồng ở đây: Manager cho tài khoản
+                # "nghỉ" (cool-down) trong TaskScheduler sau khi tác vụ kết thúc
 
         except Exception as e:
             # Xử lý các lỗi xảy ra trong quá trình khởi tạo browser hoặc proxy
+            keep_going = False
             error_msg = str(e)
             if "ERR_PROXY_NOT_READY" in error_msg or "ERR_TIMED_OUT" in error_msg:
                 self._signals.proxy_not_ready_signal.emit(
@@ -282,56 +302,26 @@ class BrowserWorker(QRunnable):
                 )
 
         finally:
-            # Đảm bảo context được đóng ngay cả khi có lỗi (nếu context đã được mở)
-            # Dù `with sync_playwright() as p:` sẽ xử lý phần lớn,
-            # một số lỗi có thể xảy ra trước khi context được gán.
-            try:
-                if "context" in locals() and context:
-                    context.close()
-            except Exception as e:
-                # print(f"Error closing browser context: {e}")
-                pass
-
-            # Đảm bảo lock được release khi worker hoàn thành hoặc lỗi
-            if udd in UDD_LOCKS and UDD_LOCKS[udd].locked():
-                UDD_LOCKS[udd].release()
-            # Phát tín hiệu hoàn thành tác vụ
-            self._signals.finished_signal.emit(
-                self._browser, "Finished", self._raw_proxy
-            )
+            # Giữ context cho tác vụ tiếp theo của tài khoản (hoặc trong thời gian
+            # chờ), đóng ngay nếu có lỗi. ContextPool cũng giải phóng khóa udd.
+            context_pool = get_context_pool()
+            if keep_going:
+                kept = context_pool.release(udd, next_task_pending=next_task_pending)
+                if kept and not next_task_pending:
+                    # Nhận tác vụ kế tiếp của tài khoản trước khi báo "Finished"
+                    with self._handoff_cond:
+                        self._accepting_handoff = True
+            else:
+                context_pool.close(udd)
+            # Phát tín hiệu hoàn thành tác vụ, trừ khi tác vụ đã kết thúc bằng
+            # một tín hiệu lỗi hoặc đã được trả về hàng chờ: Manager đã chạy
+            # lại tác vụ (hoặc tác vụ sau của tài khoản) từ lúc đó
+            if keep_going and not failed:
+                self._signals.finished_signal.emit(
+                    self._browser, "Finished", self._raw_proxy
+                )
+        return keep_going
 
     def BrowserWorker__handle_get_proxy(self):
         """Xử lý việc lấy thông tin proxy."""
-        try:
-            res = get_proxy(self._raw_proxy)
-            status_code_str = res.get("status")  # Lấy status dưới dạng string
-
-            # Kiểm tra và chuyển đổi status_code an toàn
-            if status_code_str is None:
-                self._signals.failed_signal.emit(
-                    self._browser,
-                    "Proxy service response missing 'status' field.",
-                    self._raw_proxy,
-                )
-                return 0
-
-            try:
-                status_code = int(status_code_str)
-            except ValueError:
-                self._signals.error_signal.emit(
-                    self._browser,
-                    f"Invalid proxy status code format: {status_code_str}",
-                )
-                return 0
-
-            if status_code == 100:
-                proxy = res.get("data")
-            elif status_code == 101:
-                return -1
-            elif status_code == 102:
-                return -2
-            else:  # Xử lý các mã trạng thái không mong muốn khác
-                return 0
-            return proxy
-        except Exception as e:
-            return 0  # Đảm bảo trả về None khi có lỗi
+        return resolve_proxy(self._raw_proxy, self._browser, self._signals)
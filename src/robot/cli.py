@@ -0,0 +1,441 @@
+# src/robot/cli.py
+"""
+Headless entry point, runs a campaign without the GUI (e.g. from cron):
+
+    python -m src.robot.cli run --actions plan.json [--output results.json]
+
+plan.json:
+
+    {
+        "users": {"user_group": 3},
+        "actions": [{"action_name": "launch_browser", "pid": ""}],
+        "settings": {"thread_num": 4, "headless": true}
+    }
+
+"users" are UserService.fetch_where() filters ({} selects every user, a list
+value becomes IN (...)). "actions" are the payloads RobotController.init_actions
+takes from the robot page. "settings" overrides RobotSettingsType fields.
+
+The results (one record per task plus a summary) are written as JSON to
+--output, or to stdout when it is "-"; everything the robot prints then goes
+to stderr. Exit code: 0 if every task succeeded, 1 if some did not, 2 if the
+campaign could not start.
+
+Runs are persisted (robot/task_store.py, the results carry their "run_id"), a
+stopped one continues with:
+
+    python -m src.robot.cli resume [--run-id ID] [--retry-failed]
+
+Task results of every run are also appended to RESULTS_DIR (robot/result_sink.py):
+
+    python -m src.robot.cli results [--action NAME] [--since 2025-10-07]
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from PyQt6.QtCore import QCoreApplication, QObject, pyqtSlot
+
+from src.my_constants import RESULTS_DIR
+from src.my_types import BrowserTaskType, RobotSettingsType
+
+EXIT_OK = 0
+EXIT_TASKS_FAILED = 1
+EXIT_BAD_INPUT = 2
+
+
+def default_settings() -> RobotSettingsType:
+    return RobotSettingsType(
+        is_mobile=False,
+        headless=True,
+        thread_num=8,
+        group_num=0,
+        delay_num=0,
+        group_file_path="",
+    )
+
+
+class CampaignReport(QObject):
+    """
+    Follows the tasks through BrowserManager.worker_signals and keeps one
+    record per task, by task_id (BrowserManager runs a copy of the task). A
+    proxy retry (not ready / unavailable) is counted; the task ends with the
+    "Finished" or the failure of a later run.
+    """
+
+    def __init__(self, tasks: List[BrowserTaskType], parent=None):
+        super().__init__(parent)
+        self.started_at = datetime.now()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        for task in tasks:
+            # TaskStore giữ task_id đã có
+            task.task_id = task.task_id or uuid.uuid4().hex
+            self._records[task.task_id] = {
+                "uid": task.user_info.uid,
+                "username": (task.user_info.username or "").strip(),
+                "action_name": task.action_name,
+                "status": "pending",
+                "message": "",
+                "retries": 0,
+                "finished_at": None,
+            }
+
+    def connect_signals(self, worker_signals):
+        worker_signals.failed_signal.connect(self.on_failed)
+        worker_signals.error_signal.connect(self.on_error)
+        worker_signals.proxy_not_ready_signal.connect(self.on_retry)
+        worker_signals.proxy_unavailable_signal.connect(self.on_retry)
+        worker_signals.requeue_signal.connect(self.on_requeue)
+        worker_signals.require_phone_number_signal.connect(self.on_require_input)
+        worker_signals.require_otp_code_signal.connect(self.on_require_input)
+        worker_signals.finished_signal.connect(self.on_finished)
+
+    def _record(self, browser: BrowserTaskType) -> Optional[Dict[str, Any]]:
+        return self._records.get(browser.task_id)
+
+    @pyqtSlot(BrowserTaskType, str, str)
+    def on_failed(self, browser: BrowserTaskType, message: str, raw_proxy: str):
+        record = self._record(browser)
+        if record is not None:
+            record["status"], record["message"] = "failed", message
+
+    @pyqtSlot(BrowserTaskType, str)
+    def on_error(self, browser: BrowserTaskType, message: str):
+        record = self._record(browser)
+        if record is not None:
+            record["status"], record["message"] = "error", message
+
+    @pyqtSlot(BrowserTaskType, str)
+    def on_retry(self, browser: BrowserTaskType, raw_proxy: str):
+        record = self._record(browser)
+        if record is not None:
+            record["status"] = "retrying"
+            record["retries"] += 1
+
+    @pyqtSlot(BrowserTaskType)
+    def on_requeue(self, browser: BrowserTaskType):
+        record = self._record(browser)
+        if record is not None:
+            record["status"] = "pending"
+
+    @pyqtSlot(BrowserTaskType)
+    def on_require_input(self, browser: BrowserTaskType):
+        record = self._record(browser)
+        if record is not None:
+            record["status"], record["message"] = "failed", "Requires user input"
+
+    @pyqtSlot(BrowserTaskType, str, str)
+    def on_finished(self, browser: BrowserTaskType, message: str, raw_proxy: str):
+        record = self._record(browser)
+        if record is None:
+            return
+        # Worker không phát "Finished" sau một lỗi hay khi trả tác vụ về hàng
+        # chờ: đây là kết quả của lần chạy cuối
+        if record["status"] in ("pending", "retrying"):
+            record["status"] = "succeeded"
+        record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+
+    def all_succeeded(self) -> bool:
+        return all(r["status"] == "succeeded" for r in self._records.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        tasks = list(self._records.values())
+        counts: Dict[str, int] = {}
+        for record in tasks:
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+        finished_at = datetime.now()
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": finished_at.isoformat(timespec="seconds"),
+            "duration_seconds": round(
+                (finished_at - self.started_at).total_seconds(), 3
+            ),
+            "total": len(tasks),
+            "counts": counts,
+            "tasks": tasks,
+        }
+
+
+def load_plan(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if not isinstance(plan, dict) or not isinstance(plan.get("actions"), list):
+        raise ValueError("the plan must be an object with an 'actions' list")
+    if not isinstance(plan.get("users", {}), dict):
+        raise ValueError("'users' must be an object of column filters")
+    if not isinstance(plan.get("settings", {}), dict):
+        raise ValueError("'settings' must be an object")
+    return plan
+
+
+def build_settings(
+    overrides: Dict[str, Any], args: argparse.Namespace
+) -> RobotSettingsType:
+    settings = default_settings()
+    for key, value in overrides.items():
+        if not hasattr(settings, key):
+            raise ValueError(f"unknown setting '{key}'")
+        setattr(settings, key, value)
+    if args.thread_num is not None:
+        settings.thread_num = args.thread_num
+    if args.headless is not None:
+        settings.headless = args.headless
+    if args.group_by_account:
+        settings.group_by_account = True
+    return settings
+
+
+def build_robot_controller():
+    """The services RobotController needs, without the GUI-only ones."""
+    # Import muộn để "--help" và lỗi tham số trả về ngay
+    from src.database.user_database import initialize_user_database
+    from src.database.product_database import initialize_product_database
+    from src.database.setting_database import initialize_setting_database
+    from src.models.user_model import UserModel
+    from src.models.product_model import (
+        MiscProductModel,
+        RealEstateProductModel,
+        RealEstateTemplateModel,
+    )
+    from src.models.setting_model import SettingProxyModel, SettingUserDataDirModel
+    from src.services.user_service import UserService
+    from src.services.product_service import (
+        RealEstateProductService,
+        RealEstateTemplateService,
+        MiscProductService,
+    )
+    from src.services.setting_service import (
+        SettingProxyService,
+        SettingUserDataDirService,
+    )
+    from src.controllers.robot_controller import RobotController
+
+    if not initialize_product_database():
+        raise RuntimeError("Initialize product database failed!")
+    if not initialize_user_database():
+        raise RuntimeError("Initialize user database failed!")
+    if not initialize_setting_database():
+        raise RuntimeError("Initialize setting database failed!")
+    return RobotController(
+        user_service=UserService(UserModel()),
+        misc_product_service=MiscProductService(MiscProductModel()),
+        re_product_service=RealEstateProductService(RealEstateProductModel()),
+        re_template_service=RealEstateTemplateService(RealEstateTemplateModel()),
+        setting_proxy_service=SettingProxyService(SettingProxyModel()),
+        setting_udd_service=SettingUserDataDirService(SettingUserDataDirModel()),
+    )
+
+
+def write_results(results: Dict[str, Any], output: str, stdout):
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if output == "-":
+        stdout.write(text + "\n")
+        stdout.flush()
+    else:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+def redirect_stdout(command):
+    """stdout is kept for the JSON results when --output is "-"."""
+
+    def wrapper(args: argparse.Namespace) -> int:
+        stdout = sys.stdout
+        if args.output == "-":
+            sys.stdout = sys.stderr
+        try:
+            return command(args, stdout)
+        finally:
+            sys.stdout = stdout
+
+    return wrapper
+
+
+def run_campaign(args: argparse.Namespace, stdout) -> int:
+    t0 = time.perf_counter()
+    try:
+        plan = load_plan(args.actions)
+        settings = build_settings(plan.get("settings", {}), args)
+    except (OSError, ValueError) as e:
+        print(f"[cli.run] Invalid plan {args.actions}: {e}", file=sys.stderr)
+        return EXIT_BAD_INPUT
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    robot_controller = build_robot_controller()
+
+    users = robot_controller.service.fetch_where(plan.get("users") or None)
+    if not users:
+        print(f"[cli.run] No user matches {plan.get('users')}.", file=sys.stderr)
+        return EXIT_BAD_INPUT
+    raw_proxies = robot_controller.get_raw_proxies()
+    if not raw_proxies:
+        print("[cli.run] No proxy configured.", file=sys.stderr)
+        return EXIT_BAD_INPUT
+
+    browser_actions = robot_controller.init_actions(
+        list_user_data=users, action_payloads=plan["actions"]
+    )
+    if settings.group_by_account:
+        browser_tasks = robot_controller.init_browser_tasks_sequential(browser_actions)
+    else:
+        browser_tasks = robot_controller.init_browser_tasks(browser_actions)
+    for browser_task in browser_tasks:
+        browser_task.is_mobile = settings.is_mobile
+        browser_task.headless = settings.headless
+    if not browser_tasks:
+        print("[cli.run] The plan produced no task.", file=sys.stderr)
+        return EXIT_BAD_INPUT
+
+    manager = create_manager(app, settings)
+    print(
+        f"[cli.run] {len(browser_tasks)} tasks, {len(users)} users, "
+        f"{len(raw_proxies)} proxies, ready in {time.perf_counter() - t0:.2f}s",
+        file=sys.stderr,
+    )
+    return execute(app, manager, browser_tasks, raw_proxies, args.output, stdout)
+
+
+def resume_campaign(args: argparse.Namespace, stdout) -> int:
+    try:
+        settings = build_settings({}, args)
+    except ValueError as e:
+        print(f"[cli.resume] {e}", file=sys.stderr)
+        return EXIT_BAD_INPUT
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    robot_controller = build_robot_controller()
+    raw_proxies = robot_controller.get_raw_proxies()
+    if not raw_proxies:
+        print("[cli.resume] No proxy configured.", file=sys.stderr)
+        return EXIT_BAD_INPUT
+
+    manager = create_manager(app, settings)
+    if manager.task_store is None:
+        print("[cli.resume] ROBOT_TASK_STORE is disabled.", file=sys.stderr)
+        return EXIT_BAD_INPUT
+    browser_tasks = manager.task_store.resume(
+        run_id=args.run_id, retry_failed=args.retry_failed
+    )
+    if not browser_tasks:
+        print(
+            f"[cli.resume] Nothing to resume ({args.run_id or 'no unfinished run'}).",
+            file=sys.stderr,
+        )
+        return EXIT_BAD_INPUT
+    if args.headless is not None:
+        for browser_task in browser_tasks:
+            browser_task.headless = settings.headless
+    print(
+        f"[cli.resume] Run {manager.task_store.run_id}: {len(browser_tasks)} tasks left "
+        f"({manager.task_store.run_summary()}).",
+        file=sys.stderr,
+    )
+    return execute(app, manager, browser_tasks, raw_proxies, args.output, stdout)
+
+
+def create_manager(app: QCoreApplication, settings: RobotSettingsType):
+    from src.robot.browser_manager import BrowserManager
+
+    manager = BrowserManager()
+    manager.set_settings(settings=settings)
+    for signal in (
+        manager.manager_signals.info_signal,
+        manager.manager_signals.warning_signal,
+        manager.manager_signals.error_signal,
+        manager.manager_signals.failed_signal,
+        manager.manager_signals.task_succeed_signal,
+    ):
+        signal.connect(lambda message: print(message, file=sys.stderr))
+    manager.manager_signals.finished_signal.connect(lambda message: app.quit())
+    return manager
+
+
+def execute(
+    app: QCoreApplication,
+    manager,
+    browser_tasks: List[BrowserTaskType],
+    raw_proxies: List[str],
+    output: str,
+    stdout,
+) -> int:
+    report = CampaignReport(browser_tasks)
+    report.connect_signals(manager.worker_signals)
+    manager.add_browsers(list_browsers=browser_tasks, list_raw_proxies=raw_proxies)
+    if not manager.is_all_task_finished():
+        app.exec()
+    results = report.to_dict()
+    if manager.task_store is not None:
+        results["run_id"] = manager.task_store.run_id
+    write_results(results, output, stdout)
+    return EXIT_OK if report.all_succeeded() else EXIT_TASKS_FAILED
+
+
+def show_results(args: argparse.Namespace) -> int:
+    from src.robot.result_sink import aggregate_results
+
+    try:
+        since = datetime.fromisoformat(args.since) if args.since else None
+    except ValueError as e:
+        print(f"[cli.results] Invalid --since: {e}", file=sys.stderr)
+        return EXIT_BAD_INPUT
+    summary = aggregate_results(args.dir, action=args.action, since=since)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.robot.cli", description="Run robot campaigns headless."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the actions of a plan file")
+    run_parser.add_argument("--actions", required=True, help="plan JSON file")
+    run_parser.set_defaults(func=redirect_stdout(run_campaign))
+    resume_parser = subparsers.add_parser(
+        "resume",
+        help="continue a stopped run, skipping its succeeded tasks",
+    )
+    resume_parser.add_argument(
+        "--run-id", default=None, help="run to resume (latest unfinished by default)"
+    )
+    resume_parser.add_argument(
+        "--retry-failed", action="store_true", help="run the failed tasks again"
+    )
+    resume_parser.set_defaults(func=redirect_stdout(resume_campaign))
+    for command_parser in (run_parser, resume_parser):
+        command_parser.add_argument(
+            "--output", default="-", help="results JSON file ('-' for stdout)"
+        )
+        command_parser.add_argument("--thread-num", type=int, default=None)
+        command_parser.add_argument(
+            "--headless", action=argparse.BooleanOptionalAction, default=None
+        )
+        command_parser.add_argument(
+            "--group-by-account",
+            action="store_true",
+            help="run an account's actions back to back in one worker",
+        )
+    results_parser = subparsers.add_parser(
+        "results", help="count the recorded task results per action and status"
+    )
+    results_parser.add_argument("--dir", default=RESULTS_DIR)
+    results_parser.add_argument("--action", default=None)
+    results_parser.add_argument(
+        "--since", default=None, help="ISO date/time of the oldest result to count"
+    )
+    results_parser.set_defaults(func=show_results)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
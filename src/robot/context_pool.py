@@ -0,0 +1,148 @@
+# src/robot/context_pool.py
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from playwright.sync_api import BrowserContext
+from undetected_playwright import Tarnished
+from PyQt6.QtCore import QThread, Qt
+
+from src.my_constants import BROWSER_CONTEXT_IDLE_SECONDS
+from src.robot.playwright_driver import launch_persistent_context
+
+# One lock per user data dir: Chromium refuses a profile that is already open.
+# A lock is held for as long as a context on that udd is open, warm or busy.
+UDD_LOCKS: Dict[str, threading.Lock] = {}
+_udd_locks_guard = threading.Lock()
+
+
+def get_udd_lock(udd: str) -> threading.Lock:
+    with _udd_locks_guard:
+        if udd not in UDD_LOCKS:
+            UDD_LOCKS[udd] = threading.Lock()
+        return UDD_LOCKS[udd]
+
+
+class _PooledContext:
+    __slots__ = ("context", "signature", "last_used", "closed")
+
+    def __init__(self, context: BrowserContext, signature: Tuple):
+        self.context = context
+        self.signature = signature
+        self.last_used = time.monotonic()
+        self.closed = False
+
+
+class ContextPool:
+    """
+    Launched persistent contexts of one worker thread, keyed by udd. Playwright
+    sync objects belong to the thread that created them, so every worker thread
+    has its own pool (get_context_pool()).
+
+    acquire() hands back the open context of the udd when it was launched with
+    the same user agent/headless/mobile/proxy settings, otherwise it launches
+    (and stealth-patches) a new one. release() keeps the context open when the
+    next task of the same account follows, or for `idle_seconds` afterwards:
+    the owning BrowserWorker waits that long for the account's next task
+    (BrowserWorker.hand_off()) and then closes it, which frees the udd lock.
+    Other contexts of the thread are closed by acquire(), since a busy thread
+    could not close them in time, and all of them when the thread finishes.
+    """
+
+    def __init__(self, idle_seconds: float = BROWSER_CONTEXT_IDLE_SECONDS):
+        self._idle_seconds = idle_seconds
+        self._contexts: Dict[str, _PooledContext] = {}
+
+    @property
+    def idle_seconds(self) -> float:
+        return self._idle_seconds
+
+    def acquire(
+        self, udd: str, context_kwargs: Dict[str, Any]
+    ) -> Tuple[BrowserContext, bool]:
+        """Returns (context, reused)."""
+        self.close_all(exclude_udd=udd)
+        signature = self._signature(context_kwargs)
+        pooled = self._contexts.get(udd)
+        if pooled is not None:
+            if not pooled.closed and pooled.signature == signature:
+                pooled.last_used = time.monotonic()
+                return pooled.context, True
+            self.close(udd)
+
+        udd_lock = get_udd_lock(udd)
+        udd_lock.acquire()
+        try:
+            context = launch_persistent_context(**context_kwargs)
+            Tarnished.apply_stealth(context)  # Áp dụng các kỹ thuật anti-detection
+        except Exception:
+            udd_lock.release()
+            raise
+        pooled = _PooledContext(context, signature)
+        context.on("close", lambda _: setattr(pooled, "closed", True))
+        self._contexts[udd] = pooled
+        return context, False
+
+    def release(self, udd: str, next_task_pending: bool = False) -> bool:
+        """Done with the context for now: keep it for the account's next task,
+        keep it warm for idle_seconds, or close it. Returns True if it is kept."""
+        pooled = self._contexts.get(udd)
+        if pooled is None:
+            return False
+        if not pooled.closed and (next_task_pending or self._idle_seconds > 0):
+            pooled.last_used = time.monotonic()
+            return True
+        self.close(udd)
+        return False
+
+    def close(self, udd: str):
+        pooled = self._contexts.pop(udd, None)
+        if pooled is None:
+            return
+        try:
+            if not pooled.closed:
+                pooled.context.close()
+        except Exception as e:
+            print(
+                f"[{self.__class__.__name__}.close] Error closing context of {udd}: {e}"
+            )
+        finally:
+            get_udd_lock(udd).release()
+
+    def close_idle(self, exclude_udd: Optional[str] = None):
+        now = time.monotonic()
+        for udd, pooled in list(self._contexts.items()):
+            if udd == exclude_udd:
+                continue
+            if pooled.closed or now - pooled.last_used >= self._idle_seconds:
+                self.close(udd)
+
+    def close_all(self, exclude_udd: Optional[str] = None):
+        for udd in list(self._contexts.keys()):
+            if udd != exclude_udd:
+                self.close(udd)
+
+    @staticmethod
+    def _signature(context_kwargs: Dict[str, Any]) -> Tuple:
+        proxy = context_kwargs.get("proxy") or {}
+        return (
+            context_kwargs.get("user_agent"),
+            context_kwargs.get("headless"),
+            context_kwargs.get("is_mobile"),
+            tuple(sorted(proxy.items())),
+        )
+
+
+_local = threading.local()
+
+
+def get_context_pool() -> ContextPool:
+    """The calling thread's ContextPool, closed when the thread finishes."""
+    pool: Optional[ContextPool] = getattr(_local, "pool", None)
+    if pool is None:
+        pool = ContextPool()
+        _local.pool = pool
+        thread = QThread.currentThread()
+        if thread is not None:
+            thread.finished.connect(pool.close_all, Qt.ConnectionType.DirectConnection)
+    return pool
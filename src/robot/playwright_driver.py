@@ -0,0 +1,76 @@
+# src/robot/playwright_driver.py
+import threading
+from typing import Optional
+
+from playwright.sync_api import Playwright, BrowserContext, sync_playwright
+from PyQt6.QtCore import QThread, Qt
+
+# Substrings of the errors raised once the Node driver process is gone
+DRIVER_CLOSED_ERRORS = (
+    "Connection closed",
+    "connection closed",
+    "Event loop is closed",
+)
+
+_local = threading.local()
+
+
+def get_playwright() -> Playwright:
+    """
+    Returns the Playwright instance of the calling thread, starting its Node
+    driver on first use. Sync API objects are bound to the thread that created
+    them, so each worker thread keeps its own instance alive across tasks.
+    QThreadPool threads stop it when they expire; other threads call
+    stop_playwright() themselves.
+    """
+    playwright: Optional[Playwright] = getattr(_local, "playwright", None)
+    if playwright is not None:
+        return playwright
+    manager = sync_playwright()
+    playwright = manager.start()
+    _local.manager = manager
+    _local.playwright = playwright
+    if not getattr(_local, "cleanup_connected", False):
+        thread = QThread.currentThread()
+        if thread is not None:
+            thread.finished.connect(stop_playwright, Qt.ConnectionType.DirectConnection)
+            _local.cleanup_connected = True
+    return playwright
+
+
+def stop_playwright():
+    """Stops the calling thread's driver (no-op if none is running)."""
+    manager = getattr(_local, "manager", None)
+    _local.manager = None
+    _local.playwright = None
+    if manager is None:
+        return
+    try:
+        manager.__exit__(None, None, None)
+    except Exception as e:
+        print(f"[stop_playwright] Error: {e}")
+
+
+def restart_playwright() -> Playwright:
+    stop_playwright()
+    return get_playwright()
+
+
+def is_driver_closed_error(error: Exception) -> bool:
+    message = str(error)
+    return any(text in message for text in DRIVER_CLOSED_ERRORS)
+
+
+def launch_persistent_context(**context_kwargs) -> BrowserContext:
+    """
+    chromium.launch_persistent_context on the thread's shared driver. If the
+    driver has died (crash, killed node process), it is restarted and the
+    launch is retried once.
+    """
+    try:
+        return get_playwright().chromium.launch_persistent_context(**context_kwargs)
+    except Exception as e:
+        if not is_driver_closed_error(e):
+            raise
+        print(f"[launch_persistent_context] Playwright driver lost ({e}), restarting.")
+        return restart_playwright().chromium.launch_persistent_context(**context_kwargs)
@@ -0,0 +1,180 @@
+# src/robot/process_runner.py
+import multiprocessing
+import queue
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer
+
+from src.my_constants import ROBOT_PROCESS_POLL_MS
+from src.my_types import BrowserManagerSignals, BrowserTaskType, RobotSettingsType
+
+# Events sent by a shard: (kind, shard_id, payload). kind is the name of the
+# BrowserManagerSignals signal without "_signal"; payload is its argument tuple.
+_FORWARDED_SIGNALS = (
+    "info",
+    "warning",
+    "error",
+    "failed",
+    "task_succeed",
+    "progress",
+)
+
+
+def _run_shard(
+    shard_id: int,
+    settings: RobotSettingsType,
+    tasks: List[BrowserTaskType],
+    raw_proxies: List[str],
+    events: multiprocessing.Queue,
+):
+    """Child process: its own Qt application, BrowserManager and worker pool."""
+    from PyQt6.QtGui import QGuiApplication
+    from src.robot.browser_manager import BrowserManager
+
+    app = QGuiApplication(sys.argv[:1])
+    manager = BrowserManager()
+    manager.set_settings(settings=settings)
+    for kind in _FORWARDED_SIGNALS:
+        getattr(manager.manager_signals, f"{kind}_signal").connect(
+            lambda *args, kind=kind: events.put((kind, shard_id, args))
+        )
+
+    def on_finished(message: str):
+        events.put(("finished", shard_id, (message,)))
+        app.quit()
+
+    manager.manager_signals.finished_signal.connect(on_finished)
+    manager.add_browsers(list_browsers=tasks, list_raw_proxies=raw_proxies)
+    sys.exit(app.exec())
+
+
+def shard_tasks(
+    tasks: List[BrowserTaskType], raw_proxies: List[str], shard_count: int
+) -> List[Tuple[List[BrowserTaskType], List[str]]]:
+    """
+    Splits tasks by account (every task of a uid lands in the same shard, so
+    two processes never open the same profile) and splits the proxies so each
+    one is leased by a single process. Shards without tasks or proxies are
+    dropped.
+    """
+    shard_count = max(1, min(shard_count, len(raw_proxies) or 1))
+    uid_to_shard: Dict[str, int] = {}
+    shards: List[Tuple[List[BrowserTaskType], List[str]]] = [
+        ([], []) for _ in range(shard_count)
+    ]
+    for task in tasks:
+        uid = task.user_info.uid
+        if uid not in uid_to_shard:
+            uid_to_shard[uid] = len(uid_to_shard) % shard_count
+        shards[uid_to_shard[uid]][0].append(task)
+    for index, raw_proxy in enumerate(raw_proxies):
+        shards[index % shard_count][1].append(raw_proxy)
+    return [shard for shard in shards if shard[0] and shard[1]]
+
+
+class ShardedRobotRunner(QObject):
+    """
+    Drop-in alternative to BrowserManager (set_settings / add_browsers /
+    is_all_task_finished / manager_signals) that runs the tasks in child
+    processes, each with its own BrowserManager and thread pool.
+
+    The GUI process only drains the event queue every ROBOT_PROCESS_POLL_MS and
+    re-emits the events on manager_signals. Progress events are coalesced to
+    the latest one per poll, since the status bar only shows that one. A shard
+    that dies without reporting is announced on error_signal; the other shards
+    and the app keep running.
+    """
+
+    def __init__(self, shard_count: int, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.shard_count = max(1, shard_count)
+        self.manager_signals = BrowserManagerSignals()
+        self._settings: Optional[RobotSettingsType] = None
+        self._mp = multiprocessing.get_context("spawn")
+        self._events = self._mp.Queue()
+        # shard_id -> process, while it runs
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._next_shard_id = 0
+        self._poll_timer = QTimer(self)
+        self._poll_timer.timeout.connect(self._poll)
+
+    # --------------------- BrowserManager API --------------------- #
+    def set_settings(self, settings: RobotSettingsType):
+        self._settings = settings
+
+    def add_browsers(
+        self, list_browsers: List[BrowserTaskType], list_raw_proxies: List[str]
+    ):
+        shards = shard_tasks(list_browsers, list_raw_proxies, self.shard_count)
+        for tasks, raw_proxies in shards:
+            shard_settings = RobotSettingsType(**vars(self._settings))
+            # Các tiến trình chia nhau số luồng đã chọn
+            shard_settings.thread_num = max(1, self._settings.thread_num // len(shards))
+            shard_id = self._next_shard_id
+            self._next_shard_id += 1
+            process = self._mp.Process(
+                target=_run_shard,
+                args=(shard_id, shard_settings, tasks, raw_proxies, self._events),
+                name=f"robot-shard-{shard_id}",
+                daemon=True,
+            )
+            process.start()
+            self._processes[shard_id] = process
+            self.manager_signals.info_signal.emit(
+                f"ℹ️ Shard {shard_id}: {len(tasks)} tasks, {len(raw_proxies)} proxies (pid {process.pid})"
+            )
+        if not shards:
+            self.manager_signals.finished_signal.emit("All tasks finished!")
+            return
+        if not self._poll_timer.isActive():
+            self._poll_timer.start(ROBOT_PROCESS_POLL_MS)
+
+    def is_all_task_finished(self) -> bool:
+        return not self._processes
+
+    def stop(self):
+        """Terminates the running shards."""
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self._processes.values():
+            process.join(5)
+        self._processes.clear()
+        self._poll_timer.stop()
+
+    # --------------------- event pump --------------------- #
+    def _poll(self):
+        latest_progress = None
+        while True:
+            try:
+                kind, shard_id, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                latest_progress = payload
+            elif kind == "finished":
+                self._on_shard_finished(shard_id)
+            else:
+                getattr(self.manager_signals, f"{kind}_signal").emit(*payload)
+        if latest_progress is not None:
+            self.manager_signals.progress_signal.emit(*latest_progress)
+
+        for shard_id, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            if process.exitcode != 0:
+                self.manager_signals.error_signal.emit(
+                    f"\t\t❌ ERROR Shard {shard_id} stopped unexpectedly (exit code {process.exitcode})."
+                )
+            self._on_shard_finished(shard_id)
+
+    def _on_shard_finished(self, shard_id: int):
+        process = self._processes.pop(shard_id, None)
+        if process is None:
+            return
+        process.join(1)
+        if not self._processes:
+            self._poll_timer.stop()
+            print("All tasks finished!")
+            self.manager_signals.finished_signal.emit("All tasks finished!")
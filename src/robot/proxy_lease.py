@@ -0,0 +1,229 @@
+# src/robot/proxy_lease.py
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.my_constants import (
+    PROXY_COOLDOWN_SECONDS,
+    PROXY_MAX_CONCURRENCY,
+    PROXY_MAX_COOLDOWN_SECONDS,
+    PROXY_MIN_HEALTH,
+    PROXY_QUARANTINE_SECONDS,
+    PROXY_REUSE_CREDENTIALS,
+    PROXY_UNAVAILABLE_COOLDOWN_SECONDS,
+)
+from src.utils.proxy_providers import find_provider
+
+# Outcomes reported on release, the status codes of utils/get_proxy.get_proxy
+PROXY_OK = 100
+PROXY_NOT_READY = 101
+PROXY_UNAVAILABLE = 102
+PROXY_ERROR = 0
+
+MAX_HEALTH = 100
+
+
+class _ProxyState:
+    __slots__ = (
+        "raw_proxy",
+        "leases",
+        "health",
+        "cooldown_until",
+        "not_ready_streak",
+        "last_leased",
+        "max_concurrency",
+        "rotation_seconds",
+        "rotation_ready_at",
+    )
+
+    def __init__(self, raw_proxy: str, max_concurrency: int, rotation_seconds: float):
+        self.raw_proxy = raw_proxy
+        self.max_concurrency = max_concurrency
+        # Proxy xoay: thời gian tối thiểu giữa hai lần gọi API xoay
+        self.rotation_seconds = rotation_seconds
+        self.rotation_ready_at = 0.0
+        self.leases = 0
+        self.health = MAX_HEALTH
+        self.cooldown_until = 0.0
+        self.not_ready_streak = 0
+        self.last_leased = 0.0
+
+
+class ProxyLeaseManager:
+    """
+    Hands out the robot's rotating proxies to tasks, independently of the
+    worker threads that run them.
+
+    - A proxy serves up to `max_concurrency` tasks at once, or the
+      concurrency its provider declares (utils/proxy_providers.py).
+    - With `rotation_spacing` (when the rotation client does not reuse
+      credentials), an idle rotating proxy is only leased again once its
+      provider's rotation_seconds have passed since it was last rotated, so
+      the API is not called while it would answer 101.
+    - release() takes the outcome of the lease (get_proxy status codes):
+      100 raises the health score, 101 (not ready) starts a cooldown that
+      doubles on every consecutive 101 up to `max_cooldown`, 102
+      (unavailable) costs a lot of health and a long cooldown. A proxy whose
+      health falls under `min_health` is quarantined, then comes back at half
+      health.
+    - acquire() prefers healthy, idle, least recently used proxies and skips
+      the ones cooling down. next_ready_in() tells when one comes back.
+
+    Workers release their proxy as soon as the page work is done, so the
+    post-task delay of a worker does not keep it.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = PROXY_MAX_CONCURRENCY,
+        cooldown: float = PROXY_COOLDOWN_SECONDS,
+        max_cooldown: float = PROXY_MAX_COOLDOWN_SECONDS,
+        unavailable_cooldown: float = PROXY_UNAVAILABLE_COOLDOWN_SECONDS,
+        min_health: int = PROXY_MIN_HEALTH,
+        quarantine: float = PROXY_QUARANTINE_SECONDS,
+        rotation_spacing: bool = not PROXY_REUSE_CREDENTIALS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.unavailable_cooldown = unavailable_cooldown
+        self.min_health = min_health
+        self.quarantine = quarantine
+        self.rotation_spacing = rotation_spacing
+        self._clock = clock
+        self._proxies: Dict[str, _ProxyState] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._proxies)
+
+    def __contains__(self, raw_proxy: str) -> bool:
+        return raw_proxy in self._proxies
+
+    def add(self, raw_proxy: str) -> bool:
+        """Returns False if the proxy is already known."""
+        with self._lock:
+            if raw_proxy in self._proxies:
+                return False
+            provider = find_provider(raw_proxy)
+            max_concurrency = self.max_concurrency
+            rotation_seconds = 0.0
+            if provider is not None:
+                max_concurrency = max(1, provider.concurrency or max_concurrency)
+                if provider.rotating and self.rotation_spacing:
+                    rotation_seconds = provider.rotation_seconds
+            self._proxies[raw_proxy] = _ProxyState(
+                raw_proxy, max_concurrency, rotation_seconds
+            )
+            return True
+
+    def remove(self, raw_proxy: str):
+        with self._lock:
+            self._proxies.pop(raw_proxy, None)
+
+    # --------------------- leasing --------------------- #
+    def acquire(self) -> Optional[str]:
+        """Leases the best available proxy, None if all are busy or cooling down."""
+        with self._lock:
+            now = self._clock()
+            best: Optional[_ProxyState] = None
+            for state in self._available(now):
+                if best is None or self._rank(state) < self._rank(best):
+                    best = state
+            if best is None:
+                return None
+            if best.leases == 0 and best.rotation_seconds > 0:
+                # Proxy rảnh sẽ được xoay khi khởi động tác vụ này
+                best.rotation_ready_at = now + best.rotation_seconds
+            best.leases += 1
+            best.last_leased = now
+            return best.raw_proxy
+
+    def release(self, raw_proxy: str, outcome: Optional[int] = PROXY_OK):
+        """
+        Ends one lease of the proxy and records how it went. outcome=None
+        releases without touching the health score (the task failed for a
+        reason unrelated to the proxy).
+        """
+        with self._lock:
+            state = self._proxies.get(raw_proxy)
+            if state is None:
+                return
+            state.leases = max(0, state.leases - 1)
+            if outcome is not None:
+                self._record(state, outcome, self._clock())
+
+    def _record(self, state: _ProxyState, outcome: int, now: float):
+        if outcome == PROXY_OK:
+            state.health = min(MAX_HEALTH, state.health + 5)
+            state.not_ready_streak = 0
+            return
+        if outcome == PROXY_NOT_READY:
+            state.health -= 10
+            state.not_ready_streak += 1
+            cooldown = min(
+                self.cooldown * 2 ** (state.not_ready_streak - 1), self.max_cooldown
+            )
+        elif outcome == PROXY_UNAVAILABLE:
+            state.health -= 40
+            cooldown = self.unavailable_cooldown
+        else:
+            state.health -= 5
+            cooldown = self.cooldown
+        if state.health < self.min_health:
+            state.health = MAX_HEALTH // 2
+            state.not_ready_streak = 0
+            cooldown = max(cooldown, self.quarantine)
+        state.cooldown_until = max(state.cooldown_until, now + cooldown)
+
+    # --------------------- introspection --------------------- #
+    def available_count(self) -> int:
+        with self._lock:
+            return sum(1 for _ in self._available(self._clock()))
+
+    def has_available(self) -> bool:
+        return self.available_count() > 0
+
+    def active_lease_count(self) -> int:
+        with self._lock:
+            return sum(state.leases for state in self._proxies.values())
+
+    def lease_count(self, raw_proxy: str) -> int:
+        with self._lock:
+            state = self._proxies.get(raw_proxy)
+            return state.leases if state else 0
+
+    def next_ready_in(self) -> Optional[float]:
+        """
+        Seconds until a proxy that is cooling down comes back (0 if one is
+        available now), None if every proxy is leased and none is cooling down.
+        """
+        with self._lock:
+            now = self._clock()
+            waits: List[float] = []
+            for state in self._proxies.values():
+                if state.leases >= state.max_concurrency:
+                    continue
+                ready_at = state.cooldown_until
+                if state.leases == 0:
+                    ready_at = max(ready_at, state.rotation_ready_at)
+                waits.append(max(0.0, ready_at - now))
+            return min(waits) if waits else None
+
+    def health(self, raw_proxy: str) -> Optional[int]:
+        state = self._proxies.get(raw_proxy)
+        return state.health if state else None
+
+    def _available(self, now: float):
+        for state in self._proxies.values():
+            if (
+                state.leases < state.max_concurrency
+                and state.cooldown_until <= now
+                and (state.leases > 0 or state.rotation_ready_at <= now)
+            ):
+                yield state
+
+    @staticmethod
+    def _rank(state: _ProxyState):
+        return (-state.health, state.leases, state.last_leased)
@@ -0,0 +1,251 @@
+# src/robot/result_sink.py
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.database.connection_provider import release_thread_connections
+from src.my_constants import (
+    RESULTS_DIR,
+    RESULT_SINK_FSYNC_SECONDS,
+    RESULT_SINK_MAX_BYTES,
+    RESULT_SINK_QUEUE_SIZE,
+)
+from src.my_types import BrowserTaskType
+
+# Mỗi tiến trình (kể cả các shard của ROBOT_PROCESS_SHARDS) ghi file riêng
+CURRENT_FILE_NAME = "results-{pid}.jsonl"
+ROTATED_FILE_NAME = "results-{pid}-{timestamp}.jsonl"
+_STOP = object()
+
+
+class ResultSink:
+    """
+    Append-only JSON Lines log of the robot's task results. Workers only put a
+    record on a bounded queue (they wait when it is full); one writer thread
+    appends the queued records in a single write, fsyncs at most every
+    fsync_seconds, and rotates results-<pid>.jsonl to
+    results-<pid>-<timestamp>.jsonl once it reaches max_bytes. Every process
+    has its own file, so shards never rotate a file another one writes to.
+    Each line is written whole with O_APPEND, so a crash loses at most the
+    records of the last fsync period and never leaves a broken file, only
+    possibly a truncated last line (skipped by the reader).
+    """
+
+    def __init__(
+        self,
+        directory: str = RESULTS_DIR,
+        queue_size: int = RESULT_SINK_QUEUE_SIZE,
+        fsync_seconds: float = RESULT_SINK_FSYNC_SECONDS,
+        max_bytes: int = RESULT_SINK_MAX_BYTES,
+    ):
+        self.directory = directory
+        self.path = os.path.join(directory, CURRENT_FILE_NAME.format(pid=os.getpid()))
+        self.fsync_seconds = fsync_seconds
+        self.max_bytes = max_bytes
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._fd: Optional[int] = None
+        self._size = 0
+        self._unsynced = False
+        self._last_fsync = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="ResultSink", daemon=True
+            )
+            self._thread.start()
+
+    def write(self, record: Dict[str, Any], timeout: Optional[float] = None):
+        """Queues a record; raises queue.Full if it cannot within timeout."""
+        self.start()
+        self._queue.put(record, timeout=timeout)
+
+    def flush(self):
+        """Waits until every queued record has been written (not fsynced)."""
+        self._queue.join()
+
+    def close(self, timeout: float = 10):
+        """Writes the queued records, fsyncs and stops the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # --------------------- writer thread --------------------- #
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.fsync_seconds)
+            except queue.Empty:
+                item = None
+            items = [] if item is None else [item]
+            # Gom mọi bản ghi đang chờ vào một lần ghi
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [item for item in items if item is not _STOP]
+            stopping = len(records) != len(items)
+            try:
+                if records:
+                    self._append(records)
+                if self._unsynced and (
+                    stopping
+                    or time.monotonic() - self._last_fsync >= self.fsync_seconds
+                ):
+                    self._fsync()
+            except Exception as e:
+                print(f"[{self.__class__.__name__}] Cannot write results: {e}")
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        # Luồng threading thường: tự đóng các kết nối DB đã clone cho luồng này
+        release_thread_connections()
+
+    def _append(self, records: List[Dict[str, Any]]):
+        data = "".join(
+            json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            for record in records
+        ).encode("utf-8")
+        if self._fd is None:
+            self._open()
+        if self._size > 0 and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        os.write(self._fd, data)
+        self._size += len(data)
+        self._unsynced = True
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._size = os.fstat(self._fd).st_size
+
+    def _rotate(self):
+        self._fsync()
+        os.close(self._fd)
+        self._fd = None
+        rotated_name = ROTATED_FILE_NAME.format(
+            pid=os.getpid(), timestamp=datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        )
+        os.replace(self.path, os.path.join(self.directory, rotated_name))
+        self._open()
+
+    def _fsync(self):
+        if self._fd is not None:
+            os.fsync(self._fd)
+        self._unsynced = False
+        self._last_fsync = time.monotonic()
+
+
+_sink: Optional[ResultSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_result_sink() -> ResultSink:
+    """The process-wide sink, closed (flushed and fsynced) at exit."""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = ResultSink()
+            atexit.register(_sink.close)
+        return _sink
+
+
+def task_result_record(
+    task: BrowserTaskType, status: str, result: Any = None, error: str = ""
+) -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "task_id": task.task_id,
+        "uid": task.user_info.uid,
+        "username": (task.user_info.username or "").strip(),
+        "action": task.action_name,
+        "status": status,
+        "result": result,
+        "error": error,
+    }
+
+
+def record_task_result(
+    task: BrowserTaskType, status: str, result: Any = None, error: str = ""
+):
+    get_result_sink().write(task_result_record(task, status, result, error))
+
+
+# --------------------- reader --------------------- #
+def result_files(directory: str = RESULTS_DIR) -> List[str]:
+    """The files of every process (and the results.jsonl of older versions), least recently written first."""
+    files = []
+    for path in glob.glob(os.path.join(directory, "results*.jsonl")):
+        try:
+            files.append((os.path.getmtime(path), path))
+        except OSError:
+            continue  # Vừa được xoay bởi tiến trình đang ghi
+    return [path for _mtime, path in sorted(files)]
+
+
+def iter_results(
+    directory: str = RESULTS_DIR,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams the records, optionally of one action and from a time on. Files
+    last modified before `since` are skipped without being opened, and the
+    action filter is checked on the raw line before parsing it.
+    """
+    action_marker = (
+        json.dumps({"action": action}, ensure_ascii=False)[1:-1].encode("utf-8")
+        if action
+        else None
+    )
+    since_text = since.isoformat() if since else None
+    for path in result_files(directory):
+        try:
+            if since is not None and os.path.getmtime(path) < since.timestamp():
+                continue
+            f = open(path, "rb")
+        except OSError:
+            continue  # Vừa được xoay hoặc bị xóa trong lúc đọc
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Dòng cuối bị cắt dở do tắt đột ngột
+                if action_marker is not None and action_marker not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if since_text and record.get("timestamp", "") < since_text:
+                    continue
+                yield record
+
+
+def aggregate_results(
+    directory: str = RESULTS_DIR,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+) -> Dict[str, Dict[str, int]]:
+    """{action: {status: count}} over the records of iter_results()."""
+    summary: Dict[str, Dict[str, int]] = {}
+    for record in iter_results(directory, action=action, since=since):
+        counts = summary.setdefault(record.get("action") or "", {})
+        status = record.get("status") or ""
+        counts[status] = counts.get(status, 0) + 1
+    return summary
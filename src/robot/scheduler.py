@@ -0,0 +1,249 @@
+# src/robot/scheduler.py
+import heapq
+import itertools
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Pure Python on purpose (no Qt, no my_types import): it can be unit-tested and
+# benchmarked on its own, see src/test/bench_scheduler.py.
+
+
+def _default_account(task: Any) -> Hashable:
+    return task.user_info.uid
+
+
+def _default_action(task: Any) -> Optional[str]:
+    return task.action_name
+
+
+def _default_priority(task: Any) -> Optional[int]:
+    return getattr(task, "priority", None)
+
+
+def _default_deadline(task: Any) -> Optional[float]:
+    return getattr(task, "deadline", None)
+
+
+class _AccountQueue:
+    __slots__ = ("heap", "running", "skipped", "ready_at")
+
+    def __init__(self):
+        # (priority, deadline, seq, task)
+        self.heap: List[Tuple[int, float, int, Any]] = []
+        self.running = 0
+        self.skipped = 0
+        # clock() time before which the account is cooling down
+        self.ready_at = 0.0
+
+
+class TaskScheduler:
+    """
+    Decides which pending task runs next, replacing the FIFO deque of
+    BrowserManager.
+
+    - Priority classes: a lower number runs first. The class comes from the
+      task's own `priority`, else `priorities[action_name]`, else
+      `default_priority`.
+    - Earliest deadline first: inside a priority class, tasks with a
+      `deadline` (epoch seconds) run before the others, earliest first.
+    - Round-robin per account: among accounts whose next task is equally
+      urgent, the one served longest ago goes first, so a retried task goes
+      behind the other accounts instead of to the head of the queue.
+    - At most `max_per_account` running tasks per account.
+    - Cool-down: after cool_down(account, seconds) the account's tasks wait
+      until the delay has elapsed, without holding a worker.
+    - Starvation counter: an account passed over `starvation_limit` times in a
+      row while it could run is served next, whatever its priority
+      (0 disables it).
+
+    pop() counts the task as running for its account until task_done().
+    """
+
+    def __init__(
+        self,
+        priorities: Optional[Dict[str, int]] = None,
+        default_priority: int = 10,
+        max_per_account: int = 1,
+        starvation_limit: int = 0,
+        account_of: Callable[[Any], Hashable] = _default_account,
+        action_of: Callable[[Any], Optional[str]] = _default_action,
+        priority_of: Callable[[Any], Optional[int]] = _default_priority,
+        deadline_of: Callable[[Any], Optional[float]] = _default_deadline,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.priorities = dict(priorities or {})
+        self.default_priority = default_priority
+        self.max_per_account = max(1, max_per_account)
+        self.starvation_limit = starvation_limit
+        self._account_of = account_of
+        self._action_of = action_of
+        self._priority_of = priority_of
+        self._deadline_of = deadline_of
+        self._clock = clock
+        # Accounts in round-robin order: least recently served first
+        self._accounts: "OrderedDict[Hashable, _AccountQueue]" = OrderedDict()
+        self._seq = itertools.count()
+        self._pending = 0
+        self.starved_picks = 0
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def __bool__(self) -> bool:
+        return self._pending > 0
+
+    # --------------------- queueing --------------------- #
+    def push(self, task: Any):
+        account = self._get_account(self._account_of(task))
+        heapq.heappush(account.heap, self._entry(task))
+        self._pending += 1
+
+    def extend(self, tasks: List[Any]):
+        for task in tasks:
+            self.push(task)
+
+    def requeue(self, task: Any):
+        """
+        Puts back a task that could not run (proxy unavailable/not ready...).
+        It keeps its priority and deadline but its account moves to the end of
+        the rotation.
+        """
+        account_key = self._account_of(task)
+        self.push(task)
+        self._accounts.move_to_end(account_key)
+
+    def _entry(self, task: Any) -> Tuple[int, float, int, Any]:
+        priority = self._priority_of(task)
+        if priority is None:
+            priority = self.priorities.get(self._action_of(task), self.default_priority)
+        deadline = self._deadline_of(task)
+        return (
+            priority,
+            deadline if deadline is not None else math.inf,
+            next(self._seq),
+            task,
+        )
+
+    def _get_account(self, account_key: Hashable) -> _AccountQueue:
+        account = self._accounts.get(account_key)
+        if account is None:
+            account = _AccountQueue()
+            self._accounts[account_key] = account
+        return account
+
+    # --------------------- dispatching --------------------- #
+    def pop(self) -> Optional[Any]:
+        """
+        The next task to start, or None when every account with pending tasks
+        is already at max_per_account or cooling down.
+        """
+        now = self._clock()
+        chosen_key = None
+        chosen_rank = None
+        starving_key = None
+        eligible: List[_AccountQueue] = []
+        for account_key, account in self._accounts.items():
+            if not self._is_eligible(account, now):
+                continue
+            eligible.append(account)
+            if (
+                starving_key is None
+                and self.starvation_limit
+                and account.skipped >= self.starvation_limit
+            ):
+                starving_key = account_key
+            rank = account.heap[0][:2]
+            if chosen_rank is None or rank < chosen_rank:
+                chosen_key, chosen_rank = account_key, rank
+        if chosen_key is None:
+            return None
+        if starving_key is not None:
+            if starving_key != chosen_key:
+                self.starved_picks += 1
+            chosen_key = starving_key
+
+        chosen = self._accounts[chosen_key]
+        for account in eligible:
+            if account is not chosen:
+                account.skipped += 1
+        chosen.skipped = 0
+        return self._take(chosen_key, chosen)
+
+    def pop_account(self, account_key: Hashable) -> List[Any]:
+        """
+        Every pending task of one account, in scheduling order, counted as
+        running (used to hand a whole account to one worker).
+        """
+        account = self._accounts.get(account_key)
+        if account is None:
+            return []
+        tasks = []
+        while account.heap:
+            tasks.append(self._take(account_key, account))
+        return tasks
+
+    def _take(self, account_key: Hashable, account: _AccountQueue) -> Any:
+        task = heapq.heappop(account.heap)[-1]
+        account.running += 1
+        self._pending -= 1
+        self._accounts.move_to_end(account_key)
+        return task
+
+    def _is_eligible(self, account: _AccountQueue, now: float) -> bool:
+        return (
+            bool(account.heap)
+            and account.running < self.max_per_account
+            and account.ready_at <= now
+        )
+
+    def cool_down(self, account_key: Hashable, seconds: float):
+        """The account's pending and future tasks wait `seconds` from now."""
+        if seconds <= 0:
+            return
+        account = self._get_account(account_key)
+        account.ready_at = max(account.ready_at, self._clock() + seconds)
+
+    def next_ready_in(self) -> Optional[float]:
+        """
+        Seconds until an account with pending tasks leaves its cool-down (0 if
+        one can run now), None if all of them are at max_per_account.
+        """
+        now = self._clock()
+        waits = [
+            max(0.0, account.ready_at - now)
+            for account in self._accounts.values()
+            if account.heap and account.running < self.max_per_account
+        ]
+        return min(waits) if waits else None
+
+    def task_done(self, task: Any):
+        """A popped task has finished (or was given back with requeue())."""
+        account_key = self._account_of(task)
+        account = self._accounts.get(account_key)
+        if account is None:
+            return
+        account.running = max(0, account.running - 1)
+        if (
+            not account.heap
+            and not account.running
+            and account.ready_at <= self._clock()
+        ):
+            del self._accounts[account_key]
+
+    # --------------------- introspection --------------------- #
+    def running_count(self, account_key: Hashable) -> int:
+        account = self._accounts.get(account_key)
+        return account.running if account else 0
+
+    def starvation_counts(self) -> Dict[Hashable, int]:
+        return {
+            account_key: account.skipped
+            for account_key, account in self._accounts.items()
+            if account.heap
+        }
+
+    def clear(self):
+        self._accounts.clear()
+        self._pending = 0
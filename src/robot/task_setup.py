@@ -0,0 +1,122 @@
+# src/robot/task_setup.py
+from typing import Any, Dict, Optional, Tuple, Union
+
+from src.my_types import BrowserTaskType, BrowserWorkerSignals
+from src.utils.proxy_client import get_proxy_client
+
+# Shared by BrowserWorker (sync API, one thread per browser) and
+# AsyncBrowserEngine (async API, one event loop).
+
+# failed_signal message of an action handler that returned False
+ACTION_FAILED_MESSAGE = "The action did not complete"
+
+
+def is_mobile_task(browser: BrowserTaskType) -> bool:
+    return browser.is_mobile or (browser.action_name == "share_latest_product")
+
+
+def build_context_kwargs(
+    browser: BrowserTaskType, worker_position: Optional[Tuple[int, int]]
+) -> Dict[str, Any]:
+    """launch_persistent_context() arguments of a task, without the proxy."""
+    # Xác định chế độ mobile/desktop trước khi tạo context_kwargs
+    is_mobile_mode = is_mobile_task(browser)
+    context_kwargs = dict(
+        user_data_dir=browser.udd,
+        user_agent=(
+            browser.user_info.mobile_ua
+            if is_mobile_mode
+            else browser.user_info.desktop_ua
+        ),
+        headless=browser.headless,
+        args=[
+            "--disable-blink-features=AutomationControlled",
+            f'--app-name=Chromium - {browser.user_info.username or "Unknown User"}',
+        ],
+        ignore_default_args=["--enable-automation"],
+    )
+
+    # --- Cấu hình kích thước cửa sổ và viewport ---
+    # Kích thước mặc định cho desktop (sẽ được ghi đè nếu là mobile)
+    window_width = 960
+    window_height = int(window_width * 0.56)
+
+    context_kwargs["device_scale_factor"] = 0.68  # Một yếu tố scale chung
+
+    if is_mobile_mode:
+        window_width = 375  # Chiều rộng tiêu chuẩn cho mobile
+        window_height = int(window_width * 1.5)  # Tỉ lệ cao hơn cho mobile
+        context_kwargs["is_mobile"] = True
+        context_kwargs["has_touch"] = True
+    else:  # Desktop mode
+        context_kwargs["is_mobile"] = False
+        context_kwargs["has_touch"] = False
+    # Screen size giống viewport
+    context_kwargs["viewport"] = {"width": window_width, "height": window_height}
+    context_kwargs["screen"] = {"width": window_width, "height": window_height}
+
+    # --- SỬ DỤNG VỊ TRÍ ĐƯỢC CẤP PHÁT TỪ BrowserManager ---
+    if worker_position is not None:
+        pos_x, pos_y = worker_position
+        context_kwargs["args"].append(f"--window-position={pos_x},{pos_y}")
+    return context_kwargs
+
+
+def info_page_html(browser: BrowserTaskType) -> str:
+    """Trang thông tin của tài khoản, hiển thị ở tab đầu tiên để dễ debug."""
+    username = browser.user_info.username.replace("\n", "")
+    return f"""
+    <html>
+        <head><title>{username}</title></head>
+        <body>
+            <h2>username: {username}</h2>
+            <p>id: {browser.user_info.id}</p>
+            <p>uid: {browser.user_info.uid}</p>
+            <p>user_data_dir: {browser.udd}</p>
+        </body>
+    </html>
+    """
+
+
+def resolve_proxy(
+    raw_proxy: str, browser: BrowserTaskType, signals: BrowserWorkerSignals
+) -> Union[dict, int]:
+    """
+    Asks the rotating proxy service for the current proxy (through the shared
+    ProxyRotationClient, which answers from its cache when it can). Returns the
+    Playwright proxy dict, -1 if the proxy is not ready (status 101), -2 if it
+    is unavailable (status 102) and 0 on any other error.
+    """
+    try:
+        res = get_proxy_client().get(raw_proxy)
+        status_code_str = res.get("status")  # Lấy status dưới dạng string
+
+        # Kiểm tra và chuyển đổi status_code an toàn
+        if status_code_str is None:
+            signals.failed_signal.emit(
+                browser,
+                "Proxy service response missing 'status' field.",
+                raw_proxy,
+            )
+            return 0
+
+        try:
+            status_code = int(status_code_str)
+        except ValueError:
+            signals.error_signal.emit(
+                browser,
+                f"Invalid proxy status code format: {status_code_str}",
+            )
+            return 0
+
+        if status_code == 100:
+            proxy = res.get("data")
+        elif status_code == 101:
+            return -1
+        elif status_code == 102:
+            return -2
+        else:  # Xử lý các mã trạng thái không mong muốn khác
+            return 0
+        return proxy
+    except Exception as e:
+        return 0  # Đảm bảo trả về 0 khi có lỗi
@@ -0,0 +1,321 @@
+# src/robot/task_store.py
+import json
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from src.database.connection_provider import get_connection
+from src.services.base_service import transaction
+from src.my_constants import (
+    CONNECTION_DB_USER,
+    TABLE_ROBOT_TASK,
+    TASK_STORE_FLUSH_MS,
+    TASK_STORE_FLUSH_SIZE,
+)
+from src.my_types import (
+    BrowserTaskType,
+    CreateAccountPayloadType,
+    LaunchPayloadType,
+    SellPayloadType,
+    UserType,
+)
+
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_SUCCEEDED = "succeeded"
+TASK_FAILED = "failed"
+
+_PAYLOAD_TYPES = {
+    payload_type.__name__: payload_type
+    for payload_type in (SellPayloadType, CreateAccountPayloadType, LaunchPayloadType)
+}
+
+
+def serialize_task(task: BrowserTaskType) -> str:
+    data = asdict(task)
+    payload = task.action_payload
+    data["payload_type"] = type(payload).__name__ if payload is not None else None
+    return json.dumps(data, ensure_ascii=False)
+
+
+def deserialize_task(task_data: str) -> BrowserTaskType:
+    data = json.loads(task_data)
+    payload_type = _PAYLOAD_TYPES.get(data.pop("payload_type", None))
+    payload = data.get("action_payload")
+    data["action_payload"] = (
+        payload_type(**payload) if payload_type and payload is not None else None
+    )
+    data["user_info"] = UserType(**data["user_info"])
+    return BrowserTaskType(**data)
+
+
+class TaskStore(QObject):
+    """
+    Persistent copy of a BrowserManager run in the robot_task table of the user
+    DB: one row per task with its state (pending, running, succeeded, failed),
+    retry count and last proxy, so a crashed or closed run can be resumed.
+
+    Rows are inserted in one batch when the tasks are added. State changes are
+    kept in memory and written together on flush() (TASK_STORE_FLUSH_SIZE
+    buffered changes or TASK_STORE_FLUSH_MS after the first one). Lives on the
+    thread of BrowserManager; if the user DB is not open (e.g. in a shard
+    process) the store stays disabled and the run is only in memory.
+    """
+
+    def __init__(
+        self,
+        connection_name: str = CONNECTION_DB_USER,
+        flush_ms: int = TASK_STORE_FLUSH_MS,
+        flush_size: int = TASK_STORE_FLUSH_SIZE,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._connection_name = connection_name
+        self._flush_size = max(1, flush_size)
+        self.run_id: Optional[str] = None
+        # task_id -> {"status", "retry_count", "last_proxy", "last_message"}
+        self._states: Dict[str, Dict[str, Any]] = {}
+        # task_id -> browser_id of the run marked running (BrowserManager
+        # dispatches a copy of the task per run)
+        self._runs: Dict[str, str] = {}
+        self._dirty: set = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_ms)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def _db(self) -> Optional[QSqlDatabase]:
+        db = get_connection(self._connection_name)
+        if not db.isOpen():
+            print(
+                f"[{self.__class__.__name__}] Database '{self._connection_name}' is not open, the run is not persisted."
+            )
+            return None
+        return db
+
+    # --------------------- run --------------------- #
+    def add_tasks(self, tasks: List[BrowserTaskType]) -> bool:
+        """Inserts the tasks that are not in the run yet (keeps or gives a task_id)."""
+        new_tasks = [
+            task
+            for task in tasks
+            if not task.task_id or task.task_id not in self._states
+        ]
+        if not new_tasks:
+            return True
+        db = self._db()
+        if db is None:
+            return False
+        if self.run_id is None:
+            self.run_id = uuid.uuid4().hex
+        for task in new_tasks:
+            task.task_id = task.task_id or uuid.uuid4().hex
+        columns = ["run_id", "task_id", "uid", "action_name", "task_data", "status"]
+        sql = (
+            f"INSERT INTO {TABLE_ROBOT_TASK} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})"
+        )
+        try:
+            with transaction(db) as db_conn:
+                query = QSqlQuery(db_conn)
+                if not query.prepare(sql):
+                    raise RuntimeError(query.lastError().text())
+                query.bindValue(0, [self.run_id] * len(new_tasks))
+                query.bindValue(1, [task.task_id for task in new_tasks])
+                query.bindValue(2, [task.user_info.uid for task in new_tasks])
+                query.bindValue(3, [task.action_name for task in new_tasks])
+                query.bindValue(4, [serialize_task(task) for task in new_tasks])
+                query.bindValue(5, [TASK_PENDING] * len(new_tasks))
+                if not query.execBatch():
+                    raise RuntimeError(query.lastError().text())
+        except Exception as e:
+            print(f"[{self.__class__.__name__}.add_tasks] Cannot insert tasks: {e}")
+            return False
+        for task in new_tasks:
+            self._states[task.task_id] = {
+                "status": TASK_PENDING,
+                "retry_count": 0,
+                "last_proxy": None,
+                "last_message": None,
+            }
+        return True
+
+    def resume(
+        self, run_id: Optional[str] = None, retry_failed: bool = False
+    ) -> List[BrowserTaskType]:
+        """
+        Continues a run (the latest unfinished one by default): returns its
+        pending tasks and the ones that were running when it stopped, plus the
+        failed ones if retry_failed. Succeeded tasks are skipped.
+        """
+        db = self._db()
+        if db is None:
+            return []
+        if run_id is None:
+            run_id = self.latest_unfinished_run()
+            if run_id is None:
+                return []
+        statuses = [TASK_PENDING, TASK_RUNNING] + (
+            [TASK_FAILED] if retry_failed else []
+        )
+        query = QSqlQuery(db)
+        query.prepare(
+            f"SELECT task_id, task_data, retry_count, last_proxy, last_message "
+            f"FROM {TABLE_ROBOT_TASK} WHERE run_id = ? "
+            f"AND status IN ({', '.join('?' * len(statuses))}) ORDER BY id"
+        )
+        for value in [run_id] + statuses:
+            query.addBindValue(value)
+        if not query.exec():
+            print(
+                f"[{self.__class__.__name__}.resume] Cannot read run {run_id}: {query.lastError().text()}"
+            )
+            return []
+        tasks: List[BrowserTaskType] = []
+        self.run_id = run_id
+        self._states.clear()
+        self._runs.clear()
+        self._dirty.clear()
+        while query.next():
+            try:
+                task = deserialize_task(query.value(1))
+            except Exception as e:
+                print(
+                    f"[{self.__class__.__name__}.resume] Skipping task {query.value(0)}: {e}"
+                )
+                continue
+            task.task_id = query.value(0)
+            tasks.append(task)
+            # Tác vụ đang chạy hoặc đã lỗi được xếp lại vào hàng chờ
+            self._states[task.task_id] = {
+                "status": TASK_PENDING,
+                "retry_count": int(query.value(2) or 0),
+                "last_proxy": query.value(3) or None,
+                "last_message": query.value(4) or None,
+            }
+            self._dirty.add(task.task_id)
+        self.flush()
+        return tasks
+
+    def latest_unfinished_run(self) -> Optional[str]:
+        db = self._db()
+        if db is None:
+            return None
+        query = QSqlQuery(db)
+        query.prepare(
+            f"SELECT run_id FROM {TABLE_ROBOT_TASK} WHERE status IN (?, ?) "
+            f"ORDER BY id DESC LIMIT 1"
+        )
+        query.addBindValue(TASK_PENDING)
+        query.addBindValue(TASK_RUNNING)
+        if query.exec() and query.next():
+            return query.value(0)
+        return None
+
+    def run_summary(self, run_id: Optional[str] = None) -> Dict[str, int]:
+        """{status: task count} of a run (the current one by default)."""
+        run_id = run_id or self.run_id
+        db = self._db() if run_id else None
+        if db is None:
+            return {}
+        self.flush()
+        query = QSqlQuery(db)
+        query.prepare(
+            f"SELECT status, COUNT(*) FROM {TABLE_ROBOT_TASK} WHERE run_id = ? GROUP BY status"
+        )
+        query.addBindValue(run_id)
+        summary: Dict[str, int] = {}
+        if query.exec():
+            while query.next():
+                summary[query.value(0)] = int(query.value(1))
+        return summary
+
+    # --------------------- state changes --------------------- #
+    def _update(self, task: BrowserTaskType, **changes) -> Optional[Dict[str, Any]]:
+        state = self._states.get(task.task_id) if task.task_id else None
+        if state is None:
+            return None
+        state.update(changes)
+        self._dirty.add(task.task_id)
+        if len(self._dirty) >= self._flush_size:
+            self.flush()
+        elif not self._flush_timer.isActive():
+            self._flush_timer.start()
+        return state
+
+    def _is_last_run(self, task: BrowserTaskType) -> bool:
+        """False for a late signal of an earlier run of a task started again."""
+        return self._runs.get(task.task_id, task.browser_id) == task.browser_id
+
+    def mark_running(self, task: BrowserTaskType, raw_proxy: Optional[str]):
+        if self._update(task, status=TASK_RUNNING, last_proxy=raw_proxy):
+            self._runs[task.task_id] = task.browser_id
+
+    def mark_retry(self, task: BrowserTaskType, raw_proxy: Optional[str]):
+        """The task went back to the queue (proxy not ready / unavailable)."""
+        state = self._states.get(task.task_id) if task.task_id else None
+        if state is not None and self._is_last_run(task):
+            self._update(
+                task,
+                status=TASK_PENDING,
+                retry_count=state["retry_count"] + 1,
+                last_proxy=raw_proxy,
+            )
+
+    def mark_requeued(self, task: BrowserTaskType):
+        """The task went back to the queue without running (not a retry)."""
+        if self._is_last_run(task):
+            self._update(task, status=TASK_PENDING)
+
+    def mark_failed(self, task: BrowserTaskType, message: str):
+        if self._is_last_run(task):
+            self._update(task, status=TASK_FAILED, last_message=message)
+
+    def mark_finished(self, task: BrowserTaskType):
+        """The worker finished the task: succeeded unless it failed or was requeued."""
+        state = self._states.get(task.task_id) if task.task_id else None
+        if (
+            state is not None
+            and state["status"] == TASK_RUNNING
+            and self._is_last_run(task)
+        ):
+            self._update(task, status=TASK_SUCCEEDED)
+
+    def flush(self) -> bool:
+        self._flush_timer.stop()
+        if not self._dirty or self.run_id is None:
+            return True
+        db = self._db()
+        if db is None:
+            return False
+        task_ids = list(self._dirty)
+        states = [self._states[task_id] for task_id in task_ids]
+        updated_at = str(datetime.now())
+        try:
+            with transaction(db) as db_conn:
+                query = QSqlQuery(db_conn)
+                if not query.prepare(
+                    f"UPDATE {TABLE_ROBOT_TASK} SET status = ?, retry_count = ?, "
+                    f"last_proxy = ?, last_message = ?, updated_at = ? "
+                    f"WHERE run_id = ? AND task_id = ?"
+                ):
+                    raise RuntimeError(query.lastError().text())
+                query.bindValue(0, [state["status"] for state in states])
+                query.bindValue(1, [state["retry_count"] for state in states])
+                query.bindValue(2, [state["last_proxy"] for state in states])
+                query.bindValue(3, [state["last_message"] for state in states])
+                query.bindValue(4, [updated_at] * len(states))
+                query.bindValue(5, [self.run_id] * len(states))
+                query.bindValue(6, task_ids)
+                if not query.execBatch():
+                    raise RuntimeError(query.lastError().text())
+        except Exception as e:
+            print(f"[{self.__class__.__name__}.flush] Cannot write task states: {e}")
+            self._flush_timer.start()
+            return False
+        self._dirty.difference_update(task_ids)
+        return True
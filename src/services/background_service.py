@@ -0,0 +1,138 @@
+# src/services/background_service.py
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from src.services.base_service import BaseService
+
+
+class BackgroundTaskSignals(QObject):
+    """
+    result_signal: Emits (task_id, result) when the call returns.
+    error_signal: Emits (task_id, error_message) when the call raises.
+    progress_signal: Emits (task_id, done, total) from progress_callback.
+    finished_signal: Emits task_id in both cases.
+    """
+
+    result_signal = pyqtSignal(str, object)
+    error_signal = pyqtSignal(str, str)
+    progress_signal = pyqtSignal(str, int, int)
+    finished_signal = pyqtSignal(str)
+
+
+class BackgroundTask(QRunnable):
+    """Runs one service call in a QThreadPool thread."""
+
+    def __init__(self, task_id: str, func: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        self.task_id = task_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = BackgroundTaskSignals()
+        self.setAutoDelete(True)
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+            self.signals.result_signal.emit(self.task_id, result)
+        except Exception as e:
+            self.signals.error_signal.emit(self.task_id, str(e))
+        finally:
+            self.signals.finished_signal.emit(self.task_id)
+
+
+class BackgroundService(QObject):
+    """
+    Runs the thread-safe methods of a service (BACKGROUND_SAFE_METHODS) on a
+    QThreadPool. The worker uses its own clone of the service's connection
+    (see database/connection_provider.py) and model refreshes are queued back
+    to the GUI thread, so the callbacks and signals arrive on the thread that
+    called submit().
+    """
+
+    def __init__(
+        self,
+        service: BaseService,
+        threadpool: Optional[QThreadPool] = None,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self.service = service
+        self.threadpool = threadpool or QThreadPool.globalInstance()
+        self._tasks: Dict[str, BackgroundTask] = {}
+
+    def submit(
+        self,
+        method_name: str,
+        *args: Any,
+        on_result: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[str], None]] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        **kwargs: Any,
+    ) -> Optional[str]:
+        """
+        Queues service.<method_name>(*args, **kwargs). Returns the task id, or
+        None if the method is not safe to run off the GUI thread.
+        on_progress is passed to the method as progress_callback.
+        """
+        if method_name not in self.service.BACKGROUND_SAFE_METHODS:
+            print(
+                f"[{self.__class__.__name__}.submit] '{self.service.__class__.__name__}.{method_name}' cannot run in the background. => return None"
+            )
+            return None
+        return self.submit_call(
+            getattr(self.service, method_name),
+            *args,
+            on_result=on_result,
+            on_error=on_error,
+            on_progress=on_progress,
+            **kwargs,
+        )
+
+    def submit_call(
+        self,
+        func: Callable,
+        *args: Any,
+        on_result: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[str], None]] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Queues func(*args, **kwargs), e.g. a controller method that only uses
+        BACKGROUND_SAFE_METHODS of its services. Returns the task id.
+        """
+        task_id = str(uuid.uuid4())
+        task = BackgroundTask(task_id, func, args, kwargs)
+        if on_progress is not None:
+            kwargs["progress_callback"] = (
+                lambda done, total: task.signals.progress_signal.emit(
+                    task_id, done, total
+                )
+            )
+            task.signals.progress_signal.connect(
+                lambda _, done, total: on_progress(done, total)
+            )
+        if on_result is not None:
+            task.signals.result_signal.connect(lambda _, result: on_result(result))
+        if on_error is not None:
+            task.signals.error_signal.connect(lambda _, message: on_error(message))
+        task.signals.error_signal.connect(self._on_error)
+        task.signals.finished_signal.connect(self._on_finished)
+        self._tasks[task_id] = task
+        self.threadpool.start(task)
+        return task_id
+
+    def pending_count(self) -> int:
+        return len(self._tasks)
+
+    @pyqtSlot(str, str)
+    def _on_error(self, task_id: str, message: str):
+        print(f"[{self.__class__.__name__}] Task {task_id} failed: {message}")
+
+    @pyqtSlot(str)
+    def _on_finished(self, task_id: str):
+        self._tasks.pop(task_id, None)
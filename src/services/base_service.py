@@ -2,12 +2,23 @@
 
 import sys
 from datetime import datetime
-from typing import List, Any, Dict, Optional, Type
+from typing import List, Any, Callable, Dict, Optional, Tuple, Type
 from contextlib import contextmanager
 from PyQt6.QtCore import Qt, QVariant
-from PyQt6.QtSql import QSqlDatabase, QSqlRecord, QSqlTableModel
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery, QSqlRecord, QSqlTableModel
 from dataclasses import fields
+from src.database.connection_provider import get_connection
 from src.models.base_model import BaseModel
+from src.my_constants import IMPORT_CHUNK_SIZE, IMPORT_ON_CONFLICT
+
+# "replace" is an upsert on the service's IMPORT_KEY (ON CONFLICT ... DO
+# UPDATE): INSERT OR REPLACE would delete the row and insert it with a new
+# id, orphaning (or, with foreign_keys=ON, failing on) the rows that reference it
+IMPORT_CONFLICT_CLAUSES = {
+    "fail": "INSERT",
+    "skip": "INSERT OR IGNORE",
+    "replace": "INSERT",
+}
 
 
 @contextmanager
@@ -35,9 +46,7 @@ def transaction(db: QSqlDatabase):
                 else f"[{transaction.__name__}] Database not open."
             )
             print(f"ERROR: {error_msg}")  # Keep print for critical error
-            if (
-                db.isOpen() and db.transaction()
-            ):  # Check if transaction is still active before rollback
+            if db.isOpen():
                 db.rollback()  # Attempt to roll back if commit fails
                 print(
                     f"WARNING: [{transaction.__name__}] Attempted rollback after commit failure."
@@ -48,9 +57,9 @@ def transaction(db: QSqlDatabase):
         print(
             f"ERROR: [{transaction.__name__}] Exception during transaction block: {e}"
         )  # Keep print
-        if (
-            db.isOpen() and db.transaction()
-        ):  # Check if transaction is still active before rollback
+        if db.isOpen():
+            # Calling db.transaction() here to probe for an active transaction
+            # would fail while one is open and skip the rollback.
             if db.rollback():
                 print(
                     f"INFO: [{transaction.__name__}] Transaction rolled back due to exception."
@@ -64,12 +73,32 @@ def transaction(db: QSqlDatabase):
 
 class BaseService:
     DATA_TYPE: Optional[Type[Any]] = None
+    # UNIQUE column that identifies an imported record (bulk_import "replace")
+    IMPORT_KEY: Optional[str] = None
+    # Ids per statement in update_fields (SQLite binds at most 999 variables)
+    UPDATE_BATCH_SIZE = 500
+    # Methods that only use self._db and model refresh requests, so
+    # BackgroundService may run them in a worker thread.
+    BACKGROUND_SAFE_METHODS = frozenset(
+        {
+            "fetch_by_id",
+            "fetch_by_key",
+            "fetch_all",
+            "fetch_page",
+            "fetch_where",
+            "count_where",
+            "update",
+            "update_fields",
+            "touch",
+            "bulk_import",
+        }
+    )
 
     def __init__(self, model: BaseModel):
         if not isinstance(model, BaseModel):
             raise TypeError("model mus be an instance of BaseModel or its subclass.")
         self.model = model
-        self._db = model.database()
+        self._connection_name = model.database().connectionName()
         # print(self._db.isOpen())
         # print()
 
@@ -121,6 +150,13 @@ class BaseService:
             print(error_msg)
             return None
 
+    @property
+    def _db(self) -> QSqlDatabase:
+        """The service's connection for the calling thread. The SQL-direct
+        methods (fetch_*, count_where, update, update_fields, bulk_import) can
+        therefore run in worker threads; model-based ones stay on the GUI thread."""
+        return get_connection(self._connection_name)
+
     def _fill_row_from_payload(self, row: int, payload: Any):
         """Helper to set data in a model row from a DATA_TYPE payload."""
         if self.DATA_TYPE is None:
@@ -140,12 +176,14 @@ class BaseService:
             )
             if not isinstance(field_name, str):
                 continue
-            if hasattr(payload, field_name):
-                value = getattr(payload, field_name)
-                if (
-                    field_name == "created_at" or field_name == "updated_at"
-                ) and value is None:
-                    value = str(datetime.now())
+            # Columns not on the payload (e.g. generated ones) are left alone.
+            if not hasattr(payload, field_name):
+                continue
+            value = getattr(payload, field_name)
+            if (
+                field_name == "created_at" or field_name == "updated_at"
+            ) and value is None:
+                value = str(datetime.now())
             if field_name != "id":
                 index = self.model.index(row, col_index)
                 if index.isValid():
@@ -195,8 +233,8 @@ class BaseService:
         # --- Handle created_at and updated_at if None in payload ---
         self._fill_row_from_payload(row, payload=payload)
 
+        # submitAll() re-selects the model itself in OnManualSubmit mode.
         if self.model.submitAll():
-            self.model.select()
             return True
         else:
             error_msg = f"[{self.__class__.__name__}.create] Failed to submit changes to database. Error: {self.model.lastError().text()}. => return False"
@@ -247,8 +285,9 @@ class BaseService:
         return results
 
     def update(self, record_id: Any, payload: Any) -> bool:
-        """Updates an existing record by ID from a DATA_TYPE payload using the model.
-        Updates only the fields present (not None) in the payload.
+        """Updates an existing record by ID from a DATA_TYPE payload.
+        Updates only the fields present (not None) in the payload, then
+        refreshes just that row of the model.
         Automatically sets updated_at if it's None in payload and exists as a column.
         Returns True on success, False on failure."""
         if self.DATA_TYPE is None:
@@ -263,53 +302,96 @@ class BaseService:
             info_msg = f"[{self.__class__.__name__}.update] Database is not open. => return False"
             print(info_msg)
             return False
-        row = self.model.get_row_by_id(record_id)
-        if row == -1:
-            info_msg = f"[{self.__class__.__name__}.update] Record with id {record_id} not found in model. => return False"
-            print(info_msg)
-            return False
-
         payload.updated_at = str(datetime.now())
-        fields_updated_count = 0
-        for col_index in range(self.model.columnCount()):
-            field_name = self.model.headerData(
-                col_index,
-                Qt.Orientation.Horizontal,
-                Qt.ItemDataRole.DisplayRole,
-            )
-            if not isinstance(field_name, str):
+        values: Dict[str, Any] = {}
+        for field_name in self._column_names:
+            if field_name == "id" or not hasattr(payload, field_name):
                 continue
-            if hasattr(payload, field_name):
-                value = getattr(payload, field_name)
-                if value is not None:
-                    index = self.model.index(row, col_index)
-                    if index.isValid():
-                        set_success = self.model.setData(
-                            index,
-                            value,
-                            Qt.ItemDataRole.EditRole,
-                        )
-                        if set_success:
-                            fields_updated_count += 1
-                        else:
-                            warning_msg = f"[{self.__class__.__name__}.update] WARNING: setData returned False for col '{field_name}' (index {col_index}) at row {row}."
-                            print(warning_msg)
-                    else:
-                        warning_msg = f"[{self.__class__.__name__}.update] WARNING: Invalid index for field '{field_name}' (col index {col_index}) at row {row}. Data not set."
-                        print(warning_msg)
-
-        if fields_updated_count > 0 and self.model.submitAll():
-            self.model.select()
-            # print("select")
-            return True
-        elif fields_updated_count == 0:
+            value = getattr(payload, field_name)
+            if value is not None:
+                values[field_name] = value
+        if not values:
             info_msg = f"[{self.__class__.__name__}.update] No fields provided in payload to update for id: {record_id}."
             print(info_msg)
             return True
-        else:
-            info_msg = f"[{self.__class__.__name__}.update] Failed to submit update. Error: {self.model.lastError().text()}"
-            self.model.revertAll()
+
+        # Write the row directly and refresh only that row in the model;
+        # setData + submitAll would re-select the whole table.
+        query = QSqlQuery(self._db)
+        query.prepare(
+            f"UPDATE {self.model.tableName()} SET "
+            f"{', '.join(f'{name} = ?' for name in values)} WHERE id = ?"
+        )
+        for value in values.values():
+            query.addBindValue(value)
+        query.addBindValue(record_id)
+        if not query.exec():
+            error_msg = f"[{self.__class__.__name__}.update] Failed to submit update. Error: {query.lastError().text()}"
+            print(error_msg)
             return False
+        if query.numRowsAffected() == 0:
+            info_msg = f"[{self.__class__.__name__}.update] Record with id {record_id} not found. => return False"
+            print(info_msg)
+            return False
+        self.model.refresh_records([record_id])
+        return True
+
+    def update_fields(
+        self, record_ids: List[Any], values: Dict[str, Any], touch: bool = True
+    ) -> bool:
+        """
+        Sets the same column values on many records with one
+        UPDATE ... WHERE id IN (...) per batch of UPDATE_BATCH_SIZE ids,
+        inside a single transaction (e.g. update_fields(ids, {"status": 1})).
+        Also sets updated_at to now when `touch` is True and the column exists.
+        Returns True on success, False on failure (rollback).
+        """
+        if not self._db.isOpen():
+            info_msg = f"[{self.__class__.__name__}.update_fields] Database is not open. => return False"
+            print(info_msg)
+            return False
+        values = dict(values)
+        if touch and "updated_at" in self._column_names:
+            values.setdefault("updated_at", str(datetime.now()))
+        for column in values:
+            if column == "id" or column not in self._column_names:
+                info_msg = f"[{self.__class__.__name__}.update_fields] Invalid column '{column}' for table '{self.model.tableName()}'. => return False"
+                print(info_msg)
+                return False
+        record_ids = list(dict.fromkeys(record_ids))
+        if not record_ids or not values:
+            info_msg = f"[{self.__class__.__name__}.update_fields] Nothing to update."
+            print(info_msg)
+            return True
+
+        set_clause = ", ".join(f"{column} = ?" for column in values)
+        try:
+            with transaction(self._db) as db_conn:
+                query = QSqlQuery(db_conn)
+                for start in range(0, len(record_ids), self.UPDATE_BATCH_SIZE):
+                    batch = record_ids[start : start + self.UPDATE_BATCH_SIZE]
+                    query.prepare(
+                        f"UPDATE {self.model.tableName()} SET {set_clause} "
+                        f"WHERE id IN ({', '.join('?' * len(batch))})"
+                    )
+                    for value in list(values.values()) + batch:
+                        query.addBindValue(value)
+                    if not query.exec():
+                        raise RuntimeError(
+                            f"Failed to update records. Error: {query.lastError().text()}"
+                        )
+        except Exception as e:
+            error_msg = (
+                f"[{self.__class__.__name__}.update_fields] Transaction failed: {e}"
+            )
+            print(error_msg)
+            return False
+        self.model.refresh_records(record_ids)
+        return True
+
+    def touch(self, record_ids: List[Any]) -> bool:
+        """Sets updated_at to now on many records in one statement per batch."""
+        return self.update_fields(record_ids, {})
 
     def delete(self, record_id: Any) -> bool:
         """Deletes a single record by ID using the model.
@@ -328,7 +410,6 @@ class BaseService:
             print(info_msg)
             return False
         if self.model.submitAll():
-            self.model.select()
             info_msg = f"[{self.__class__.__name__}.delete] Deleted row {row} from model buffer"
             print(info_msg)
             return True
@@ -352,11 +433,11 @@ class BaseService:
             print(info_msg)
             return False
         rows_to_delete = sorted(
-            [
-                self.model.get_row_by_id(db_id)
-                for db_id in record_ids
-                if self.model.get_row_by_id(db_id) != -1
-            ],
+            {
+                row
+                for row in (self.model.get_row_by_id(db_id) for db_id in record_ids)
+                if row != -1
+            },
             reverse=True,
         )
         if not rows_to_delete:
@@ -374,7 +455,6 @@ class BaseService:
                     error_msg = f"[{self.__class__.__name__}.delete_multiple] Failed to submit deletions. Error: {self.model.lastError().text()}"
                     print(error_msg)
                     raise RuntimeError(error_msg)
-            self.model.select()
             return True
         except Exception as e:
             exception_msg = (
@@ -457,10 +537,6 @@ class BaseService:
                     # rowCount() cung cấp chỉ mục nơi một hàng mới sẽ được thêm vào.
                     row_index_for_new_item = self.model.rowCount()
 
-                    print(
-                        f"DEBUG: [{self.__class__.__name__}.import_data] Item {i+1}: Đang cố gắng chèn hàng tại chỉ mục {row_index_for_new_item}..."
-                    )  # Thêm debug
-
                     if not self.model.insertRow(row_index_for_new_item):
                         error_text = self.model.lastError().text()
                         error_msg = (
@@ -473,14 +549,8 @@ class BaseService:
 
                     # Điền hàng vừa chèn vào bộ nhớ đệm của model bằng dữ liệu từ payload
                     self._fill_row_from_payload(row_index_for_new_item, record_instance)
-                    print(
-                        f"DEBUG: [{self.__class__.__name__}.import_data] Item {i+1}: Hàng {row_index_for_new_item} đã được điền thành công trong bộ nhớ đệm."
-                    )  # Thêm debug
 
                 # --- Gửi tất cả các thay đổi đã đệm vào cơ sở dữ liệu sau khi tất cả các hàng được chèn ---
-                print(
-                    f"DEBUG: [{self.__class__.__name__}.import_data] Đang cố gắng submit tất cả {len(payload)} hàng đã đệm..."
-                )  # Thêm debug
                 if not self.model.submitAll():
                     error_text = self.model.lastError().text()
                     error_msg = (
@@ -517,6 +587,267 @@ class BaseService:
             self.model.select()  # Làm mới model
             return False
 
+    def bulk_import(
+        self,
+        payload: List[Any],
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        on_conflict: str = IMPORT_ON_CONFLICT,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> bool:
+        """
+        Imports a list of DATA_TYPE payloads with one prepared INSERT executed
+        per chunk through execBatch, inside a single transaction.
+        on_conflict: "fail" (rollback everything on a duplicate pid/uid),
+        "skip" (keep the existing row) or "replace" (update the row with the
+        same IMPORT_KEY in place; a plain insert without an IMPORT_KEY).
+        progress_callback(done, total) is called after every chunk.
+        Returns True on success, False on failure (rollback).
+        """
+        if self.DATA_TYPE is None:
+            info_msg = f"[{self.__class__.__name__}.bulk_import] DATA_TYPE is not set. Cannot import. => return False"
+            print(info_msg)
+            return False
+        if not isinstance(payload, list) or not all(
+            isinstance(item, self.DATA_TYPE) for item in payload
+        ):
+            info_msg = f"[{self.__class__.__name__}.bulk_import] Invalid payload type. Expected list of {self.DATA_TYPE.__name__}. => return False"
+            print(info_msg)
+            return False
+        if on_conflict not in IMPORT_CONFLICT_CLAUSES:
+            info_msg = f"[{self.__class__.__name__}.bulk_import] Invalid conflict policy '{on_conflict}'. Expected one of {list(IMPORT_CONFLICT_CLAUSES)}. => return False"
+            print(info_msg)
+            return False
+        if chunk_size <= 0:
+            info_msg = f"[{self.__class__.__name__}.bulk_import] Invalid chunk_size ({chunk_size}). => return False"
+            print(info_msg)
+            return False
+        if not payload:
+            return True
+        if not self._db.isOpen():
+            info_msg = f"[{self.__class__.__name__}.bulk_import] Database is not open. => return False"
+            print(info_msg)
+            return False
+
+        dataclass_field_names = {f.name for f in fields(self.DATA_TYPE)}
+        columns = [
+            name
+            for name in self._column_names
+            if name != "id" and name in dataclass_field_names
+        ]
+        sql = (
+            f"{IMPORT_CONFLICT_CLAUSES[on_conflict]} INTO {self.model.tableName()} "
+            f"({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        )
+        if on_conflict == "replace" and self.IMPORT_KEY in columns:
+            # Cập nhật bản ghi có sẵn tại chỗ, giữ id và created_at
+            updated_columns = [
+                column
+                for column in columns
+                if column not in (self.IMPORT_KEY, "created_at")
+            ]
+            sql += (
+                f" ON CONFLICT({self.IMPORT_KEY}) DO UPDATE SET "
+                f"{', '.join(f'{column} = excluded.{column}' for column in updated_columns)}"
+            )
+        total = len(payload)
+        current_time_str = str(datetime.now())
+        try:
+            with transaction(self._db) as db_conn:
+                query = QSqlQuery(db_conn)
+                if not query.prepare(sql):
+                    raise RuntimeError(
+                        f"Failed to prepare insert. Error: {query.lastError().text()}"
+                    )
+                for start in range(0, total, chunk_size):
+                    chunk = payload[start : start + chunk_size]
+                    for position, column in enumerate(columns):
+                        values = []
+                        for record_instance in chunk:
+                            value = getattr(record_instance, column)
+                            if column == "updated_at" or (
+                                column == "created_at" and value is None
+                            ):
+                                value = current_time_str
+                            values.append(value)
+                        query.bindValue(position, values)
+                    if not query.execBatch():
+                        raise RuntimeError(
+                            f"Failed to insert rows {start + 1}-{start + len(chunk)}. Error: {query.lastError().text()}"
+                        )
+                    if progress_callback is not None:
+                        progress_callback(start + len(chunk), total)
+            self.model.request_select()
+            print(
+                f"INFO: [{self.__class__.__name__}.bulk_import] Processed {total} records (on_conflict={on_conflict})."
+            )
+            return True
+        except Exception as e:
+            error_msg = f"[{self.__class__.__name__}.bulk_import] Import transaction failed: {e}"
+            print(error_msg)
+            self.model.request_select()
+            return False
+
+    # ========================================================================
+    # SQL read method (bypasses the QSqlTableModel cache)
+    # ========================================================================
+    def fetch_by_id(self, record_id: Any) -> Optional[Any]:
+        """Reads a record by ID straight from the database.
+        Returns an instance of DATA_TYPE or None if not found."""
+        return self.fetch_by_key("id", record_id)
+
+    def fetch_by_key(self, key_name: str, value: Any) -> Optional[Any]:
+        """Reads the first record whose `key_name` column equals `value`
+        (e.g. fetch_by_key("pid", pid)) straight from the database."""
+        results = self.fetch_where({key_name: value}, limit=1)
+        return results[0] if results else None
+
+    def fetch_all(self, order_by: Optional[str] = None) -> List[Any]:
+        """Reads every record of the table without loading it into the model."""
+        return self.fetch_where(order_by=order_by)
+
+    def fetch_page(
+        self,
+        page: int,
+        page_size: int,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = "id",
+        descending: bool = False,
+    ) -> List[Any]:
+        """Reads one page (0-based) of records matching `filters`."""
+        if page < 0 or page_size <= 0:
+            info_msg = f"[{self.__class__.__name__}.fetch_page] Invalid page ({page}) or page_size ({page_size}). => return []"
+            print(info_msg)
+            return []
+        return self.fetch_where(
+            filters,
+            order_by=order_by,
+            descending=descending,
+            limit=page_size,
+            offset=page * page_size,
+        )
+
+    def fetch_where(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> List[Any]:
+        """
+        Runs a prepared SELECT on the table and maps the rows to DATA_TYPE.
+        filters: {column: value}, combined with AND. A list/tuple/set value
+        becomes an IN (...) clause and None becomes IS NULL.
+        Returns a list of DATA_TYPE instances ([] on error).
+        """
+        if self.DATA_TYPE is None:
+            info_msg = f"[{self.__class__.__name__}.fetch_where] DATA_TYPE is not set. Cannot read. => return []"
+            print(info_msg)
+            return []
+        if not self._db.isOpen():
+            info_msg = f"[{self.__class__.__name__}.fetch_where] Database is not open. => return []"
+            print(info_msg)
+            return []
+        if order_by and order_by not in self._column_names:
+            info_msg = f"[{self.__class__.__name__}.fetch_where] Unknown column '{order_by}' for table '{self.model.tableName()}'. => return []"
+            print(info_msg)
+            return []
+        where = self._build_where_clause(filters, "fetch_where")
+        if where is None:
+            return []
+        conditions, bind_values = where
+
+        sql = f"SELECT * FROM {self.model.tableName()}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if order_by:
+            sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+            if offset:
+                sql += f" OFFSET {int(offset)}"
+
+        query = QSqlQuery(self._db)
+        query.setForwardOnly(True)
+        if not query.prepare(sql):
+            error_msg = f"[{self.__class__.__name__}.fetch_where] Failed to prepare query. Error: {query.lastError().text()}. => return []"
+            print(error_msg)
+            return []
+        for value in bind_values:
+            query.addBindValue(value)
+        if not query.exec():
+            error_msg = f"[{self.__class__.__name__}.fetch_where] Query failed. Error: {query.lastError().text()}. => return []"
+            print(error_msg)
+            return []
+        return self._map_query_to_datatype_list(query)
+
+    def count_where(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Counts the records matching `filters` (same format as fetch_where)."""
+        if not self._db.isOpen():
+            info_msg = f"[{self.__class__.__name__}.count_where] Database is not open. => return 0"
+            print(info_msg)
+            return 0
+        where = self._build_where_clause(filters, "count_where")
+        if where is None:
+            return 0
+        conditions, bind_values = where
+        sql = f"SELECT COUNT(*) FROM {self.model.tableName()}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        query = QSqlQuery(self._db)
+        query.prepare(sql)
+        for value in bind_values:
+            query.addBindValue(value)
+        if not query.exec() or not query.next():
+            error_msg = f"[{self.__class__.__name__}.count_where] Query failed. Error: {query.lastError().text()}. => return 0"
+            print(error_msg)
+            return 0
+        return int(query.value(0))
+
+    def _build_where_clause(
+        self, filters: Optional[Dict[str, Any]], caller: str
+    ) -> Optional[Tuple[List[str], List[Any]]]:
+        """Helper to turn a {column: value} filter into AND-ed conditions and
+        their bind values. Returns None if a column is unknown or an IN list
+        is empty (nothing can match)."""
+        conditions: List[str] = []
+        bind_values: List[Any] = []
+        for column, value in (filters or {}).items():
+            if column not in self._column_names:
+                info_msg = f"[{self.__class__.__name__}.{caller}] Unknown column '{column}' for table '{self.model.tableName()}'."
+                print(info_msg)
+                return None
+            if value is None:
+                conditions.append(f"{column} IS NULL")
+            elif isinstance(value, (list, tuple, set)):
+                values = list(value)
+                if not values:
+                    return None
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                bind_values.extend(values)
+            else:
+                conditions.append(f"{column} = ?")
+                bind_values.append(value)
+        return conditions, bind_values
+
+    def _map_query_to_datatype_list(self, query: QSqlQuery) -> List[Any]:
+        """Helper to map every remaining row of an executed QSqlQuery to DATA_TYPE.
+        Column positions are resolved once per query instead of once per row."""
+        record = query.record()
+        positions = [(f.name, record.indexOf(f.name)) for f in fields(self.DATA_TYPE)]
+        results: List[Any] = []
+        while query.next():
+            data = {
+                name: (query.value(pos) if pos != -1 else None)
+                for name, pos in positions
+            }
+            try:
+                results.append(self.DATA_TYPE(**data))
+            except Exception as e:
+                error_msg = f"[{self.__class__.__name__}._map_query_to_datatype_list] Error: converting row to {self.DATA_TYPE.__name__}: {e} -- Data: {data}"
+                print(error_msg)
+        return results
+
     def _find_by_model_index(self, find_method_name: str, value: Any) -> Optional[Any]:
         """Helper to find a single record based on a custom find method in the model.
         Intended for use by subclasses to implement methods like find_by_uid, find_by_email.
@@ -0,0 +1,94 @@
+# src/services/campaign_context.py
+from typing import Dict, List, Optional
+
+from src.my_types import RealEstateProductType
+from src.services.product_service import (
+    RealEstateProductService,
+    RealEstateTemplateService,
+)
+
+
+class CampaignContext:
+    """
+    Everything RobotController.init_actions looks up per (user, action),
+    loaded once per run:
+      - real estate products keyed by pid and by id (one fetch_all),
+      - template values per (part, transaction_type, category), through the
+        template service's sampler buckets,
+      - image listings per image_dir (one directory scan each).
+    init_actions calls invalidate() at the start of every run; the
+    product/image caches are also dropped when the product model changes
+    (wired in __init__).
+    """
+
+    def __init__(
+        self,
+        re_product_service: RealEstateProductService,
+        re_template_service: RealEstateTemplateService,
+    ):
+        self._re_product_service = re_product_service
+        self._re_template_service = re_template_service
+        self._products_by_pid: Optional[Dict[str, RealEstateProductType]] = None
+        self._products_by_id: Dict[int, RealEstateProductType] = {}
+        self._images_by_dir: Dict[str, List[str]] = {}
+        self._re_product_service.model.modelReset.connect(self.invalidate)
+        self._re_product_service.model.rowsInserted.connect(self.invalidate)
+        self._re_product_service.model.rowsRemoved.connect(self.invalidate)
+        self._re_product_service.model.dataChanged.connect(self.invalidate)
+
+    def prepare(self) -> Dict[str, RealEstateProductType]:
+        """Loads the products if they are not cached yet, returns them by pid."""
+        # init_actions may run in a worker thread while the model signals
+        # invalidate() on the GUI thread: only read the cache once
+        products_by_pid = self._products_by_pid
+        if products_by_pid is not None:
+            return products_by_pid
+        products = self._re_product_service.fetch_all()
+        products_by_pid = {product.pid: product for product in products}
+        self._products_by_id = {product.id: product for product in products}
+        self._products_by_pid = products_by_pid
+        return products_by_pid
+
+    def invalidate(self, *_args):
+        """Drops the cached products and image listings."""
+        self._products_by_pid = None
+        self._products_by_id = {}
+        self._images_by_dir.clear()
+
+    def invalidate_images(self, image_dir: Optional[str] = None):
+        """Drops one image listing (or all of them) after files were changed."""
+        if image_dir is None:
+            self._images_by_dir.clear()
+        else:
+            self._images_by_dir.pop(image_dir, None)
+
+    def get_product(self, pid: str) -> Optional[RealEstateProductType]:
+        return self.prepare().get(pid)
+
+    def get_random_product(
+        self, transaction_type: str
+    ) -> Optional[RealEstateProductType]:
+        """Same candidates as RealEstateProductService.get_random, without a
+        database read per pick."""
+        self.prepare()
+        record_id = self._re_product_service.sample_random_id(transaction_type)
+        if record_id is None:
+            return None
+        product = self._products_by_id.get(record_id)
+        if product is None:
+            return self._re_product_service.get_random(transaction_type)
+        return product
+
+    def get_random_template(
+        self, part: str, transaction_type: str, category: str
+    ) -> str:
+        return self._re_template_service.get_random(
+            part=part, transaction_type=transaction_type, category=category
+        )
+
+    def get_images(self, image_dir: str) -> List[str]:
+        images = self._images_by_dir.get(image_dir)
+        if images is None:
+            images = self._re_product_service.get_images_by_path(image_dir)
+            self._images_by_dir[image_dir] = images
+        return images
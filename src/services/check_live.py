@@ -1,11 +1,54 @@
 import pycurl
 import io
 import json
-from typing import List, Tuple, Dict
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple, Dict
 from collections import deque
 
 from PyQt6.QtCore import QThreadPool, QRunnable, QObject, pyqtSignal, pyqtSlot
 
+from src.my_constants import (
+    CHECK_LIVE_ENGINE,
+    CHECK_LIVE_URL,
+    CHECK_LIVE_THREADS,
+    CHECK_LIVE_CONCURRENCY,
+    CHECK_LIVE_MAX_HOST_CONNECTIONS,
+    CHECK_LIVE_RATE_PER_SECOND,
+    CHECK_LIVE_BATCH_SIZE,
+    CHECK_LIVE_BATCH_MS,
+)
+
+CHECK_LIVE_HEADERS = [
+    "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+    "Accept: application/json",
+    "Accept-Language: en-US,en;q=0.9",
+    "Connection: keep-alive",
+]
+
+# (uid, is_live or None, error message or None)
+CheckLiveResult = Tuple[str, Optional[bool], Optional[str]]
+
+
+def parse_check_live_response(uid: str, status_code: int, body: str) -> CheckLiveResult:
+    """
+    A non-200 answer is an error and the account is reported dead, a
+    non-JSON body is only an error.
+    """
+    if status_code != 200:
+        error_msg = f"HTTP Error {status_code} for UID {uid}. Response: {body[:200]}..."
+        return uid, False, error_msg
+    try:
+        data = json.loads(body)
+        return uid, bool(data.get("data", {}).get("height", False)), None
+    except json.JSONDecodeError as e:
+        return (
+            uid,
+            None,
+            f"JSON Decode Error for UID {uid}: {e}. Response: {body[:200]}...",
+        )
+
 
 class WorkerSignals(QObject):
     """
@@ -36,13 +79,7 @@ class CheckLiveWorker(QRunnable):
     def run(self):
         buffer = io.BytesIO()
         curl = pycurl.Curl()
-        url = f"https://graph.facebook.com/{self.uid}/picture?redirect=false"
-        headers = [
-            "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-            "Accept: application/json",
-            "Accept-Language: en-US,en;q=0.9",
-            "Connection: keep-alive",
-        ]
+        url = CHECK_LIVE_URL.format(uid=self.uid)
 
         try:
             curl.setopt(pycurl.URL, url)
@@ -50,24 +87,18 @@ class CheckLiveWorker(QRunnable):
             curl.setopt(pycurl.CONNECTTIMEOUT, 10)
             curl.setopt(pycurl.TIMEOUT, 20)
             curl.setopt(pycurl.FOLLOWLOCATION, 1)
-            curl.setopt(pycurl.HTTPHEADER, headers)
+            curl.setopt(pycurl.HTTPHEADER, CHECK_LIVE_HEADERS)
             curl.perform()
 
             status_code = curl.getinfo(pycurl.RESPONSE_CODE)
             body = buffer.getvalue().decode("utf-8", errors="ignore")
-
-            if status_code != 200:
-                error_msg = f"HTTP Error {status_code} for UID {self.uid}. Response: {body[:200]}..."
+            _, is_live, error_msg = parse_check_live_response(
+                self.uid, status_code, body
+            )
+            if error_msg is not None:
                 self.signals.error_signal.emit(self.uid, error_msg)
-                self.signals.success_signal.emit(self.uid, False)
-            else:
-                try:
-                    data = json.loads(body)
-                    is_live = bool(data.get("data", {}).get("height", False))
-                    self.signals.success_signal.emit(self.uid, is_live)
-                except json.JSONDecodeError as e:
-                    error_msg = f"JSON Decode Error for UID {self.uid}: {e}. Response: {body[:200]}..."
-                    self.signals.error_signal.emit(self.uid, error_msg)
+            if is_live is not None:
+                self.signals.success_signal.emit(self.uid, is_live)
 
         except pycurl.error as e:
             errno, errstr = e.args
@@ -84,28 +115,231 @@ class CheckLiveWorker(QRunnable):
             self.signals.finished.emit(self.uid)
 
 
+class MultiWorkerSignals(QObject):
+    """
+    results_signal: Emits a list of CheckLiveResult, in batches.
+    finished: Emits when the worker has no request left and stops.
+    """
+
+    results_signal = pyqtSignal(list)
+    finished = pyqtSignal()
+
+
+class _TokenBucket:
+    """rate_per_second starts per second, bursts up to one second of them."""
+
+    def __init__(self, rate_per_second: float):
+        self.rate = rate_per_second
+        self.tokens = max(1.0, rate_per_second)
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(
+            max(1.0, self.rate), self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        if self.rate <= 0:
+            return 0
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class CurlMultiCheckLiveWorker(QRunnable):
+    """
+    Checks many uids on one thread: up to `concurrency` requests in flight on
+    a pycurl.CurlMulti, with a fixed set of Curl handles that are reused from
+    one uid to the next, so the connections to the host (and its DNS/TLS
+    session) stay open. Uids can be added while it runs (add_uids); it stops
+    once nothing is queued or in flight. Results are emitted by batch_size or
+    every batch_ms.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = CHECK_LIVE_CONCURRENCY,
+        rate_per_second: float = CHECK_LIVE_RATE_PER_SECOND,
+        max_host_connections: int = CHECK_LIVE_MAX_HOST_CONNECTIONS,
+        batch_size: int = CHECK_LIVE_BATCH_SIZE,
+        batch_ms: int = CHECK_LIVE_BATCH_MS,
+    ):
+        super().__init__()
+        self.concurrency = max(1, concurrency)
+        self.max_host_connections = max_host_connections
+        self.batch_size = max(1, batch_size)
+        self.batch_seconds = batch_ms / 1000
+        self.signals = MultiWorkerSignals()
+        self._bucket = _TokenBucket(rate_per_second)
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._accepting = True
+        self._accepting_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.setAutoDelete(True)
+
+    def add_uids(self, uids: List[str]) -> bool:
+        """Queues uids; False if the worker already stopped taking new ones."""
+        with self._accepting_lock:
+            if not self._accepting:
+                return False
+            for uid in uids:
+                self._queue.put(uid)
+            return True
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _new_handle(self) -> pycurl.Curl:
+        curl = pycurl.Curl()
+        curl.setopt(pycurl.CONNECTTIMEOUT, 10)
+        curl.setopt(pycurl.TIMEOUT, 20)
+        curl.setopt(pycurl.FOLLOWLOCATION, 1)
+        curl.setopt(pycurl.HTTPHEADER, CHECK_LIVE_HEADERS)
+        curl.setopt(pycurl.NOSIGNAL, 1)
+        curl.setopt(pycurl.TCP_KEEPALIVE, 1)
+        return curl
+
+    def _start_request(self, multi: pycurl.CurlMulti, curl: pycurl.Curl, uid: str):
+        curl.uid = uid
+        curl.buffer = io.BytesIO()
+        curl.setopt(pycurl.URL, CHECK_LIVE_URL.format(uid=uid))
+        curl.setopt(pycurl.WRITEFUNCTION, curl.buffer.write)
+        multi.add_handle(curl)
+
+    def _next_uid(self) -> Optional[str]:
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    @pyqtSlot()
+    def run(self):
+        multi = pycurl.CurlMulti()
+        # Dùng chung kết nối HTTP/2 cho nhiều request khi máy chủ hỗ trợ
+        multi.setopt(pycurl.M_PIPELINING, pycurl.PIPE_MULTIPLEX)
+        if self.max_host_connections > 0:
+            multi.setopt(pycurl.M_MAX_HOST_CONNECTIONS, self.max_host_connections)
+        multi.setopt(pycurl.M_MAXCONNECTS, self.concurrency)
+        handles = [self._new_handle() for _ in range(self.concurrency)]
+        free_handles = list(handles)
+        in_flight = 0
+        results: List[CheckLiveResult] = []
+        last_emit = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                # Chỉ luồng này lấy uid ra khỏi hàng đợi, nên empty() là chắc chắn
+                while free_handles and not self._queue.empty() and self._bucket.take():
+                    uid = self._next_uid()
+                    self._start_request(multi, free_handles.pop(), uid)
+                    in_flight += 1
+
+                if in_flight == 0:
+                    with self._accepting_lock:
+                        if self._queue.empty():
+                            self._accepting = False
+                            break
+                    time.sleep(self._bucket.wait_time())
+                    continue
+
+                while True:
+                    ret, _ = multi.perform()
+                    if ret != pycurl.E_CALL_MULTI_PERFORM:
+                        break
+                while True:
+                    queued, ok_list, err_list = multi.info_read()
+                    for curl in ok_list:
+                        body = curl.buffer.getvalue().decode("utf-8", errors="ignore")
+                        results.append(
+                            parse_check_live_response(
+                                curl.uid, curl.getinfo(pycurl.RESPONSE_CODE), body
+                            )
+                        )
+                    for curl, errno, errstr in err_list:
+                        results.append(
+                            (
+                                curl.uid,
+                                None,
+                                f"PyCurl error {errno}: {errstr} for UID {curl.uid}",
+                            )
+                        )
+                    for curl in ok_list + [item[0] for item in err_list]:
+                        multi.remove_handle(curl)
+                        curl.buffer.close()
+                        free_handles.append(curl)
+                        in_flight -= 1
+                    if queued == 0:
+                        break
+
+                if results and (
+                    len(results) >= self.batch_size
+                    or time.monotonic() - last_emit >= self.batch_seconds
+                ):
+                    self.signals.results_signal.emit(results)
+                    results = []
+                    last_emit = time.monotonic()
+                timeout = 0.05
+                if free_handles and not self._queue.empty():
+                    timeout = min(timeout, self._bucket.wait_time())
+                multi.select(timeout)
+        except Exception as e:
+            print(f"[{self.__class__.__name__}.run] {e}")
+        finally:
+            with self._accepting_lock:
+                self._accepting = False
+            # Uid chưa kiểm tra (bị dừng hoặc lỗi) được báo là lỗi
+            for curl in handles:
+                if curl not in free_handles:
+                    results.append(
+                        (curl.uid, None, f"Stopped before checking UID {curl.uid}")
+                    )
+                    multi.remove_handle(curl)
+            while True:
+                uid = self._next_uid()
+                if uid is None:
+                    break
+                results.append((uid, None, f"Stopped before checking UID {uid}"))
+            if results:
+                self.signals.results_signal.emit(results)
+            for curl in handles:
+                curl.close()
+            multi.close()
+            self.signals.finished.emit()
+
+
 class CheckLive(QObject):
     """
-    Manages a queue of CheckLiveWorker tasks using a QThreadPool,
-    handling concurrency and progress reporting.
-    Now accepts list of (id, uid) tuples and emits id in success signal.
+    Manages the check of a list of (id, uid) tuples on its own QThreadPool
+    (CHECK_LIVE_THREADS), so it never limits the global pool used by the
+    browsers. With CHECK_LIVE_ENGINE "multi" every uid goes to one
+    CurlMultiCheckLiveWorker, otherwise to one CheckLiveWorker per uid.
+    Results are reported per task (task_succeeded / task_failed) and per
+    worker batch (results_batch: list of (id, uid, is_live, error)).
     """
 
     task_succeeded = pyqtSignal(int, str, bool)
     task_failed = pyqtSignal(int, str, str)
+    results_batch = pyqtSignal(list)
     all_tasks_finished = pyqtSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, engine: str = CHECK_LIVE_ENGINE):
         super().__init__(parent)
+        self.engine = engine
         self._pending_tasks: deque[Tuple[int, str]] = deque()
-        self._in_progress: Dict[str, Tuple[int, CheckLiveWorker]] = {}
+        # uid -> record id, for the uids given to a worker
+        self._in_progress: Dict[str, int] = {}
         self._failed: Dict[int, str] = {}
         self._succeeded: Dict[int, bool] = {}
         self._total_tasks = 0
+        self._multi_worker: Optional[CurlMultiCheckLiveWorker] = None
 
-        self.threadpool = QThreadPool.globalInstance()
-        max_workers = min(5, self.threadpool.maxThreadCount())
-        self.threadpool.setMaxThreadCount(max_workers)
+        self.threadpool = QThreadPool(self)
+        self.threadpool.setMaxThreadCount(max(1, CHECK_LIVE_THREADS))
 
     @pyqtSlot(list)
     def add_tasks(self, tasks: List[Tuple[int, str]]):
@@ -123,10 +357,19 @@ class CheckLive(QObject):
 
         self._try_start_tasks()
 
+    def stop(self):
+        """Stops the multi worker; the uids it did not check are reported failed."""
+        self._pending_tasks.clear()
+        if self._multi_worker is not None:
+            self._multi_worker.stop()
+
     def _try_start_tasks(self):
         """
         Start queued tasks up to max concurrency.
         """
+        if self.engine == "multi":
+            self._start_multi_tasks()
+            return
         available = (
             self.threadpool.maxThreadCount() - self.threadpool.activeThreadCount()
         )
@@ -137,21 +380,65 @@ class CheckLive(QObject):
             worker.signals.error_signal.connect(self._on_error)
             worker.signals.finished.connect(self._on_finished)
 
-            self._in_progress[uid] = (record_id, worker)
+            self._in_progress[uid] = record_id
             self.threadpool.start(worker)
             available -= 1
 
+    def _start_multi_tasks(self):
+        if not self._pending_tasks:
+            return
+        tasks = list(self._pending_tasks)
+        self._pending_tasks.clear()
+        for record_id, uid in tasks:
+            self._in_progress[uid] = record_id
+        uids = [uid for _, uid in tasks]
+        if self._multi_worker is None or not self._multi_worker.add_uids(uids):
+            worker = CurlMultiCheckLiveWorker()
+            worker.add_uids(uids)
+            worker.signals.results_signal.connect(self._on_results)
+            worker.signals.finished.connect(self._on_multi_finished)
+            self._multi_worker = worker
+            self.threadpool.start(worker)
+
+    @pyqtSlot(list)
+    def _on_results(self, results: List[CheckLiveResult]):
+        batch = []
+        for uid, is_live, error_msg in results:
+            record_id = self._in_progress.pop(uid, None)
+            if record_id is None:
+                continue
+            if error_msg is not None:
+                self._failed[record_id] = error_msg
+                self.task_failed.emit(record_id, uid, error_msg)
+            if is_live is not None:
+                self._succeeded[record_id] = is_live
+                self.task_succeeded.emit(record_id, uid, is_live)
+            batch.append((record_id, uid, is_live, error_msg))
+        if batch:
+            self.results_batch.emit(batch)
+        if not self._pending_tasks and not self._in_progress:
+            self.all_tasks_finished.emit()
+
+    @pyqtSlot()
+    def _on_multi_finished(self):
+        if self.sender() is not None and (
+            self._multi_worker is None or self.sender() is self._multi_worker.signals
+        ):
+            self._multi_worker = None
+        self._try_start_tasks()
+
     @pyqtSlot(str, bool)
     def _on_success(self, uid: str, is_live: bool):
-        record_id, _ = self._in_progress.get(uid, (None, None))
+        record_id = self._in_progress.get(uid)
         if record_id is not None:
             self._succeeded[record_id] = is_live
             self.task_succeeded.emit(record_id, uid, is_live)
+            self.results_batch.emit([(record_id, uid, is_live, None)])
         self._try_start_tasks()
 
     @pyqtSlot(str, str)
     def _on_error(self, uid: str, error_msg: str):
-        record_id, _ = self._in_progress.get(uid, (None, None))
+        record_id = self._in_progress.get(uid)
         if record_id is not None:
             self._failed[record_id] = error_msg
             self.task_failed.emit(record_id, uid, error_msg)
@@ -160,6 +447,7 @@ class CheckLive(QObject):
     def _on_finished(self, uid: str):
         if uid in self._in_progress:
             del self._in_progress[uid]
+        self._try_start_tasks()
         if not self._pending_tasks and not self._in_progress:
             self.all_tasks_finished.emit()
 
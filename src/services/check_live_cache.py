@@ -0,0 +1,132 @@
+# src/services/check_live_cache.py
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from src.database.connection_provider import get_connection
+from src.services.base_service import transaction
+from src.my_constants import (
+    CONNECTION_DB_USER,
+    TABLE_CHECK_LIVE_CACHE,
+    CHECK_LIVE_CACHE_TTL_SECONDS,
+)
+
+# SQLite limits the number of bound values per statement
+_IN_CHUNK_SIZE = 500
+
+
+class CheckLiveCache:
+    """
+    Last check live result of every uid (check_live_cache table of the user
+    DB): is_live and checked_at of the last answered check, and the error of
+    the last check if it failed. A failed check keeps the previous answer
+    but does not make it fresher.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = CHECK_LIVE_CACHE_TTL_SECONDS,
+        connection_name: str = CONNECTION_DB_USER,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self._connection_name = connection_name
+
+    def _db(self) -> Optional[QSqlDatabase]:
+        db = get_connection(self._connection_name)
+        if not db.isOpen():
+            print(
+                f"[{self.__class__.__name__}] Database '{self._connection_name}' is not open."
+            )
+            return None
+        return db
+
+    def get_fresh(self, uids: Iterable[str]) -> Dict[str, bool]:
+        """{uid: is_live} of the uids checked less than ttl_seconds ago."""
+        uids = list(dict.fromkeys(uids))
+        if self.ttl_seconds <= 0 or not uids:
+            return {}
+        db = self._db()
+        if db is None:
+            return {}
+        min_checked_at = time.time() - self.ttl_seconds
+        fresh: Dict[str, bool] = {}
+        query = QSqlQuery(db)
+        for start in range(0, len(uids), _IN_CHUNK_SIZE):
+            chunk = uids[start : start + _IN_CHUNK_SIZE]
+            query.prepare(
+                f"SELECT uid, is_live FROM {TABLE_CHECK_LIVE_CACHE} "
+                f"WHERE is_live IS NOT NULL AND checked_at >= ? "
+                f"AND uid IN ({', '.join('?' * len(chunk))})"
+            )
+            for value in [min_checked_at] + chunk:
+                query.addBindValue(value)
+            if not query.exec():
+                print(
+                    f"[{self.__class__.__name__}.get_fresh] {query.lastError().text()}"
+                )
+                return {}
+            while query.next():
+                fresh[query.value(0)] = bool(query.value(1))
+        return fresh
+
+    def put_many(
+        self, results: List[Tuple[str, Optional[bool], Optional[str]]]
+    ) -> bool:
+        """Upserts (uid, is_live or None, error or None) results in one batch."""
+        if not results:
+            return True
+        db = self._db()
+        if db is None:
+            return False
+        now = time.time()
+        try:
+            with transaction(db) as db_conn:
+                query = QSqlQuery(db_conn)
+                if not query.prepare(
+                    f"INSERT INTO {TABLE_CHECK_LIVE_CACHE} (uid, is_live, checked_at, error) "
+                    f"VALUES (?, ?, ?, ?) ON CONFLICT(uid) DO UPDATE SET "
+                    f"is_live = COALESCE(excluded.is_live, is_live), "
+                    f"checked_at = COALESCE(excluded.checked_at, checked_at), "
+                    f"error = excluded.error"
+                ):
+                    raise RuntimeError(query.lastError().text())
+                query.bindValue(0, [uid for uid, _, _ in results])
+                query.bindValue(
+                    1,
+                    [
+                        None if is_live is None else int(is_live)
+                        for _, is_live, _ in results
+                    ],
+                )
+                query.bindValue(
+                    2, [None if is_live is None else now for _, is_live, _ in results]
+                )
+                query.bindValue(3, [error for _, _, error in results])
+                if not query.execBatch():
+                    raise RuntimeError(query.lastError().text())
+        except Exception as e:
+            print(f"[{self.__class__.__name__}.put_many] Transaction failed: {e}")
+            return False
+        return True
+
+    def invalidate(self, uids: Optional[Iterable[str]] = None) -> bool:
+        """Forgets the given uids (every uid by default)."""
+        db = self._db()
+        if db is None:
+            return False
+        query = QSqlQuery(db)
+        if uids is None:
+            return query.exec(f"DELETE FROM {TABLE_CHECK_LIVE_CACHE}")
+        uids = list(uids)
+        for start in range(0, len(uids), _IN_CHUNK_SIZE):
+            chunk = uids[start : start + _IN_CHUNK_SIZE]
+            query.prepare(
+                f"DELETE FROM {TABLE_CHECK_LIVE_CACHE} "
+                f"WHERE uid IN ({', '.join('?' * len(chunk))})"
+            )
+            for uid in chunk:
+                query.addBindValue(uid)
+            if not query.exec():
+                return False
+        return True
@@ -0,0 +1,286 @@
+# src/services/otp_poller.py
+import heapq
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.database.connection_provider import release_thread_connections
+from src.my_constants import (
+    VIOTP_TOKEN,
+    VIOTP_POLL_INTERVAL_SECONDS,
+    VIOTP_POLL_BACKOFF,
+    VIOTP_POLL_MAX_INTERVAL_SECONDS,
+    VIOTP_OTP_TIMEOUT_SECONDS,
+)
+from src.utils.get_phonenumber import RequestViotp
+
+OTP_RECEIVED = "received"
+OTP_EXPIRED = "expired"
+OTP_TIMEOUT = "timeout"
+OTP_CANCELLED = "cancelled"
+
+# Called on the poller thread with the result of a request
+OtpCallback = Callable[[Dict], None]
+
+
+class _OtpRequest:
+    __slots__ = (
+        "request_id",
+        "service_name",
+        "deadline",
+        "interval",
+        "next_poll",
+        "callbacks",
+    )
+
+    def __init__(self, request_id, service_name: str, deadline: float, first: float):
+        self.request_id = request_id
+        self.service_name = service_name
+        self.deadline = deadline
+        self.interval = first
+        self.next_poll = 0.0
+        self.callbacks: List[OtpCallback] = []
+
+
+class OtpPoller(QObject):
+    """
+    Waits for the OTP codes of every outstanding Viotp request on one thread:
+    requests are polled in turn (get_code) through the single kept-alive
+    connection of that thread, each on its own schedule. The interval of a
+    request grows by `backoff` after each answer without a code and doubles
+    after an error, up to `max_interval`; a request is dropped after `timeout`.
+
+    A result is a dict {"code", "phone_number", "service_name", "request_id",
+    "status"} with status received, expired, timeout or cancelled. It is given
+    to the callbacks of watch() (on the poller thread), then emitted with
+    request_finished, and with code_received when a code arrived.
+    wait_for_code() blocks the calling thread (e.g. a BrowserWorker) until then.
+    """
+
+    code_received = pyqtSignal(str, str, str)  # request_id, phone_number, code
+    request_finished = pyqtSignal(dict)
+
+    def __init__(
+        self,
+        api_client: RequestViotp,
+        interval: float = VIOTP_POLL_INTERVAL_SECONDS,
+        backoff: float = VIOTP_POLL_BACKOFF,
+        max_interval: float = VIOTP_POLL_MAX_INTERVAL_SECONDS,
+        timeout: float = VIOTP_OTP_TIMEOUT_SECONDS,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.interval = interval
+        self.backoff = max(1.0, backoff)
+        self.max_interval = max(interval, max_interval)
+        self.timeout = timeout
+        self._requests: Dict[str, _OtpRequest] = {}
+        # Hàng đợi theo thời điểm poll kế tiếp: (thời điểm, request_id)
+        self._heap: List[Tuple[float, str]] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    # --------------------- requests --------------------- #
+    def request_number(self, service_name: str) -> Optional[Dict]:
+        """{"phone_number", "request_id"} of a new number (service id is cached)."""
+        return self.api_client.get_service(service_name=service_name)
+
+    def watch(
+        self,
+        request_id,
+        service_name: str = "",
+        callback: Optional[OtpCallback] = None,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Polls the request until its code arrives; False if the poller is stopped."""
+        key = str(request_id)
+        with self._cond:
+            if self._stopped:
+                return False
+            request = self._requests.get(key)
+            if request is None:
+                now = time.monotonic()
+                request = _OtpRequest(
+                    request_id,
+                    service_name,
+                    now + (self.timeout if timeout is None else timeout),
+                    self.interval,
+                )
+                request.next_poll = now
+                self._requests[key] = request
+                heapq.heappush(self._heap, (request.next_poll, key))
+            if callback is not None:
+                request.callbacks.append(callback)
+            self._start()
+            self._cond.notify()
+        return True
+
+    def wait_for_code(
+        self, request_id, service_name: str = "", timeout: Optional[float] = None
+    ) -> Dict:
+        """Blocks until the request has a result (see watch())."""
+        done = threading.Event()
+        result: Dict = {}
+
+        def on_result(otp: Dict):
+            result.update(otp)
+            done.set()
+
+        if not self.watch(request_id, service_name, on_result, timeout):
+            return self._result(request_id, service_name, OTP_CANCELLED)
+        done.wait()
+        return result
+
+    def cancel(self, request_id):
+        with self._cond:
+            request = self._requests.pop(str(request_id), None)
+        if request is not None:
+            self._finish(
+                request,
+                self._result(request.request_id, request.service_name, OTP_CANCELLED),
+            )
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._requests)
+
+    def stop(self):
+        """Cancels every outstanding request and stops the thread."""
+        with self._cond:
+            self._stopped = True
+            requests = list(self._requests.values())
+            self._requests.clear()
+            self._cond.notify()
+        for request in requests:
+            self._finish(
+                request,
+                self._result(request.request_id, request.service_name, OTP_CANCELLED),
+            )
+
+    # --------------------- poller thread --------------------- #
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="OtpPoller", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    request = self._next_due()
+                    if request is None:
+                        return
+                self._poll(request)
+        finally:
+            release_thread_connections()
+
+    def _next_due(self) -> Optional[_OtpRequest]:
+        """Waits for the next request to poll (called with the condition held)."""
+        while not self._stopped:
+            if not self._heap:
+                self._cond.wait()
+                continue
+            due, key = self._heap[0]
+            request = self._requests.get(key)
+            if request is None or request.next_poll != due:
+                heapq.heappop(self._heap)  # Đã xong, bị hủy hoặc lên lịch lại
+                continue
+            wait = due - time.monotonic()
+            if wait > 0:
+                self._cond.wait(wait)
+                continue
+            heapq.heappop(self._heap)
+            return request
+        return None
+
+    def _poll(self, request: _OtpRequest):
+        try:
+            code_info = self.api_client.get_code(request.request_id)
+        except Exception as e:
+            print(f"[{self.__class__.__name__}._poll] {request.request_id}: {e}")
+            code_info = None
+        status = code_info.get("status") if code_info else None
+        result = None
+        if status == 1:
+            result = self._result(
+                request.request_id,
+                request.service_name,
+                OTP_RECEIVED,
+                code_info.get("phone_number"),
+                code_info.get("code"),
+            )
+        elif status == 2:
+            result = self._result(
+                request.request_id,
+                request.service_name,
+                OTP_EXPIRED,
+                code_info.get("phone_number"),
+            )
+        now = time.monotonic()
+        key = str(request.request_id)
+        with self._cond:
+            if self._requests.get(key) is not request:
+                return  # Bị hủy trong lúc đang poll
+            if result is None and now >= request.deadline:
+                result = self._result(
+                    request.request_id, request.service_name, OTP_TIMEOUT
+                )
+            if result is not None:
+                del self._requests[key]
+            else:
+                # Chưa có mã: giãn khoảng poll, gấp đôi nếu API lỗi
+                factor = self.backoff if code_info else 2.0
+                request.next_poll = min(now + request.interval, request.deadline)
+                request.interval = min(request.interval * factor, self.max_interval)
+                heapq.heappush(self._heap, (request.next_poll, key))
+        if result is not None:
+            self._finish(request, result)
+
+    def _finish(self, request: _OtpRequest, result: Dict):
+        for callback in request.callbacks:
+            try:
+                callback(result)
+            except Exception as e:
+                print(f"[{self.__class__.__name__}._finish] Callback error: {e}")
+        if result["status"] == OTP_RECEIVED:
+            self.code_received.emit(
+                str(result["request_id"]),
+                result["phone_number"] or "",
+                str(result["code"] or ""),
+            )
+        self.request_finished.emit(result)
+
+    @staticmethod
+    def _result(
+        request_id,
+        service_name: str,
+        status: str,
+        phone_number: Optional[str] = None,
+        code: Optional[str] = None,
+    ) -> Dict:
+        return {
+            "code": code,
+            "phone_number": phone_number,
+            "service_name": service_name,
+            "request_id": request_id,
+            "status": status,
+        }
+
+
+_poller: Optional[OtpPoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_otp_poller() -> Optional[OtpPoller]:
+    """The process-wide poller, None when VIOTP_TOKEN is not set."""
+    global _poller
+    with _poller_lock:
+        if _poller is None and VIOTP_TOKEN:
+            _poller = OtpPoller(RequestViotp(VIOTP_TOKEN))
+        return _poller
@@ -4,10 +4,11 @@ import uuid
 import glob
 import os
 import shutil
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Tuple
 from PyQt6.QtSql import QSqlQuery
 
 from src.services.base_service import BaseService, transaction
+from src.services.sampler import BucketSampler
 from src.models.product_model import (
     RealEstateProductModel,
     RealEstateTemplateModel,
@@ -20,6 +21,14 @@ from src.utils.images_handler import overlay_logo_on_images
 
 class RealEstateProductService(BaseService):
     DATA_TYPE = RealEstateProductType
+    IMPORT_KEY = "pid"
+    BACKGROUND_SAFE_METHODS = BaseService.BACKGROUND_SAFE_METHODS | {
+        "toggle_status",
+        "renew_products",
+        "get_all_pid",
+        "get_random",
+        "sample_random_id",
+    }
 
     def __init__(self, model: RealEstateProductModel):
         if not isinstance(model, RealEstateProductModel):
@@ -27,6 +36,8 @@ class RealEstateProductService(BaseService):
                 "model must be an instance of RealEstateProductModel or its subclass."
             )
         super().__init__(model)
+        self._sampler = BucketSampler(self._load_random_candidates)
+        self._sampler.watch(model)
 
     def _normalize_float_field(self, value: Any) -> float:
         """
@@ -139,7 +150,7 @@ class RealEstateProductService(BaseService):
         return self._find_by_model_index(find_method_name="find_row_by_pid", value=pid)
 
     def toggle_status(self, record_id: int) -> bool:
-        product = self.read(record_id)
+        product = self.fetch_by_id(record_id)
         if product is None:
             print(
                 f"[{self.__class__.__name__}.toggle_status] Product with record_id '{record_id}' not found."
@@ -157,11 +168,7 @@ class RealEstateProductService(BaseService):
             )
             return False
 
-        product.status = new_status
-        # Cần chuẩn hóa dữ liệu trước khi update, mặc dù toggle_status chỉ thay đổi status,
-        # nhưng việc update full object cần đảm bảo dữ liệu float vẫn hợp lệ
-        product = self._validate_and_normalize_payload(product)
-        update_success = self.update(record_id, product)
+        update_success = self.update_fields([record_id], {"status": new_status})
         if update_success:
             return True
         else:
@@ -170,12 +177,8 @@ class RealEstateProductService(BaseService):
             )
             return False
 
-    def renew_products(self, record_ids: List[int]):
-        for record_id in record_ids:
-            product = self.read(record_id)
-            # Cần đảm bảo dữ liệu float hợp lệ trước khi update
-            product = self._validate_and_normalize_payload(product)
-            self.update(record_id=record_id, payload=product)
+    def renew_products(self, record_ids: List[int]) -> bool:
+        return self.touch(record_ids)
 
     def initialize_new_pid(self, transaction_type: str) -> str:
         """
@@ -198,7 +201,7 @@ class RealEstateProductService(BaseService):
                     elif transaction_type == "sang nhượng":
                         pid = "A." + pid
                     pid = "RE." + pid
-                    if not self.read_by_pid(pid):
+                    if not self.fetch_by_key("pid", pid):
                         return pid
         except KeyError:
             raise KeyError(
@@ -261,36 +264,59 @@ class RealEstateProductService(BaseService):
         return pids
 
     def get_random(self, transaction_type: str):
+        """
+        Returns a random available product of the transaction type updated in the
+        last 7 days. Candidate ids come from the in-memory sampler, so only the
+        picked row is read from the database.
+        """
         if not self._db.isOpen():
             print(f"[{self.__class__.__name__}.get_random] Database is not open.")
             return None
 
+        record_id = self.sample_random_id(transaction_type)
+        if record_id is None:
+            return None
+        product = self.fetch_by_id(record_id)
+        if product is None:
+            # The row went away behind the model's back, reload the bucket once.
+            self._sampler.invalidate(bucket=transaction_type)
+            record_id = self.sample_random_id(transaction_type)
+            product = self.fetch_by_id(record_id) if record_id is not None else None
+        return product
+
+    def sample_random_id(self, transaction_type: str) -> Optional[int]:
+        """The id get_random would read, without reading the row."""
+        return self._sampler.sample(transaction_type)
+
+    def _load_random_candidates(self, transaction_type: str) -> List[Tuple[int, float]]:
+        """Sampler loader: (id, age in days) of the get_random candidates."""
         query = QSqlQuery(self._db)
-        # Giả sử cột transaction_type lưu đúng kiểu dữ liệu, có thể cần chỉnh lại tên cột nếu khác
+        query.setForwardOnly(True)
         sql = f"""
-            SELECT id FROM {self.model.tableName()}
+            SELECT id, julianday('now') - updated_at_jd FROM {self.model.tableName()}
             WHERE transaction_type = ? AND status = 1
-            AND (julianday('now') - julianday(updated_at)) <= 7
-            ORDER BY RANDOM() LIMIT 1
+            AND updated_at_jd >= julianday('now') - 7
         """
         query.prepare(sql)
         query.addBindValue(transaction_type)
-
         if not query.exec():
             print(
-                f"[{self.__class__.__name__}.get_random] Query failed: {query.lastError().text()}"
+                f"[{self.__class__.__name__}._load_random_candidates] Query failed: {query.lastError().text()}"
             )
-            return None
-
-        if query.next():
-            record_id = query.value(0)
-            return self.read(record_id)
-        return None
+            return []
+        candidates: List[Tuple[int, float]] = []
+        while query.next():
+            candidates.append((query.value(0), query.value(1)))
+        return candidates
 
 
 # ------------------------------------------------------------------------------------------------------------------
 class RealEstateTemplateService(BaseService):
     DATA_TYPE = RealEstateTemplateType
+    BACKGROUND_SAFE_METHODS = BaseService.BACKGROUND_SAFE_METHODS | {
+        "get_random",
+        "get_default",
+    }
 
     def __init__(self, model: RealEstateTemplateModel):
         if not isinstance(model, RealEstateTemplateModel):
@@ -298,6 +324,8 @@ class RealEstateTemplateService(BaseService):
                 "model must be an instance of RealEstateTemplateModel or its subclass."
             )
         super().__init__(model)
+        self._sampler = BucketSampler(self._load_random_candidates)
+        self._sampler.watch(model)
 
     def create(self, payload: RealEstateTemplateType) -> bool:
         return super().create(payload)
@@ -320,234 +348,65 @@ class RealEstateTemplateService(BaseService):
     def import_data(self, payload: List[RealEstateTemplateType]):
         return super().import_data(payload)
 
+    @staticmethod
+    def _template_where_clause(
+        part: str, transaction_type: str, category: str, is_default: int
+    ) -> Tuple[List[str], List[Any]]:
+        """
+        Builds the template lookup conditions. An empty argument means "any" and
+        is left out of the SQL entirely, so the (part, transaction_type,
+        category, is_default) index can be used for the remaining columns.
+        """
+        conditions: List[str] = []
+        bind_values: List[Any] = []
+        for column, value in (
+            ("part", part),
+            ("transaction_type", transaction_type),
+            ("category", category),
+        ):
+            if value:
+                conditions.append(f"{column} = ?")
+                bind_values.append(value)
+        conditions.append("is_default = ?")
+        bind_values.append(is_default)
+        return conditions, bind_values
+
     def get_random(self, part: str, transaction_type: str, category: str) -> str:
         """
         Retrieves a random template value based on part, transaction_type, and category.
+        Values are sampled from an in-memory bucket per argument combination.
         """
         if not self._db.isOpen():
             print(f"[{self.__class__.__name__}.get_random] Database is not open.")
             return ""
 
-        query_obj = QSqlQuery(self._db)
-        query = f"""
-            SELECT value FROM {TABLE_REAL_ESTATE_TEMPLATE}
-            WHERE (? = '' OR part = ?)
-            AND (? = '' OR transaction_type = ?)
-            AND (? = '' OR category = ?)
-            AND is_default = 0
-            ORDER BY RANDOM() LIMIT 1
-        """
-        query_obj.prepare(query)
-
-        # Binding các tham số
-        query_obj.addBindValue(part)
-        query_obj.addBindValue(part)
-        query_obj.addBindValue(transaction_type)
-        query_obj.addBindValue(transaction_type)
-        query_obj.addBindValue(category)
-        query_obj.addBindValue(category)
-
-        if not query_obj.exec():
-            print(
-                f"[{self.__class__.__name__}.get_random] Query failed: {query_obj.lastError().text()}"
-            )
-            return ""
-
-        if query_obj.next():
-            return query_obj.value(0)
-        return ""
-
-    def get_default(self, part: str, transaction_type: str, category: str) -> str:
-        """
-        Retrieves the default template value (is_default = 1) for a given
-        part, transaction_type, and category.
-        """
-        if not self._db.isOpen():
-            print(f"[{self.__class__.__name__}.get_default] Database is not open.")
-            return ""
+        value = self._sampler.sample((part, transaction_type, category))
+        return value if value is not None else ""
 
+    def _load_random_candidates(
+        self, bucket: Tuple[str, str, str]
+    ) -> List[Tuple[str, float]]:
+        """Sampler loader: (value, age in days) of the non-default templates."""
+        where = self._template_where_clause(*bucket, 0)
         query_obj = QSqlQuery(self._db)
+        query_obj.setForwardOnly(True)
         query = f"""
-            SELECT value from {TABLE_REAL_ESTATE_TEMPLATE}
-            WHERE (? = '' OR part = ?)
-            AND (? = '' OR transaction_type = ?)
-            AND (? = '' OR category = ?)
-            AND is_default = 1
+            SELECT value, julianday('now') - julianday(updated_at)
+            FROM {TABLE_REAL_ESTATE_TEMPLATE}
+            WHERE {" AND ".join(where[0])}
         """
         query_obj.prepare(query)
-
-        # Binding các tham số
-        query_obj.addBindValue(part)
-        query_obj.addBindValue(part)
-        query_obj.addBindValue(transaction_type)
-        query_obj.addBindValue(transaction_type)
-        query_obj.addBindValue(category)
-        query_obj.addBindValue(category)
-
+        for value in where[1]:
+            query_obj.addBindValue(value)
         if not query_obj.exec():
             print(
-                f"[{self.__class__.__name__}.get_default] Query failed: {query_obj.lastError().text()}"
+                f"[{self.__class__.__name__}._load_random_candidates] Query failed: {query_obj.lastError().text()}"
             )
-            return ""
-
-        if query_obj.next():
-            return query_obj.value(0)
-        return ""
-
-    def set_default_template(self, record_id: int) -> bool:
-        """
-        Sets a specific RealEstateTemplate record as the default template and
-        unsets others matching its part, transaction_type, and category.
-        """
-        if not self._db.isOpen():
-            print(
-                f"[{self.__class__.__name__}.set_default_template] Database is not open."
-            )
-            return False
-
-        try:
-            with transaction(self._db) as db_conn:
-                query = QSqlQuery(db_conn)
-
-                # 1. Get information (part, transaction_type, category) of the target record
-                select_target_query = f"""
-                    SELECT part, transaction_type, category
-                    FROM {TABLE_REAL_ESTATE_TEMPLATE}
-                    WHERE id = ?
-                """
-                query.prepare(select_target_query)
-                query.addBindValue(record_id)
-
-                if not query.exec():
-                    print(
-                        f"[{self.__class__.__name__}.set_default_template] Failed to fetch target record: {query.lastError().text()}"
-                    )
-                    raise RuntimeError("Failed to fetch target record.")
-
-                if not query.next():
-                    print(
-                        f"[{self.__class__.__name__}.set_default_template] Record with ID {record_id} not found."
-                    )
-                    return False
-
-                part = query.value("part")
-                transaction_type = query.value("transaction_type")
-                category = query.value("category")
-
-                # 2. Unset (is_default = 0) all other records with matching part, transaction_type, category
-                update_others_query = f"""
-                    UPDATE {TABLE_REAL_ESTATE_TEMPLATE}
-                    SET is_default = 0, updated_at = strftime('%Y-%m-%d %H:%M:%S', 'now')
-                    WHERE part = ?
-                    AND transaction_type = ?
-                    AND category = ?
-                    AND id != ?
-                """
-                query.prepare(update_others_query)
-                query.addBindValue(part)
-                query.addBindValue(transaction_type)
-                query.addBindValue(category)
-                query.addBindValue(record_id)
-
-                if not query.exec():
-                    print(
-                        f"[{self.__class__.__name__}.set_default_template] Failed to unset other defaults: {query.lastError().text()}"
-                    )
-                    raise RuntimeError("Failed to unset other defaults.")
-
-                # 3. Set the target record (record_id) to is_default = 1
-                update_target_query = f"""
-                    UPDATE {TABLE_REAL_ESTATE_TEMPLATE}
-                    SET is_default = 1, updated_at = strftime('%Y-%m-%d %H:%M:%S', 'now')
-                    WHERE id = ?
-                """
-                query.prepare(update_target_query)
-                query.addBindValue(record_id)
-
-                if not query.exec():
-                    print(
-                        f"[{self.__class__.__name__}.set_default_template] Failed to set target as default: {query.lastError().text()}"
-                    )
-                    raise RuntimeError("Failed to set target as default.")
-
-                self.model.select()
-            return True
-
-        except Exception as e:
-            print(
-                f"[{self.__class__.__name__}.set_default_template] Operation failed: {e}"
-            )
-            self.model.select()
-            return False
-
-
-class RealEstateTemplateService(BaseService):
-    DATA_TYPE = RealEstateTemplateType
-
-    def __init__(self, model: RealEstateTemplateModel):
-        if not isinstance(model, RealEstateTemplateModel):
-            raise TypeError(
-                "model must be an instance of RealEstateTemplateModel or its subclass."
-            )
-        super().__init__(model)
-
-    def create(self, payload: RealEstateTemplateType) -> bool:
-        return super().create(payload)
-
-    def read(self, record_id: int) -> Optional[RealEstateTemplateType]:
-        return super().read(record_id)
-
-    def read_all(self) -> List[RealEstateTemplateType]:
-        return super().read_all()
-
-    def update(self, record_id: int, payload: RealEstateTemplateType) -> bool:
-        return super().update(record_id, payload)
-
-    def delete(self, record_id: int) -> bool:
-        return super().delete(record_id)
-
-    def delete_multiple(self, record_ids: List[int]):
-        return super().delete_multiple(record_ids)
-
-    def import_data(self, payload: List[RealEstateTemplateType]):
-        return super().import_data(payload)
-
-    def get_random(self, part: str, transaction_type: str, category: str) -> str:
-        """
-        Retrieves a random template value based on part, transaction_type, and category.
-        """
-        if not self._db.isOpen():
-            print(f"[{self.__class__.__name__}.get_random] Database is not open.")
-            return ""
-
-        query_obj = QSqlQuery(self._db)  # Khởi tạo QSqlQuery với đối tượng QSqlDatabase
-        query = f"""
-            SELECT value FROM {TABLE_REAL_ESTATE_TEMPLATE}
-            WHERE (? = '' OR part = ?)
-            AND (? = '' OR transaction_type = ?)
-            AND (? = '' OR category = ?)
-            AND is_default = 0
-            ORDER BY RANDOM() LIMIT 1
-        """
-        query_obj.prepare(query)  # Chuẩn bị truy vấn
-
-        # Binding các tham số
-        query_obj.addBindValue(part)
-        query_obj.addBindValue(part)
-        query_obj.addBindValue(transaction_type)
-        query_obj.addBindValue(transaction_type)
-        query_obj.addBindValue(category)
-        query_obj.addBindValue(category)
-
-        if not query_obj.exec():  # Thực thi truy vấn
-            print(
-                f"[{self.__class__.__name__}.get_random] Query failed: {query_obj.lastError().text()}"
-            )
-            return ""
-
-        if query_obj.next():  # Di chuyển con trỏ đến hàng đầu tiên (nếu có)
-            return query_obj.value(0)  # Lấy giá trị của cột đầu tiên (value)
-        return ""  # Trả về chuỗi rỗng nếu không tìm thấy
+            return []
+        candidates: List[Tuple[str, float]] = []
+        while query_obj.next():
+            candidates.append((query_obj.value(0), query_obj.value(1)))
+        return candidates
 
     def get_default(self, part: str, transaction_type: str, category: str) -> str:
         """
@@ -558,23 +417,16 @@ class RealEstateTemplateService(BaseService):
             print(f"[{self.__class__.__name__}.get_default] Database is not open.")
             return ""
 
+        where = self._template_where_clause(part, transaction_type, category, 1)
         query_obj = QSqlQuery(self._db)  # Khởi tạo QSqlQuery với đối tượng QSqlDatabase
         query = f"""
-            SELECT value from {TABLE_REAL_ESTATE_TEMPLATE}
-            WHERE (? = '' OR part = ?)
-            AND (? = '' OR transaction_type = ?)
-            AND (? = '' OR category = ?)
-            AND is_default = 1
+            SELECT value FROM {TABLE_REAL_ESTATE_TEMPLATE}
+            WHERE {" AND ".join(where[0])}
+            LIMIT 1
         """
         query_obj.prepare(query)  # Chuẩn bị truy vấn
-
-        # Binding các tham số
-        query_obj.addBindValue(part)
-        query_obj.addBindValue(part)
-        query_obj.addBindValue(transaction_type)
-        query_obj.addBindValue(transaction_type)
-        query_obj.addBindValue(category)
-        query_obj.addBindValue(category)
+        for value in where[1]:
+            query_obj.addBindValue(value)
 
         if not query_obj.exec():  # Thực thi truy vấn
             print(
@@ -686,6 +538,7 @@ class RealEstateTemplateService(BaseService):
 
 class MiscProductService(BaseService):
     DATA_TYPE = MiscProductType
+    IMPORT_KEY = "pid"
 
     def __init__(self, model: MiscProductModel):
         if not isinstance(model, MiscProductModel):
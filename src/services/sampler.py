@@ -0,0 +1,123 @@
+# src/services/sampler.py
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractItemModel
+
+from src.my_constants import SAMPLER_TTL_SECONDS, SAMPLER_WEIGHTING
+
+SAMPLER_WEIGHTINGS = ("uniform", "recency", "lru")
+
+# loader(bucket) -> [(key, age_in_days), ...]
+SamplerLoader = Callable[[Hashable], List[Tuple[Any, float]]]
+
+
+class _Bucket:
+    __slots__ = ("keys", "prob", "alias", "order", "cursor", "loaded_at")
+
+    def __init__(self, keys: List[Any], loaded_at: float):
+        self.keys = keys
+        self.prob: List[float] = []
+        self.alias: List[int] = []
+        self.order: List[int] = []
+        self.cursor = 0
+        self.loaded_at = loaded_at
+
+
+class BucketSampler:
+    """
+    Caches the candidate keys of each bucket (e.g. one transaction_type, or one
+    part/transaction_type/category combination) so random picks do not hit the
+    database. A bucket is loaded once through `loader`, then every sample is O(1):
+      - "uniform": every candidate is equally likely.
+      - "recency": weight 1 / (1 + age_in_days), using Walker's alias table.
+      - "lru": a shuffled rotation, each candidate is handed out once before
+        any candidate repeats.
+    Buckets are dropped by invalidate() (wired to the model signals by watch())
+    or once they are older than `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        loader: SamplerLoader,
+        weighting: str = SAMPLER_WEIGHTING,
+        ttl: Optional[float] = SAMPLER_TTL_SECONDS,
+    ):
+        if weighting not in SAMPLER_WEIGHTINGS:
+            raise ValueError(
+                f"[{self.__class__.__name__}.__init__] Unknown weighting '{weighting}'. Expected one of {SAMPLER_WEIGHTINGS}."
+            )
+        self._loader = loader
+        self._weighting = weighting
+        self._ttl = ttl
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, model: QAbstractItemModel):
+        """Drops every cached bucket whenever the model's rows change."""
+        model.modelReset.connect(self.invalidate)
+        model.rowsInserted.connect(self.invalidate)
+        model.rowsRemoved.connect(self.invalidate)
+        model.dataChanged.connect(self.invalidate)
+
+    def invalidate(self, *_args, bucket: Optional[Hashable] = None):
+        with self._lock:
+            if bucket is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(bucket, None)
+
+    def sample(self, bucket: Hashable) -> Optional[Any]:
+        """Returns a random key of the bucket, or None if the bucket is empty."""
+        with self._lock:
+            cached = self._buckets.get(bucket)
+            if cached is None or (
+                self._ttl is not None
+                and time.monotonic() - cached.loaded_at > self._ttl
+            ):
+                cached = self._load(bucket)
+                self._buckets[bucket] = cached
+            if not cached.keys:
+                return None
+            if self._weighting == "lru":
+                if cached.cursor >= len(cached.order):
+                    random.shuffle(cached.order)
+                    cached.cursor = 0
+                index = cached.order[cached.cursor]
+                cached.cursor += 1
+                return cached.keys[index]
+            index = random.randrange(len(cached.keys))
+            if self._weighting == "recency" and random.random() >= cached.prob[index]:
+                index = cached.alias[index]
+            return cached.keys[index]
+
+    def _load(self, bucket: Hashable) -> _Bucket:
+        candidates = self._loader(bucket)
+        cached = _Bucket([key for key, _ in candidates], time.monotonic())
+        if self._weighting == "lru":
+            cached.order = list(range(len(candidates)))
+            random.shuffle(cached.order)
+        elif self._weighting == "recency" and candidates:
+            weights = [1.0 / (1.0 + max(float(age or 0), 0.0)) for _, age in candidates]
+            cached.prob, cached.alias = self._build_alias_table(weights)
+        return cached
+
+    @staticmethod
+    def _build_alias_table(weights: List[float]) -> Tuple[List[float], List[int]]:
+        """Vose's alias method: O(n) build for O(1) weighted sampling."""
+        count = len(weights)
+        total = sum(weights)
+        scaled = [w * count / total for w in weights]
+        prob = [1.0] * count
+        alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        return prob, alias
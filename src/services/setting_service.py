@@ -7,6 +7,7 @@ from src.my_types import SettingProxyType, SettingUserDataDirType
 
 class SettingProxyService(BaseService):
     DATA_TYPE = SettingProxyType
+    IMPORT_KEY = "value"
 
     def __init__(self, model: SettingProxyModel):
         if not isinstance(model, SettingProxyModel):
@@ -23,6 +24,10 @@ class SettingProxyService(BaseService):
         list_proxies: List[SettingProxyType] = super().read_all()
         return [proxy for proxy in list_proxies if proxy.value]
 
+    def fetch_all(self, order_by: Optional[str] = None) -> List[SettingProxyType]:
+        list_proxies: List[SettingProxyType] = super().fetch_all(order_by)
+        return [proxy for proxy in list_proxies if proxy.value]
+
     def delete(self, record_id: int) -> bool:
         return super().delete(record_id)
 
@@ -32,6 +37,8 @@ class SettingProxyService(BaseService):
 
 class SettingUserDataDirService(BaseService):
     DATA_TYPE = SettingUserDataDirType
+    IMPORT_KEY = "value"
+    BACKGROUND_SAFE_METHODS = BaseService.BACKGROUND_SAFE_METHODS | {"get_selected"}
 
     def __init__(self, model: SettingUserDataDirModel):
         if not isinstance(model, SettingUserDataDirModel):
@@ -56,14 +63,15 @@ class SettingUserDataDirService(BaseService):
         return super().delete_multiple(record_ids)
 
     def set_selected(self, record_id: int) -> bool:
-        udds = self.read_all()
-        for udd in udds:
-            udd.is_selected = 0
-            self.update(udd.id, udd)
-
-        current_udd = self.read(record_id)
-        current_udd.is_selected = 1
-        update_success = self.update(record_id, current_udd)
+        with self.model.deferred_refresh():
+            udds = self.read_all()
+            for udd in udds:
+                udd.is_selected = 0
+                self.update(udd.id, udd)
+
+            current_udd = self.read(record_id)
+            current_udd.is_selected = 1
+            update_success = self.update(record_id, current_udd)
         if update_success:
             # print(
             #     f"[{self.__class__.__name__}.set_selected] Successfully toggled status for udd ID '{record_id}' to 1."
@@ -76,8 +84,5 @@ class SettingUserDataDirService(BaseService):
             return False
 
     def get_selected(self) -> Optional[str]:
-        udds = self.read_all()
-        for udd in udds:
-            if udd.is_selected == 1:
-                return udd.value
-        return None
+        udd = self.fetch_by_key("is_selected", 1)
+        return udd.value if udd else None
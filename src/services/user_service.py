@@ -2,7 +2,7 @@
 import os
 import shutil
 from fake_useragent import UserAgent
-from typing import Optional, List
+from typing import Dict, Optional, List
 from src.services.base_service import BaseService
 from src.models.user_model import UserModel, UserListedProductModel
 from src.my_types import UserType, UserListedProductType
@@ -11,6 +11,11 @@ import uuid
 
 class UserService(BaseService):
     DATA_TYPE = UserType
+    IMPORT_KEY = "uid"
+    BACKGROUND_SAFE_METHODS = BaseService.BACKGROUND_SAFE_METHODS | {
+        "update_status",
+        "update_statuses",
+    }
 
     def __init__(self, model: UserModel):
         if not isinstance(model, UserModel):
@@ -63,9 +68,7 @@ class UserService(BaseService):
             raise ValueError(
                 f"Invalid status value: {new_status}. Status must be 0 or 1."
             )
-        user = self.read(record_id)
-        user.status = new_status
-        update_success = self.update(record_id, user)
+        update_success = self.update_fields([record_id], {"status": new_status})
         if update_success:
             # print(
             #     f"[{self.__class__.__name__}.update_status] Successfully toggled status for user ID '{record_id}' to {new_status}."
@@ -77,6 +80,20 @@ class UserService(BaseService):
             # )
             return False
 
+    def update_statuses(self, statuses: Dict[int, int]) -> bool:
+        """{record_id: status} in one batched UPDATE per status value."""
+        ids_by_status: Dict[int, List[int]] = {}
+        for record_id, new_status in statuses.items():
+            if new_status not in [0, 1]:
+                raise ValueError(
+                    f"Invalid status value: {new_status}. Status must be 0 or 1."
+                )
+            ids_by_status.setdefault(new_status, []).append(record_id)
+        success = True
+        for new_status, record_ids in ids_by_status.items():
+            success = self.update_fields(record_ids, {"status": new_status}) and success
+        return success
+
     def get_uids_by_record_ids(self, record_ids: List[int]) -> List[str]:
         return self.model.get_uids_by_record_ids(record_ids)
 
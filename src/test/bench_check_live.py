@@ -0,0 +1,107 @@
+# src/test/bench_check_live.py
+"""
+CheckLive engines against a local HTTP server that answers like the graph
+picture endpoint after a fixed latency: "thread" (one blocking pycurl request
+per pool thread) and "multi" (pycurl.CurlMulti on one thread).
+
+    python -m src.test.bench_check_live [--uids 1000] [--latency-ms 50] [--threads 5] [--concurrency 200]
+
+Reported per engine: wall time, checks per second, and the number of TCP
+connections the server accepted (the multi engine reuses its connections).
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.05
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        uid = self.path.strip("/").split("/")[0]
+        # Một uid trên mười là tài khoản "die"
+        height = 0 if uid.endswith("7") else 50
+        body = json.dumps({"data": {"height": height}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+def run_engine(engine: str, uids, port: int, threads: int, concurrency: int):
+    # Các hằng số được đọc khi import, nên đặt biến môi trường trước
+    os.environ["CHECK_LIVE_URL"] = f"http://127.0.0.1:{port}/{{uid}}/picture"
+    os.environ["CHECK_LIVE_THREADS"] = str(threads)
+    os.environ["CHECK_LIVE_CONCURRENCY"] = str(concurrency)
+    from PyQt6.QtCore import QCoreApplication
+    from src.services.check_live import CheckLive
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    results = {"live": 0, "dead": 0, "failed": 0}
+    check_live = CheckLive(engine=engine)
+
+    def on_succeeded(record_id, uid, is_live):
+        results["live" if is_live else "dead"] += 1
+
+    def on_failed(record_id, uid, error_msg):
+        results["failed"] += 1
+
+    check_live.task_succeeded.connect(on_succeeded)
+    check_live.task_failed.connect(on_failed)
+    check_live.all_tasks_finished.connect(app.quit)
+    t0 = time.perf_counter()
+    check_live.add_tasks(list(enumerate(uids)))
+    app.exec()
+    check_live.threadpool.waitForDone()
+    return time.perf_counter() - t0, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uids", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--threads", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    _Handler.latency = args.latency_ms / 1000
+    server = _Server(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    uids = [str(100000000000000 + i) for i in range(args.uids)]
+
+    for engine in ("thread", "multi"):
+        server.connections = 0
+        elapsed, results = run_engine(
+            engine, uids, port, args.threads, args.concurrency
+        )
+        print(
+            f"{engine:>6}: {elapsed:7.2f}s  {args.uids / elapsed:8.1f} checks/s  "
+            f"connections={server.connections}  {results}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
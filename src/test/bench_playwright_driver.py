@@ -0,0 +1,49 @@
+# src/test/bench_playwright_driver.py
+"""
+Per-task driver overhead: a new sync_playwright() per task (the old
+BrowserWorker.run) against the thread's shared driver (playwright_driver).
+
+    python -m src.test.bench_playwright_driver [--tasks 20]
+
+Only the driver start/stop is timed, the browser launch itself is the same in
+both cases.
+"""
+
+import argparse
+import time
+
+from playwright.sync_api import sync_playwright
+
+from src.robot.playwright_driver import get_playwright, stop_playwright
+
+
+def per_task_driver(tasks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(tasks):
+        with sync_playwright() as p:
+            p.chromium  # what a task touches before launching
+    return (time.perf_counter() - start) / tasks
+
+
+def shared_driver(tasks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(tasks):
+        get_playwright().chromium
+    elapsed = (time.perf_counter() - start) / tasks
+    stop_playwright()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=20)
+    args = parser.parse_args()
+    old = per_task_driver(args.tasks)
+    new = shared_driver(args.tasks)
+    print(f"sync_playwright() per task: {old * 1000:8.1f} ms/task")
+    print(f"shared driver per thread:   {new * 1000:8.1f} ms/task")
+    print(f"saved per task:             {(old - new) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
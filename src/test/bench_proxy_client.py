@@ -0,0 +1,122 @@
+# src/test/bench_proxy_client.py
+"""
+Proxy lookups of browser launches against a local rotation API that answers
+like proxyxoay after a fixed latency (a new proxy at most once per rotation
+window, "not ready" (101) otherwise): get_proxy (new handle per call) and
+ProxyRotationClient (kept connection, credential reuse, prefetch on release).
+
+    python -m src.test.bench_proxy_client [--launches 200] [--latency-ms 100] [--rotation-ms 500]
+
+Reported per client: wall time, time blocked in lookups, lookups answered
+"not ready", API requests and TCP connections the server accepted.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.1
+    rotation = 0.5
+    last_rotation = 0.0
+    rotations = 0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        cls = type(self)
+        self.server.requests += 1
+        now = time.monotonic()
+        if now - cls.last_rotation < cls.rotation:
+            body = {"status": 101, "message": "Proxy is not ready"}
+        else:
+            cls.last_rotation = now
+            cls.rotations += 1
+            body = {
+                "status": 100,
+                "message": "OK",
+                "proxyhttp": f"10.0.0.{cls.rotations % 250}:8080:user:pass",
+            }
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+    requests = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+def run_client(name: str, raw_proxy: str, launches: int, session: float):
+    from src.utils.get_proxy import get_proxy
+    from src.utils.proxy_client import ProxyRotationClient
+
+    client = ProxyRotationClient()
+    blocked = 0.0
+    not_ready = 0
+    t0 = time.perf_counter()
+    for _ in range(launches):
+        t = time.perf_counter()
+        res = get_proxy(raw_proxy) if name == "get_proxy" else client.get(raw_proxy)
+        blocked += time.perf_counter() - t
+        if res.get("status") == 101:
+            not_ready += 1
+        # Phiên trình duyệt dùng proxy, sau đó trả proxy
+        time.sleep(session)
+        if name == "client":
+            client.prefetch(raw_proxy)
+    return time.perf_counter() - t0, blocked, not_ready
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--launches", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--rotation-ms", type=float, default=500)
+    parser.add_argument("--session-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    _Handler.latency = args.latency_ms / 1000
+    _Handler.rotation = args.rotation_ms / 1000
+    server = _Server(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"127.0.0.1:{server.server_address[1]}"
+    # Máy chủ cục bộ được xem như một domain của proxyxoay
+    from src.utils.proxy_providers import ProxyxoayProvider, register_provider
+
+    register_provider(
+        ProxyxoayProvider(domains=[host], rotation_seconds=_Handler.rotation)
+    )
+    raw_proxy = f"http://{host}/api/token?key=bench"
+
+    for name in ("get_proxy", "client"):
+        server.connections = 0
+        server.requests = 0
+        _Handler.last_rotation = 0.0
+        elapsed, blocked, not_ready = run_client(
+            name, raw_proxy, args.launches, args.session_ms / 1000
+        )
+        print(
+            f"{name:>9}: {elapsed:7.2f}s  blocked={blocked:6.2f}s  "
+            f"not_ready={not_ready}  requests={server.requests}  "
+            f"connections={server.connections}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# src/test/bench_scheduler.py
+"""
+Discrete simulation of BrowserManager dispatching: the old FIFO deque (retries
+pushed back with appendleft) against robot/scheduler.TaskScheduler.
+
+    python -m src.test.bench_scheduler [--accounts 200] [--tasks 3] [--slots 8]
+
+A few flaky accounts fail most of their tasks (proxy not ready) and retry
+them. Every task takes one tick, a failed attempt too, and a task whose
+account is already running holds its slot waiting on the profile lock until
+the next tick. Reported: ticks until the healthy accounts are done and until
+every task is done, mean/max ticks before an account starts its first task,
+and raw pop() throughput.
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from src.my_constants import ROBOT_ACTION_PRIORITIES
+from src.robot.scheduler import TaskScheduler
+
+
+@dataclass
+class _User:
+    uid: str
+
+
+@dataclass
+class _Task:
+    user_info: _User
+    action_name: str
+    priority: Optional[int] = None
+    deadline: Optional[float] = None
+
+
+def make_tasks(accounts: int, tasks: int):
+    actions = list(ROBOT_ACTION_PRIORITIES.keys())
+    return [
+        _Task(_User(f"uid{a}"), actions[(a + t) % len(actions)])
+        for t in range(tasks)
+        for a in range(accounts)
+    ]
+
+
+def simulate(queue_type: str, tasks, flaky: set, slots: int, fail_rate: float):
+    rng = random.Random(1)
+    if queue_type == "fifo":
+        queue = deque(tasks)
+        pop = lambda: queue.popleft() if queue else None
+        retry = queue.appendleft
+        done = lambda task: None
+    else:
+        queue = TaskScheduler(priorities=ROBOT_ACTION_PRIORITIES, starvation_limit=50)
+        queue.extend(tasks)
+        pop = queue.pop
+        retry = queue.requeue
+        done = queue.task_done
+
+    first_start = {}
+    remaining = len(tasks)
+    healthy_remaining = sum(1 for task in tasks if task.user_info.uid not in flaky)
+    healthy_ticks = 0
+    blocked = []
+    tick = 0
+    while remaining:
+        # Tasks that waited on their profile lock last tick keep their slot
+        running, blocked = blocked, []
+        busy_accounts = {task.user_info.uid for task in running}
+        while len(running) + len(blocked) < slots:
+            task = pop()
+            if task is None:
+                break
+            if task.user_info.uid in busy_accounts:
+                # Same profile already open: the worker waits on the udd lock
+                blocked.append(task)
+                continue
+            busy_accounts.add(task.user_info.uid)
+            first_start.setdefault(task.user_info.uid, tick)
+            running.append(task)
+        for task in running:
+            if task.user_info.uid in flaky and rng.random() < fail_rate:
+                retry(task)
+            else:
+                remaining -= 1
+                if task.user_info.uid not in flaky:
+                    healthy_remaining -= 1
+            done(task)
+        tick += 1
+        if healthy_remaining == 0 and not healthy_ticks:
+            healthy_ticks = tick
+    waits = list(first_start.values())
+    return healthy_ticks, tick, sum(waits) / len(waits), max(waits)
+
+
+def pop_throughput(tasks) -> float:
+    scheduler = TaskScheduler(priorities=ROBOT_ACTION_PRIORITIES, starvation_limit=50)
+    scheduler.extend(tasks)
+    start = time.perf_counter()
+    while True:
+        task = scheduler.pop()
+        if task is None:
+            break
+        scheduler.task_done(task)
+    return len(tasks) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=3)
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--flaky", type=int, default=4)
+    parser.add_argument("--fail-rate", type=float, default=0.9)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.accounts, args.tasks)
+    flaky = {f"uid{a}" for a in range(args.flaky)}
+    for queue_type in ("fifo", "scheduler"):
+        healthy_ticks, ticks, mean_wait, max_wait = simulate(
+            queue_type, tasks, flaky, args.slots, args.fail_rate
+        )
+        print(
+            f"{queue_type:<10} healthy done: {healthy_ticks:5d}   all done: {ticks:5d}"
+            f"   first start mean: {mean_wait:6.1f}   max: {max_wait:5d}"
+        )
+    print(f"pop() + task_done(): {pop_throughput(tasks):,.0f} tasks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# src/test/bench_sqlite.py
+"""
+Compares the SQLite PRAGMA profile (SQLITE_PRAGMA_PROFILE) with SQLite's
+defaults on the sample data in exports/.
+
+    python -m src.test.bench_sqlite [--repeat 5]
+
+Each profile runs in its own process against fresh temporary databases.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PRODUCTS_FILE = os.path.join(ROOT_DIR, "exports", "products.json")
+TEMPLATES_FILE = os.path.join(ROOT_DIR, "exports", "templates_macmini.json")
+
+# SQLite's own defaults for the keys of SQLITE_PRAGMA_PROFILE
+DEFAULT_PROFILE = {
+    "synchronous": "FULL",
+    "cache_size": -2000,
+    "mmap_size": 0,
+    "temp_store": "DEFAULT",
+    "busy_timeout": 0,
+}
+
+
+def load_payload(file_path, data_type, repeat):
+    from dataclasses import fields
+
+    names = [f.name for f in fields(data_type)]
+    with open(file_path, mode="r", encoding="utf8") as f:
+        raw = json.load(f)
+    payload = []
+    for copy in range(repeat):
+        for item in raw:
+            data = {name: item.get(name) for name in names}
+            data.update(id=None, created_at=None, updated_at=None)
+            if "pid" in data:
+                data["pid"] = f"{data['pid']}.{copy}"
+            payload.append(data_type(**data))
+    return payload
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"  {label:<32}{time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def run_profile(profile_name, repeat):
+    work_dir = tempfile.mkdtemp(prefix=f"bench_{profile_name}_")
+    os.environ["PATH_DB_USER"] = os.path.join(work_dir, "db_user.db")
+    os.environ["PATH_DB_PRODUCT"] = os.path.join(work_dir, "db_product.db")
+    os.environ["PATH_DB_SETTING"] = os.path.join(work_dir, "db_setting.db")
+    sys.path.insert(0, ROOT_DIR)
+
+    from PyQt6.QtCore import QCoreApplication
+    from PyQt6.QtSql import QSqlDatabase
+
+    app = QCoreApplication(sys.argv[:1])  # noqa: F841
+    from src.my_constants import CONNECTION_DB_PRODUCT, RE_TRANSACTION
+    from src.my_types import RealEstateProductType, RealEstateTemplateType
+    from src.database.pragmas import apply_pragmas
+    from src.database.product_database import initialize_product_database
+    from src.models.product_model import RealEstateProductModel, RealEstateTemplateModel
+    from src.services.product_service import (
+        RealEstateProductService,
+        RealEstateTemplateService,
+    )
+
+    initialize_product_database()
+    if profile_name == "default":
+        apply_pragmas(QSqlDatabase.database(CONNECTION_DB_PRODUCT), DEFAULT_PROFILE)
+
+    products = load_payload(PRODUCTS_FILE, RealEstateProductType, repeat)
+    templates = load_payload(TEMPLATES_FILE, RealEstateTemplateType, 1)
+    product_service = RealEstateProductService(RealEstateProductModel())
+    template_service = RealEstateTemplateService(RealEstateTemplateModel())
+
+    print(f"[{profile_name}] {len(products)} products, {len(templates)} templates")
+    timed("import_data (products)", product_service.import_data, products)
+    timed("bulk_import (templates)", template_service.bulk_import, templates)
+    timed("read_all (products)", product_service.read_all)
+    timed("fetch_all (products)", product_service.fetch_all)
+
+    def pick_many():
+        for _ in range(300):
+            product_service.get_random(RE_TRANSACTION["sell"])
+            product_service.get_random(RE_TRANSACTION["rent"])
+            template_service.get_random("title", RE_TRANSACTION["sell"], "")
+
+    timed("get_random x900", pick_many)
+    # one transaction per call, this is where synchronous=NORMAL shows
+    timed(
+        "update_fields x300 (1/commit)",
+        lambda: [
+            product_service.update_fields([i], {"status": 1}) for i in range(1, 301)
+        ],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--profile", choices=["default", "tuned"])
+    args = parser.parse_args()
+    if args.profile:
+        run_profile(args.profile, args.repeat)
+        return
+    for profile_name in ["default", "tuned"]:
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "src.test.bench_sqlite",
+                "--profile",
+                profile_name,
+                "--repeat",
+                str(args.repeat),
+            ],
+            cwd=ROOT_DIR,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
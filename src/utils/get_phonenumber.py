@@ -4,6 +4,8 @@ from typing import Optional, Dict, List
 import io, pycurl, json
 from urllib.parse import urljoin, urlencode
 
+from src.my_constants import VIOTP_SERVICE_CACHE_SECONDS
+
 
 class RequestViotp:
     """
@@ -12,21 +14,36 @@ class RequestViotp:
     This class provides methods to retrieve account balance,
     list available services, get service IDs, request phone numbers for services,
     and poll for OTP codes. It handles API requests using pycurl for efficient
-    HTTP communication.
+    HTTP communication: every thread keeps its own handle, so its connection to
+    the API stays alive between calls. The service list and the service IDs are
+    cached. To wait for OTP codes, use services/otp_poller.OtpPoller rather
+    than polling get_code() from one thread per request.
     """
 
-    def __init__(self, token: str = None):
+    def __init__(
+        self,
+        token: str = None,
+        service_cache_seconds: float = VIOTP_SERVICE_CACHE_SECONDS,
+    ):
         """
         Initializes the RequestViotp client.
 
         Args:
             token (str, optional): The authentication token for the Viotp API.
                                    Raises ValueError if None or empty.
+            service_cache_seconds (float, optional): How long list_services()
+                                   answers from its cache.
         """
         self._params = {"token": token}
         self._base_url = "https://api.viotp.com"
         if not token:
             raise ValueError(f"Invalid token: {self._params.get('token')}")
+        self._service_cache_seconds = service_cache_seconds
+        self._services: Optional[List[Dict]] = None
+        self._services_fetched_at = 0.0
+        self._service_ids: Dict[str, int] = {}
+        self._services_lock = threading.Lock()
+        self._local = threading.local()
 
     def get_account_balance(self) -> Optional[int]:
         """
@@ -59,9 +76,13 @@ class RequestViotp:
             # Re-raise the custom exception for higher-level handling
             raise e
 
-    def list_services(self) -> Optional[Dict]:
+    def list_services(self, refresh: bool = False) -> Optional[Dict]:
         """
-        Lists all available services from the Viotp API.
+        Lists all available services from the Viotp API. The list is cached
+        for service_cache_seconds.
+
+        Args:
+            refresh (bool, optional): Ignore the cached list.
 
         Returns:
             Optional[Dict]: A dictionary containing service data if successful,
@@ -69,6 +90,14 @@ class RequestViotp:
         Raises:
             RequestViotpError: If the API call fails or returns an error status.
         """
+        with self._services_lock:
+            if (
+                not refresh
+                and self._services
+                and time.monotonic() - self._services_fetched_at
+                < self._service_cache_seconds
+            ):
+                return self._services
         try:
             params = self._params.copy()
             params.setdefault("country", "vn")  # Default to Vietnam services
@@ -83,6 +112,11 @@ class RequestViotp:
                 )
             # Assuming API response structure includes 'data' key
             data = response_data.get("data", None)
+            if data:
+                with self._services_lock:
+                    self._services = data
+                    self._services_fetched_at = time.monotonic()
+                    self._service_ids.clear()
             return data
         except RequestViotpError as e:
             # Re-raise the custom exception for higher-level handling
@@ -98,6 +132,10 @@ class RequestViotp:
         Returns:
             int: The integer ID of the service if found, -1 otherwise.
         """
+        with self._services_lock:
+            service_id = self._service_ids.get(service_name.lower())
+        if service_id is not None:
+            return service_id
         list_service = self.list_services()
         if not list_service:
             return -1  # No services found at all
@@ -110,6 +148,8 @@ class RequestViotp:
             None,
         )
         if target_service:
+            with self._services_lock:
+                self._service_ids[service_name.lower()] = target_service.get("id")
             return target_service.get("id")
         return -1  # Service name not found in the list
 
@@ -267,18 +307,8 @@ class RequestViotp:
                        or further refined error types can be raised here.
         """
         buffer = io.BytesIO()
-        curl = pycurl.Curl()
+        curl = self._curl()
         curl.setopt(pycurl.URL, url)
-        curl.setopt(pycurl.CONNECTTIMEOUT, 60)  # Set connection timeout
-        curl.setopt(pycurl.TIMEOUT, 60)  # Set total operation timeout
-        headers = [
-            "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-            "Accept: application/json, text/plain, */*",
-            "Accept-Language: en-US,en;q=0.9",
-            "Connection: keep-alive",
-            f"Authorization: Bearer {self._params.get('token')}",  # IMPORTANT: Ensure token is sent here
-        ]
-        curl.setopt(pycurl.HTTPHEADER, headers)
         curl.setopt(pycurl.WRITEFUNCTION, buffer.write)
 
         try:
@@ -312,12 +342,36 @@ class RequestViotp:
             return res  # Return the parsed JSON response
         except pycurl.error as e:
             # Handles network-related errors originating from pycurl
+            # The connection may be broken: the next call opens a new handle
+            self._local.curl = None
+            curl.close()
             raise Exception(f"PycURL Error accessing {url}: {e}")
         except Exception as e:
             # Re-raise any other unexpected exceptions not caught specifically above
             raise Exception(f"An unexpected error occurred while requesting {url}: {e}")
-        finally:
-            curl.close()  # Always ensure the curl object is closed to release resources
+
+    def _curl(self) -> pycurl.Curl:
+        """
+        The pycurl handle of the calling thread, created on first use and kept
+        open so its connection to the API is reused.
+        """
+        curl = getattr(self._local, "curl", None)
+        if curl is None:
+            curl = pycurl.Curl()
+            curl.setopt(pycurl.CONNECTTIMEOUT, 60)  # Set connection timeout
+            curl.setopt(pycurl.TIMEOUT, 60)  # Set total operation timeout
+            headers = [
+                "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+                "Accept: application/json, text/plain, */*",
+                "Accept-Language: en-US,en;q=0.9",
+                "Connection: keep-alive",
+                f"Authorization: Bearer {self._params.get('token')}",  # IMPORTANT: Ensure token is sent here
+            ]
+            curl.setopt(pycurl.HTTPHEADER, headers)
+            curl.setopt(pycurl.TCP_KEEPALIVE, 1)
+            curl.setopt(pycurl.NOSIGNAL, 1)
+            self._local.curl = curl
+        return curl
 
 
 class RequestViotpError(Exception):
@@ -330,7 +384,10 @@ class RequestViotpError(Exception):
     """
 
     def __init__(
-        self, message: str, error_code: Optional[int], error_data: Optional[Dict]
+        self,
+        message: str,
+        error_code: Optional[int] = None,
+        error_data: Optional[Dict] = None,
     ):
         """
         Initializes a RequestViotpError instance.
@@ -404,6 +461,8 @@ def get_otp_task(
 ):
     """
     Worker task to continuously poll for the OTP code for a given request ID.
+    Keeps one thread busy per request; services/otp_poller.OtpPoller waits for
+    any number of requests on a single thread.
 
     This task will repeatedly call the API's get_code endpoint until an OTP
     is received (status 1), the request expires (status 2), or an error occurs.
@@ -511,10 +570,13 @@ if __name__ == "__main__":
             f"[MainThread] All service request threads completed. Processing results and starting OTP threads..."
         )
 
-        # List to hold references to OTP retrieval threads
-        otp_threads: List[threading.Thread] = []
+        # One poller waits for every OTP (one thread, one connection) and puts
+        # each result into otp_queue
+        from src.services.otp_poller import OtpPoller
 
-        # Process results from service_request_queue and start OTP retrieval threads
+        otp_poller = OtpPoller(api_client)
+
+        # Process results from service_request_queue and start watching their OTP
         while not service_request_queue.empty():
             item = service_request_queue.get()
             service_name = item.get("service_name")
@@ -525,28 +587,17 @@ if __name__ == "__main__":
                 print(
                     f"[MainThread] Obtained phone number: {phone_number} for {service_name} (Request ID: {request_id})"
                 )
-
-                # Create and start a new thread for each OTP retrieval
-                otp_thread = threading.Thread(
-                    target=get_otp_task,
-                    args=(api_client, service_name, request_id, otp_queue),
-                    # Using request_id in thread name for uniqueness and traceability
-                    name=f"{service_name.capitalize()}OTPThread_ReqID_{request_id}",
-                )
-                otp_threads.append(otp_thread)
-                otp_thread.start()
+                otp_poller.watch(request_id, service_name, callback=otp_queue.put)
             else:
                 print(
                     f"[MainThread] Skipping OTP task for {service_name} due to missing Request ID (Service request failed)."
                 )
 
-        # Wait for all OTP retrieval threads to complete
-        print("[MainThread] Waiting for all OTP retrieval threads to finish...")
-        for otp_thread in otp_threads:
-            otp_thread.join()
-        print(
-            "[MainThread] All OTP retrieval threads completed. Collecting final results..."
-        )
+        # Wait for every watched request to get a result
+        print("[MainThread] Waiting for all OTP codes...")
+        while otp_poller.pending_count():
+            time.sleep(0.5)
+        print("[MainThread] All OTP requests completed. Collecting final results...")
 
         # Print all collected OTPs from the otp_queue
         while not otp_queue.empty():
@@ -558,4 +609,4 @@ if __name__ == "__main__":
 
     else:
         # Provide usage instructions if command-line arguments are incorrect
-        print("Usage: python get_phonenumber.py <number_of_threads>")
+        print("Usage: python -m src.utils.get_phonenumber <number_of_threads>")
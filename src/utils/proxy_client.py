@@ -0,0 +1,330 @@
+# src/utils/proxy_client.py
+import heapq
+import io
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pycurl
+
+from src.database.connection_provider import release_thread_connections
+from src.my_constants import (
+    PROXY_API_MAX_REQUESTS,
+    PROXY_API_REQUESTS_PER_SECOND,
+    PROXY_API_TIMEOUT_SECONDS,
+    PROXY_COOLDOWN_SECONDS,
+    PROXY_PREFETCH,
+    PROXY_REUSE_CREDENTIALS,
+)
+from src.utils.get_proxy import PROXY_API_HEADERS
+from src.utils.proxy_providers import (
+    ProxyProvider,
+    find_provider,
+    get_provider,
+    proxy_domain,
+)
+
+STATUS_OK = 100
+STATUS_NOT_READY = 101
+
+
+class _Credential:
+    __slots__ = ("data", "fetched_at", "rotate_after", "fresh")
+
+    def __init__(self, data: dict, fetched_at: float, rotate_after: float):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.rotate_after = rotate_after
+        # Vừa xoay bởi prefetch và chưa được tác vụ nào dùng
+        self.fresh = False
+
+
+class _ProviderGate:
+    """Limits the API requests of one provider: in flight at once and per second."""
+
+    def __init__(self, max_requests: int, requests_per_second: float):
+        self._slots = threading.BoundedSemaphore(max(1, max_requests))
+        self._interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    @contextmanager
+    def request(self, clock: Callable[[], float]) -> Iterator[None]:
+        with self._slots:
+            if self._interval:
+                with self._lock:
+                    now = clock()
+                    start = max(now, self._next_at)
+                    self._next_at = start + self._interval
+                if start > now:
+                    time.sleep(start - now)
+            yield
+
+
+class ProxyRotationClient:
+    """
+    Client of the rotation APIs (same answers as get_proxy.get_proxy) that
+    avoids blocking a browser launch on them:
+
+    - Requests to a provider domain share one pycurl.CurlShare (DNS, TLS
+      sessions, connections) and every thread keeps its own Curl handle per
+      domain, so the connection stays alive between calls.
+    - Static providers (proxy_providers.py) are answered without a request.
+    - The last good credential of every raw proxy is kept until its rotation
+      window (the provider's rotation_seconds, unless given) is over and returned without calling the API
+      (reuse). A "not ready" answer (101) also returns it, since the proxy
+      has not rotated.
+    - prefetch() rotates an idle proxy in the background as soon as its
+      window is over; the next get() takes that credential at once. Only call
+      it for a proxy no task is using (rotating changes its IP), and call
+      cancel_prefetch() when the proxy is leased again.
+    - The requests to one provider (all of its proxies, prefetch included)
+      wait for its limits: the provider's max_requests in flight and
+      requests_per_second, or the client's when it declares none.
+    """
+
+    def __init__(
+        self,
+        rotation_seconds: Optional[float] = None,
+        timeout: int = PROXY_API_TIMEOUT_SECONDS,
+        reuse: bool = PROXY_REUSE_CREDENTIALS,
+        prefetch: bool = PROXY_PREFETCH,
+        not_ready_retry_seconds: float = PROXY_COOLDOWN_SECONDS,
+        max_requests: int = PROXY_API_MAX_REQUESTS,
+        requests_per_second: float = PROXY_API_REQUESTS_PER_SECOND,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rotation_seconds = rotation_seconds
+        self.max_requests = max_requests
+        self.requests_per_second = requests_per_second
+        self.timeout = timeout
+        self.reuse = reuse
+        self.prefetch_enabled = prefetch
+        self.not_ready_retry_seconds = not_ready_retry_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._credentials: Dict[str, _Credential] = {}
+        # Mỗi raw proxy chỉ gọi API một lần tại một thời điểm
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self._shares: Dict[str, pycurl.CurlShare] = {}
+        self._gates: Dict[ProxyProvider, _ProviderGate] = {}
+        self._local = threading.local()
+        # Hàng đợi prefetch: (thời điểm, raw proxy)
+        self._prefetch_heap: List[Tuple[float, str]] = []
+        self._prefetch_due: Dict[str, Optional[float]] = {}
+        self._prefetch_cond = threading.Condition(self._lock)
+        self._prefetch_thread: Optional[threading.Thread] = None
+
+    # --------------------- credentials --------------------- #
+    def get(self, raw_proxy: str) -> dict:
+        """{"data", "status", "message"}: a prefetched or still valid credential, else the API's answer."""
+        key = raw_proxy.strip()
+        provider = get_provider(key)
+        if not provider.rotating:
+            return provider.resolve(key)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        with self._fetch_lock(key):
+            # Một luồng khác (hoặc prefetch) có thể vừa lấy xong
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+            return self._rotate(key, provider)
+
+    def _cached(self, key: str) -> Optional[dict]:
+        with self._lock:
+            credential = self._credentials.get(key)
+            if credential is None:
+                return None
+            if credential.fresh:
+                credential.fresh = False
+            elif not (self.reuse and self._clock() < credential.rotate_after):
+                return None
+            return self._ok(credential)
+
+    def _rotate(
+        self, key: str, provider: ProxyProvider, prefetched: bool = False
+    ) -> dict:
+        """Calls the API (the caller holds the fetch lock of the key)."""
+        res = self._fetch(key, provider)
+        try:
+            status = int(res.get("status"))
+        except (TypeError, ValueError):
+            return res
+        now = self._clock()
+        rotation_seconds = (
+            provider.rotation_seconds
+            if self.rotation_seconds is None
+            else self.rotation_seconds
+        )
+        with self._lock:
+            if status == STATUS_OK and res.get("data"):
+                credential = _Credential(res["data"], now, now + rotation_seconds)
+                credential.fresh = prefetched
+                self._credentials[key] = credential
+            elif status == STATUS_NOT_READY and key in self._credentials:
+                # Proxy chưa xoay: thông tin cũ vẫn dùng được
+                credential = self._credentials[key]
+                credential.rotate_after = now + self.not_ready_retry_seconds
+                return self._ok(credential)
+        return res
+
+    @staticmethod
+    def _ok(credential: _Credential) -> dict:
+        return {"data": dict(credential.data), "status": STATUS_OK, "message": ""}
+
+    def _fetch_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._fetch_locks.setdefault(key, threading.Lock())
+
+    def forget(self, raw_proxy: str):
+        """Drops the credential of a proxy (e.g. it stopped working)."""
+        with self._lock:
+            self._credentials.pop(raw_proxy.strip(), None)
+
+    # --------------------- HTTP --------------------- #
+    def _fetch(self, key: str, provider: ProxyProvider) -> dict:
+        curl = self._curl(proxy_domain(key))
+        buffer = io.BytesIO()
+        curl.setopt(pycurl.URL, key)
+        curl.setopt(pycurl.WRITEFUNCTION, buffer.write)
+        try:
+            with self._gate(provider).request(self._clock):
+                curl.perform()
+        except pycurl.error:
+            # Kết nối có thể đã bị server đóng, tạo lại handle ở lần sau
+            self._drop_curl(proxy_domain(key))
+            raise
+        code = curl.getinfo(pycurl.RESPONSE_CODE)
+        return provider.parse_response(key, code, buffer.getvalue())
+
+    def _gate(self, provider: ProxyProvider) -> _ProviderGate:
+        with self._lock:
+            gate = self._gates.get(provider)
+            if gate is None:
+                gate = _ProviderGate(
+                    provider.max_requests or self.max_requests,
+                    (
+                        self.requests_per_second
+                        if provider.requests_per_second is None
+                        else provider.requests_per_second
+                    ),
+                )
+                self._gates[provider] = gate
+            return gate
+
+    def _curl(self, domain: str) -> pycurl.Curl:
+        handles: Dict[str, pycurl.Curl] = getattr(self._local, "handles", None)
+        if handles is None:
+            handles = self._local.handles = {}
+        curl = handles.get(domain)
+        if curl is None:
+            curl = pycurl.Curl()
+            curl.setopt(pycurl.SHARE, self._share(domain))
+            curl.setopt(pycurl.CONNECTTIMEOUT, self.timeout)
+            curl.setopt(pycurl.TIMEOUT, self.timeout)
+            curl.setopt(pycurl.HTTPHEADER, PROXY_API_HEADERS)
+            curl.setopt(pycurl.TCP_KEEPALIVE, 1)
+            curl.setopt(pycurl.NOSIGNAL, 1)
+            handles[domain] = curl
+        return curl
+
+    def _drop_curl(self, domain: str):
+        handles = getattr(self._local, "handles", None) or {}
+        curl = handles.pop(domain, None)
+        if curl is not None:
+            curl.close()
+
+    def _share(self, domain: str) -> pycurl.CurlShare:
+        with self._lock:
+            share = self._shares.get(domain)
+            if share is None:
+                share = pycurl.CurlShare()
+                share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+                share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+                share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_CONNECT)
+                self._shares[domain] = share
+            return share
+
+    # --------------------- prefetch --------------------- #
+    @staticmethod
+    def supports_prefetch(raw_proxy: str) -> bool:
+        provider = find_provider(raw_proxy)
+        return provider is not None and provider.rotating
+
+    def prefetch(self, raw_proxy: str):
+        """Rotates the (idle) proxy in the background once its window is over."""
+        key = raw_proxy.strip()
+        if not self.prefetch_enabled or not self.supports_prefetch(key):
+            return
+        with self._prefetch_cond:
+            credential = self._credentials.get(key)
+            if credential is not None and credential.fresh:
+                return
+            due = credential.rotate_after if credential is not None else self._clock()
+            self._prefetch_due[key] = due
+            heapq.heappush(self._prefetch_heap, (due, key))
+            if self._prefetch_thread is None or not self._prefetch_thread.is_alive():
+                self._prefetch_thread = threading.Thread(
+                    target=self._run_prefetch, name="ProxyPrefetch", daemon=True
+                )
+                self._prefetch_thread.start()
+            self._prefetch_cond.notify()
+
+    def cancel_prefetch(self, raw_proxy: str):
+        """The proxy is leased again: it must not rotate under the task."""
+        with self._prefetch_cond:
+            self._prefetch_due.pop(raw_proxy.strip(), None)
+
+    def _run_prefetch(self):
+        try:
+            while True:
+                with self._prefetch_cond:
+                    key = self._next_due()
+                with self._fetch_lock(key):
+                    with self._lock:
+                        # Bị hủy (hoặc lên lịch lại) trong lúc chờ khóa
+                        if key not in self._prefetch_due or self._prefetch_due[key]:
+                            continue
+                        del self._prefetch_due[key]
+                    try:
+                        self._rotate(key, get_provider(key), prefetched=True)
+                    except Exception as e:
+                        print(f"[{self.__class__.__name__}.prefetch] {key}: {e}")
+        finally:
+            release_thread_connections()
+
+    def _next_due(self) -> str:
+        """
+        Waits for the next due proxy (called with the condition held) and
+        marks it taken (None) until _run_prefetch() rotates it.
+        """
+        while True:
+            while not self._prefetch_heap:
+                self._prefetch_cond.wait()
+            due, key = self._prefetch_heap[0]
+            if self._prefetch_due.get(key) != due:
+                heapq.heappop(self._prefetch_heap)  # Đã hủy hoặc lên lịch lại
+                continue
+            wait = due - self._clock()
+            if wait > 0:
+                self._prefetch_cond.wait(wait)
+                continue
+            heapq.heappop(self._prefetch_heap)
+            self._prefetch_due[key] = None
+            return key
+
+
+_client: Optional[ProxyRotationClient] = None
+_client_lock = threading.Lock()
+
+
+def get_proxy_client() -> ProxyRotationClient:
+    """The process-wide client, shared by every worker thread."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ProxyRotationClient()
+        return _client
@@ -0,0 +1,215 @@
+# src/utils/proxy_providers.py
+import json
+import threading
+from typing import Iterable, List, Optional
+from urllib.parse import unquote, urlparse
+
+from src.my_constants import PROXY_ROTATION_SECONDS
+
+STATUS_OK = 100
+
+
+def proxy_domain(proxy_raw: str) -> str:
+    return urlparse(proxy_raw.strip()).netloc
+
+
+def proxy_result(data: Optional[dict], status, message: Optional[str] = "") -> dict:
+    """The {"data", "status", "message"} answer of get_proxy."""
+    return {"data": data, "status": status, "message": message}
+
+
+class ProxyProvider:
+    """
+    How to turn a raw proxy (a line of the proxy settings) into the Playwright
+    proxy dict {"server", "username", "password"}.
+
+    Static providers answer from the raw proxy itself (resolve()). Rotating
+    providers are APIs: the raw proxy is the URL to call, and
+    parse_response() reads its answer (status 100 ok, 101 not ready yet, 102
+    unavailable).
+
+    Metadata used by the robot:
+    - concurrency: tasks that may use one proxy at once (the IP is shared),
+      None for the lease manager's default (PROXY_MAX_CONCURRENCY).
+    - rotation_seconds: minimum time between two rotations of one proxy; the
+      rotation client reuses a credential that long and the lease manager
+      can keep the proxy idle until the API would answer 100 again.
+    - max_requests / requests_per_second: API requests of all the provider's
+      proxies at once / per second, enforced by the rotation client; None for
+      its defaults (PROXY_API_MAX_REQUESTS, PROXY_API_REQUESTS_PER_SECOND).
+
+    Subclasses set `domains` (API host names) and/or `schemes` (URL schemes,
+    "" for "host:port..." lines) or override matches().
+    """
+
+    name = ""
+    domains: Iterable[str] = ()
+    schemes: Iterable[str] = ()
+    rotating = False
+    concurrency: Optional[int] = None
+    rotation_seconds = 0.0
+    max_requests: Optional[int] = None
+    requests_per_second: Optional[float] = None
+
+    def __init__(
+        self,
+        domains: Optional[Iterable[str]] = None,
+        concurrency: Optional[int] = None,
+        rotation_seconds: Optional[float] = None,
+        max_requests: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+    ):
+        if domains is not None:
+            self.domains = tuple(domains)
+        if concurrency is not None:
+            self.concurrency = concurrency
+        if rotation_seconds is not None:
+            self.rotation_seconds = rotation_seconds
+        if max_requests is not None:
+            self.max_requests = max_requests
+        if requests_per_second is not None:
+            self.requests_per_second = requests_per_second
+
+    def matches(self, proxy_raw: str) -> bool:
+        proxy_raw = proxy_raw.strip()
+        if "://" not in proxy_raw:
+            return "" in self.schemes
+        parsed_url = urlparse(proxy_raw)
+        return parsed_url.netloc in self.domains or parsed_url.scheme in self.schemes
+
+    def resolve(self, proxy_raw: str) -> dict:
+        raise NotImplementedError(f"{self.__class__.__name__} is a rotating provider")
+
+    def parse_response(self, proxy_raw: str, code: int, body: bytes) -> dict:
+        raise NotImplementedError(f"{self.__class__.__name__} is a static provider")
+
+
+class ProxyxoayProvider(ProxyProvider):
+    """proxyxoay.shop / proxyxoay.org: "proxyhttp" is "ip:port:user:pass"."""
+
+    name = "proxyxoay"
+    domains = ("proxyxoay.shop", "proxyxoay.org", "api.proxyxoay.org")
+    rotating = True
+    rotation_seconds = PROXY_ROTATION_SECONDS
+
+    def parse_response(self, proxy_raw: str, code: int, body: bytes) -> dict:
+        if code != 200:
+            return {"status": code, "message": "Error fetching proxy"}
+        res = json.loads(body.decode("utf-8"))
+        data = None
+        if "proxyhttp" in res:
+            ip, port, user, pwd = res["proxyhttp"].split(":", 3)
+            data = {"username": user, "password": pwd, "server": f"{ip}:{port}"}
+        return proxy_result(data, res.get("status"), res.get("message"))
+
+
+class StaticProxyProvider(ProxyProvider):
+    """
+    A fixed HTTP proxy: "host:port", "host:port:user:pass",
+    "user:pass@host:port" or "http(s)://[user:pass@]host:port". An http(s)
+    URL with a path or a query is an API of an unknown provider, not a proxy.
+    """
+
+    name = "static"
+    schemes = ("", "http", "https")
+
+    def matches(self, proxy_raw: str) -> bool:
+        if not super().matches(proxy_raw):
+            return False
+        proxy_raw = proxy_raw.strip()
+        if "://" not in proxy_raw:
+            return True
+        parsed_url = urlparse(proxy_raw)
+        return parsed_url.path in ("", "/") and not parsed_url.query
+
+    def resolve(self, proxy_raw: str) -> dict:
+        proxy_raw = proxy_raw.strip()
+        if "://" in proxy_raw:
+            return proxy_result(_url_credential(proxy_raw), STATUS_OK)
+        username = password = None
+        if "@" in proxy_raw:
+            auth, server = proxy_raw.rsplit("@", 1)
+            username, _, password = auth.partition(":")
+        else:
+            parts = proxy_raw.split(":", 3)
+            if len(parts) not in (2, 4):
+                raise ValueError(f"Invalid proxy ({proxy_raw})")
+            server = f"{parts[0]}:{parts[1]}"
+            if len(parts) == 4:
+                username, password = parts[2], parts[3]
+        data = {"server": server}
+        if username:
+            data.update(username=username, password=password or "")
+        return proxy_result(data, STATUS_OK)
+
+
+class Socks5ProxyProvider(ProxyProvider):
+    """
+    "socks5://host:port" (socks5h is sent as socks5). Chromium does not
+    support SOCKS5 authentication, so a line with a user and password is
+    rejected here rather than by Playwright at launch.
+    """
+
+    name = "socks5"
+    schemes = ("socks5", "socks5h")
+
+    def resolve(self, proxy_raw: str) -> dict:
+        data = _url_credential(proxy_raw.strip(), "socks5")
+        if "username" in data:
+            raise ValueError(
+                f"SOCKS5 proxies with a user and password are not supported by "
+                f"Chromium ({data['server']})"
+            )
+        return proxy_result(data, STATUS_OK)
+
+
+def _url_credential(proxy_url: str, scheme: Optional[str] = None) -> dict:
+    parsed_url = urlparse(proxy_url)
+    if not parsed_url.hostname or not parsed_url.port:
+        raise ValueError(f"Invalid proxy ({proxy_url})")
+    data = {
+        "server": f"{scheme or parsed_url.scheme}://{parsed_url.hostname}:{parsed_url.port}"
+    }
+    if parsed_url.username:
+        data.update(
+            username=unquote(parsed_url.username),
+            password=unquote(parsed_url.password or ""),
+        )
+    return data
+
+
+# Nhà cung cấp đăng ký sau được thử trước
+_providers: List[ProxyProvider] = [
+    StaticProxyProvider(),
+    Socks5ProxyProvider(),
+    ProxyxoayProvider(),
+]
+_providers_lock = threading.Lock()
+
+
+def register_provider(provider: ProxyProvider):
+    """Adds a provider; it takes precedence over the ones already registered."""
+    with _providers_lock:
+        _providers.append(provider)
+
+
+def unregister_provider(provider: ProxyProvider):
+    with _providers_lock:
+        if provider in _providers:
+            _providers.remove(provider)
+
+
+def find_provider(proxy_raw: str) -> Optional[ProxyProvider]:
+    with _providers_lock:
+        providers = list(_providers)
+    for provider in reversed(providers):
+        if provider.matches(proxy_raw):
+            return provider
+    return None
+
+
+def get_provider(proxy_raw: str) -> ProxyProvider:
+    provider = find_provider(proxy_raw)
+    if provider is None:
+        raise ValueError(f"Invalid domain ({proxy_domain(proxy_raw)})")
+    return provider
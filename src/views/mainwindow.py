@@ -232,11 +232,14 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             current_controller = self._real_estate_template_controller
         else:
             return
-        is_exported = current_controller.export_to_file(file_path=file_path)
-        if is_exported:
-            QMessageBox.about(self, "Exported file", f"Export to {file_path}")
-        else:
-            QMessageBox.critical(self, "Error", "Failed to export data")
+
+        def on_exported(is_exported: bool):
+            if is_exported:
+                QMessageBox.about(self, "Exported file", f"Export to {file_path}")
+            else:
+                QMessageBox.critical(self, "Error", "Failed to export data")
+
+        current_controller.export_in_background(file_path, on_exported)
 
     @pyqtSlot(str)
     def on_import_clicked(self, setting_option: str):
@@ -252,11 +255,14 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             current_controller = self._real_estate_template_controller
         else:
             return
-        is_imported = current_controller.import_products(file_path)
-        if is_imported:
-            QMessageBox.about(self, "Imported file", f"Import to {file_path}")
-        else:
-            QMessageBox.critical(self, "Error", "Failed to import data")
+
+        def on_imported(is_imported: bool):
+            if is_imported:
+                QMessageBox.about(self, "Imported file", f"Import to {file_path}")
+            else:
+                QMessageBox.critical(self, "Error", "Failed to import data")
+
+        current_controller.import_in_background(file_path, on_imported)
 
     @pyqtSlot(str)
     def set_status_bar(self, message: str, log=False):
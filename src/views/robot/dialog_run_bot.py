@@ -2,7 +2,7 @@
 import os
 from typing import Dict
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtWidgets import QDialog, QFileDialog
+from PyQt6.QtWidgets import QDialog, QFileDialog, QCheckBox
 from PyQt6.QtGui import QIntValidator
 
 from src.my_types import RobotSettingsType
@@ -32,6 +32,11 @@ class DialogRobotRun(QDialog, Ui_Dialog_RobotRun):
         self.group_num_input.setValidator(QIntValidator())
         self.delay_time_input.setValidator(QIntValidator())
 
+        self.group_by_account_checkbox = QCheckBox(
+            "Group actions by account", parent=self.is_headless_container
+        )
+        self.is_headless_layout.addWidget(self.group_by_account_checkbox)
+
         self.buttonBox.accepted.disconnect()
         self.buttonBox.accepted.connect(self.handle_run)
         self.select_group_file_btn.clicked.connect(self.handle_open_directory)
@@ -42,6 +47,9 @@ class DialogRobotRun(QDialog, Ui_Dialog_RobotRun):
         self.robot_settings.thread_num = int(self.thread_num_input.text())
         self.robot_settings.group_num = int(self.group_num_input.text())
         self.robot_settings.delay_num = float(self.delay_time_input.text())
+        self.robot_settings.group_by_account = (
+            self.group_by_account_checkbox.isChecked()
+        )
         self.setting_data_signal.emit(self.robot_settings)
         self.accept()
 
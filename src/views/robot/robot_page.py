@@ -11,7 +11,7 @@ from src.views.robot.action_payload import ActionPayload
 from src.views.robot.dialog_run_bot import DialogRobotRun
 from src.ui.page_robot_ui import Ui_PageRobot
 
-from src.my_types import UserType, RobotSettingsType
+from src.my_types import UserType, RobotSettingsType, BrowserTaskType
 
 
 class RobotPage(QWidget, Ui_PageRobot):
@@ -204,16 +204,19 @@ class RobotPage(QWidget, Ui_PageRobot):
             return
         action_payloads = [w.get_values() for w in action_widgets]
 
-        new_browser_actions = self._robot_controller.init_actions(
+        def on_actions_ready(new_browser_actions: Dict[str, List[BrowserTaskType]]):
+            for uid, browser_action in new_browser_actions.items():
+                self.browser_actions[uid] = browser_action
+
+            self.fill_actions_tree()
+
+        # Đọc sản phẩm, template và ảnh trong luồng nền, không chặn giao diện
+        self._robot_controller.init_actions_in_background(
             list_user_data=selected_users,
             action_payloads=action_payloads,
+            on_done=on_actions_ready,
         )
 
-        for uid, browser_action in new_browser_actions.items():
-            self.browser_actions[uid] = browser_action
-
-        self.fill_actions_tree()
-
     @pyqtSlot()
     def on_run_action_clicked(self):
         self.robot_run_dialog = DialogRobotRun(self)
@@ -222,7 +225,14 @@ class RobotPage(QWidget, Ui_PageRobot):
 
     @pyqtSlot(RobotSettingsType)
     def handle_run_robot(self, robot_settings: RobotSettingsType):
-        browser_tasks = self._robot_controller.init_browser_tasks(self.browser_actions)
+        if robot_settings.group_by_account:
+            browser_tasks = self._robot_controller.init_browser_tasks_sequential(
+                self.browser_actions
+            )
+        else:
+            browser_tasks = self._robot_controller.init_browser_tasks(
+                self.browser_actions
+            )
         for browser_task in browser_tasks:
             browser_task.is_mobile = robot_settings.is_mobile
             browser_task.headless = robot_settings.headless
@@ -284,19 +284,25 @@ class UserPage(QWidget, Ui_PageUser):
         file_path = dialog_save_file(self)
         if not file_path:
             return
-        is_exported = self._user_controller.export_to_file(file_path=file_path)
-        if is_exported:
-            QMessageBox.about(self, "Exported file", f"Export to {file_path}")
-        else:
-            QMessageBox.critical(self, "Error", "Failed to export data")
+
+        def on_exported(is_exported: bool):
+            if is_exported:
+                QMessageBox.about(self, "Exported file", f"Export to {file_path}")
+            else:
+                QMessageBox.critical(self, "Error", "Failed to export data")
+
+        self._user_controller.export_in_background(file_path, on_exported)
 
     @pyqtSlot()
     def on_import_clicked(self):
         file_path = dialog_open_file(self)
         if not file_path:
             return
-        is_imported = self._user_controller.import_products(file_path)
-        if is_imported:
-            QMessageBox.about(self, "Imported file", f"Import to {file_path}")
-        else:
-            QMessageBox.critical(self, "Error", "Failed to import data")
+
+        def on_imported(is_imported: bool):
+            if is_imported:
+                QMessageBox.about(self, "Imported file", f"Import to {file_path}")
+            else:
+                QMessageBox.critical(self, "Error", "Failed to import data")
+
+        self._user_controller.import_in_background(file_path, on_imported)